@@ -0,0 +1,195 @@
+"""
+Client-side admission control for backend calls.
+
+Every predict/cluster/plan call made by this process passes three gates:
+
+1. a per-session token bucket, so one user hammering "Analyze" or flipping
+   between pages cannot use up everyone's capacity;
+2. a process-wide token bucket that caps the request rate to the API;
+3. a bounded queue in front of at most MAX_INFLIGHT concurrent calls.
+
+A call that fails a gate raises Overloaded straight away (or after waiting
+at most QUEUE_WAIT seconds for a slot), so the page can show a clear
+"busy" message instead of piling more work on a struggling backend. Tokens
+are only spent by admitted calls; a shed call leaves the buckets as they
+were.
+
+Off by default; enable with EZHALNI_ADMISSION=1. Rates are tokens per
+second, bursts are bucket sizes.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("EZHALNI_ADMISSION", "0") == "1"
+GLOBAL_RATE = float(os.environ.get("EZHALNI_RATE", "20"))
+GLOBAL_BURST = float(os.environ.get("EZHALNI_BURST", "40"))
+SESSION_RATE = float(os.environ.get("EZHALNI_SESSION_RATE", "0.5"))
+SESSION_BURST = float(os.environ.get("EZHALNI_SESSION_BURST", "5"))
+MAX_INFLIGHT = int(os.environ.get("EZHALNI_MAX_INFLIGHT", "8"))
+MAX_QUEUE = int(os.environ.get("EZHALNI_MAX_QUEUE", "16"))
+QUEUE_WAIT = 5.0
+# Least recently seen sessions are forgotten beyond this many buckets
+MAX_SESSIONS = 10_000
+
+_session_id = contextvars.ContextVar("ezhalni_session_id", default=None)
+
+
+class Overloaded(Exception):
+    """Raised when a backend call is shed instead of being sent"""
+
+    def __init__(self, reason, retry_after=None):
+        super().__init__(f"backend call shed ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.tokens = burst
+        self.updated = clock()
+
+    def wait(self):
+        """0 when a token is available, else the seconds until one is; takes nothing"""
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self):
+        """Takes one token; returns 0 on success or the seconds until one is available"""
+        wait = self.wait()
+        if not wait:
+            self.tokens -= 1
+        return wait
+
+
+class AdmissionController:
+    def __init__(self, rate=GLOBAL_RATE, burst=GLOBAL_BURST, session_rate=SESSION_RATE,
+                 session_burst=SESSION_BURST, max_inflight=MAX_INFLIGHT, max_queue=MAX_QUEUE,
+                 queue_wait=QUEUE_WAIT, clock=time.monotonic):
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_wait = queue_wait
+        self.clock = clock
+        self._bucket = TokenBucket(rate, burst, clock)
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._slot_free = threading.Condition(self._lock)
+        self._inflight = 0
+        self._waiting = 0
+        self.stats = {"admitted": 0, "queued": 0, "shed_session": 0, "shed_rate": 0, "shed_queue": 0}
+
+    def _buckets(self, session_id):
+        """[(shed reason, bucket)] a call from this session has to pass"""
+        buckets = []
+        if session_id is not None:
+            bucket = self._sessions.get(session_id)
+            if bucket is None:
+                bucket = self._sessions[session_id] = TokenBucket(self.session_rate, self.session_burst, self.clock)
+                if len(self._sessions) > MAX_SESSIONS:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(session_id)
+            buckets.append(("session", bucket))
+        buckets.append(("rate", self._bucket))
+        return buckets
+
+    def _check_tokens(self, buckets):
+        for reason, bucket in buckets:
+            wait = bucket.wait()
+            if wait:
+                self.stats[f"shed_{reason}"] += 1
+                raise Overloaded(reason, wait)
+
+    def _acquire_slot(self, deadline):
+        if self._inflight < self.max_inflight:
+            self._inflight += 1
+            return
+        if self._waiting >= self.max_queue:
+            self.stats["shed_queue"] += 1
+            raise Overloaded("queue", self.queue_wait)
+        wait = self.queue_wait if deadline is None else min(self.queue_wait, max(deadline.remaining(), 0))
+        self.stats["queued"] += 1
+        self._waiting += 1
+        try:
+            if not self._slot_free.wait_for(lambda: self._inflight < self.max_inflight, timeout=wait):
+                self.stats["shed_queue"] += 1
+                raise Overloaded("queue", self.queue_wait)
+        finally:
+            self._waiting -= 1
+        self._inflight += 1
+
+    def _release_slot(self):
+        self._inflight -= 1
+        self._slot_free.notify()
+
+    @contextmanager
+    def admit(self, session_id=None, deadline=None):
+        with self._lock:
+            buckets = self._buckets(session_id)
+            self._check_tokens(buckets)
+            self._acquire_slot(deadline)
+            try:
+                # Other calls may have spent the tokens while this one queued
+                self._check_tokens(buckets)
+            except Overloaded:
+                self._release_slot()
+                raise
+            for _, bucket in buckets:
+                bucket.take()
+            self.stats["admitted"] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._release_slot()
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "inflight": self._inflight, "waiting": self._waiting,
+                    "sessions": len(self._sessions)}
+
+
+# ----------------------------------------
+# 🚦 PROCESS-WIDE CONTROLLER
+# ----------------------------------------
+_controller = AdmissionController() if ENABLED else None
+
+
+def get_controller():
+    return _controller
+
+
+def set_controller(controller):
+    global _controller
+    _controller = controller
+
+
+def set_session(session_id):
+    """Tags backend calls made by the current script run with its session"""
+    _session_id.set(session_id)
+
+
+@contextmanager
+def admit(deadline=None):
+    """Gate for one backend call; a no-op when admission control is off"""
+    if _controller is None:
+        yield
+        return
+    with _controller.admit(_session_id.get(), deadline):
+        yield
+
+
+def stats():
+    return _controller.snapshot() if _controller else {"enabled": False}
@@ -1,9 +1,27 @@
 import streamlit as st
-import requests
 import pandas as pd
-import plotly.express as px
 from datetime import datetime
-import plotly.graph_objects as go
+from html import escape
+import math
+import uuid
+import admission
+import background
+import backend
+import backtest
+import categories
+import charts
+import clusters
+import goals
+import keep_warm
+import lite
+import memory
+import models
+import peers
+import scenarios
+import sensitivity
+import session_store
+import transactions
+import warmup
 
 # ----------------------------------------
 # 🌈 PAGE CONFIG
@@ -15,27 +33,29 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# ----------------------------------------
-# 🔗 API CONFIG
-# ----------------------------------------
-# Run health check on app load
-API_URL = "https://financial-health-api-444234949353.europe-west1.run.app"
-
+# 🗄️ Restore this session from the shared store (no-op unless configured)
+session_cookie_id = session_store.restore(st.session_state, st.context.cookies, models.SESSION_DECODERS)
+if session_cookie_id:
+    st.html(session_store.cookie_script(session_cookie_id), unsafe_allow_javascript=True)
+# 🚦 Per-session quotas for backend calls made by this run
+admission.set_session(st.session_state.setdefault("_admission_id", uuid.uuid4().hex))
+# 🪶 Lite mode starts on for slow or metered connections; the sidebar toggle overrides it
+st.session_state.setdefault("lite_mode", lite.detect(st.context.headers))
 
 # ----------------------------------------
 # 🔍 API HEALTH CHECK + Toast Notification
 # ----------------------------------------
 def check_api_status():
     try:
-        response = requests.get(f"{API_URL}/health", timeout=5)
-        if response.status_code == 200:
-            status = response.json().get("status", "unknown")
+        status_code, body = backend.get_health(timeout=5)
+        if status_code == 200:
+            status = body.get("status", "unknown")
             if status == "healthy":
                 show_api_notification("✅ API is connected successfully!", duration=3)
             else:
                 show_api_notification("⚠️ API responded, but not healthy", duration=3)
         else:
-            show_api_notification(f"🚨 API returned {response.status_code}", duration=3)
+            show_api_notification(f"🚨 API returned {status_code}", duration=3)
     except Exception as e:
         show_api_notification(f"❌ API unreachable: {e}", duration=3)
 
@@ -71,95 +91,58 @@ def show_api_notification(message="✅ API is connected successfully!", duration
         <div class="toast">{message}</div>
     """, unsafe_allow_html=True)
 
-# 🔧 Run the check right after loading
-check_api_status()
 
-# ----------------------------------------
-# 💰 CASH FLOW WATERFALL CHART FUNCTION
-# ----------------------------------------
-def create_cash_flow_waterfall(income, expenses, debt):
-    data = [
-        {'Category': 'Income', 'Amount': income},
-        {'Category': 'Expenses', 'Amount': -expenses},
-        {'Category': 'Debt Payment', 'Amount': -debt},
-        {'Category': 'Available Cash', 'Amount': income - expenses - debt}
-    ]
-
-    df = pd.DataFrame(data)
-
-    fig = go.Figure(go.Waterfall(
-        x=df['Category'],
-        y=df['Amount'],
-        textposition="outside",
-        text=df['Amount'].apply(lambda x: f"${x:,.0f}"),
-        connector={"line": {"color": "#3b82f6"}},
-        increasing={"marker": {"color": "#3b82f6"}},
-        decreasing={"marker": {"color": "#1e3a8a"}},
-        totals={"marker": {"color": "#fde68a"}}
-    ))
-
-    fig.update_layout(
-        title="💰 Monthly Cash Flow Overview",
-        title_font=dict(size=18, color="#1e3a8a", family="Poppins"),
-        yaxis_title="Amount ($)",
-        font=dict(size=13, family="Poppins", color="#1e3a8a"),
-        height=400,
-        plot_bgcolor="#F0F8FF",
-        paper_bgcolor="#F0F8FF",
-        margin=dict(l=40, r=40, t=60, b=40),
-        showlegend=False
-    )
-    return fig
-
-# 💰 Emergency Fund Coverage Gauge with Dynamic Status
-def create_emergency_fund_gauge(emergency_months):
-    if emergency_months < 3:
-        status = "🔴 At Risk"
-        gauge_color = ["#ef4444", "#fde68a"]
-    elif 3 <= emergency_months < 6:
-        status = "🟡 Stable"
-        gauge_color = ["#fde68a", "#10b981"]
+def show_overloaded(error):
+    """Shed-load message for calls refused by admission control"""
+    wait = f" in about {math.ceil(error.retry_after)}s" if error.retry_after else " in a moment"
+    if error.reason == "session":
+        st.warning(f"🚦 You're sending requests faster than we can answer. Please try again{wait}.")
     else:
-        status = "🟢 Secure"
-        gauge_color = ["#10b981", "#60a5fa"]
-
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=emergency_months,
-        title={
-            'text': f"💰 Emergency Fund Coverage (months)<br><span style='font-size:18px'>{status}</span>",
-            'font': {'size': 18, 'color': '#1e3a8a', 'family': 'Poppins'}
-        },
-        number={
-            'font': {'size': 50, 'color': '#1e3a8a', 'family': 'Poppins'}
-        },
-        gauge={
-            'axis': {
-                'range': [0, 6],
-                'tickfont': {'size': 12, 'color': '#1e3a8a', 'family': 'Poppins'}
-            },
-            'bar': {'color': '#1e3a8a'},
-            'steps': [
-                {'range': [0, 3], 'color': gauge_color[0]},
-                {'range': [3, 6], 'color': gauge_color[1]}
-            ],
-            'threshold': {
-                'line': {'color': '#10b981', 'width': 4},
-                'thickness': 0.75,
-                'value': 4.5
-            }
-        }
-    ))
+        st.warning(f"🚦 We're handling a lot of requests right now. Please try again{wait}.")
+
+
+def styled(markup):
+    """Page CSS/HTML as is, or without animations and transitions in lite mode"""
+    return lite.strip_motion(markup) if st.session_state.get("lite_mode") else markup
+
+
+def show_chart(fig, **kwargs):
+    """Interactive plotly chart, or its cached static SVG in lite mode"""
+    if st.session_state.get("lite_mode"):
+        st.html(lite.chart_svg(fig))
+    else:
+        st.plotly_chart(fig, **kwargs)
 
-    fig.update_layout(
-        height=400,
-        font=dict(size=13, color="#1e3a8a", family="Poppins"),
-        paper_bgcolor="#F0F8FF",
-        plot_bgcolor="#F0F8FF",
-        margin=dict(l=40, r=40, t=60, b=40)
+
+def render_skeleton(sections):
+    """Section titles over shimmering placeholder blocks, shown until data arrives"""
+    blocks = "".join(
+        f"<h3 style='color:#1e3a8a;'>{title}</h3><div class='skeleton-block'></div>" for title in sections
     )
+    return styled(f"""
+        <style>
+        .skeleton-block {{
+            height: 110px;
+            border-radius: 12px;
+            margin-bottom: 1.5rem;
+            background: linear-gradient(90deg, #e0f2fe 25%, #f0f9ff 50%, #e0f2fe 75%);
+            background-size: 200% 100%;
+            animation: shimmer 1.4s infinite;
+        }}
+        @keyframes shimmer {{
+            from {{ background-position: 200% 0; }}
+            to {{ background-position: -200% 0; }}
+        }}
+        </style>
+        {blocks}
+    """)
+
+
+# 🔧 Run the check right after loading
+check_api_status()
+# ♨️ Keep the backend warm (one scheduler per process, off unless enabled)
+keep_warm.start()
 
-    return fig
 # ----------------------------------------
 # 🧭 SIDEBAR NAVIGATION
 # ----------------------------------------
@@ -169,15 +152,19 @@ page = st.sidebar.radio(
     "Go to",
     ["🏠 Home", "📈 Financial Input", "📊 Insights", "💡 You vs others", "🧠 Plan"]
 )
+st.sidebar.toggle("🪶 Lite mode", key="lite_mode", help="Static charts and no animations, for slow connections")
 st.sidebar.markdown("---")
 st.sidebar.caption("Built with ❤️ by Ezhalni team")
 
+# 🧵 Stop backend work started by pages the user has left
+background.cancel_except(st.session_state, page)
+
 # ----------------------------------------
 # 🏠 HOME PAGE - IMPROVED DESIGN
 # ----------------------------------------
 if page == "🏠 Home":
     # --- STYLE ---
-    st.markdown("""
+    st.markdown(styled("""
         <style>
             .block-container{padding-top:0.5rem!important; padding-bottom:2rem!important;}
             body{background-color:#F0F8FF;color:#222;}
@@ -244,13 +231,13 @@ if page == "🏠 Home":
                 60% {transform: translateY(-5px);}
             }
         </style>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
     # --- HEADER (MINIMAL SPACING) ---
     logo_col, spacer = st.columns([1, 3])
     with logo_col:
         try:
-            st.image("images/logo.png", width=250)
+            st.image(warmup.load_image("images/logo.png"), width=250)
         except:
             st.markdown("### 💰 Ezhalni")
     
@@ -305,7 +292,7 @@ if page == "🏠 Home":
     with col_image:
         # Right-side illustration (bigger)
         try:
-            st.image("images/www.png", use_container_width=True)
+            st.image(warmup.load_image("images/www.png"), use_container_width=True)
         except:
             st.info("💼 Financial illustration")
 
@@ -314,7 +301,7 @@ if page == "🏠 Home":
 # ----------------------------------------
 elif page == "📈 Financial Input":
     # Apply custom CSS for beautiful light blue theme
-    st.markdown("""
+    st.markdown(styled("""
         <style>
         .stApp {
             background-color: #F0F8FF;
@@ -411,11 +398,46 @@ elif page == "📈 Financial Input":
             margin-top: 1rem;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     st.title("📋 Enter Your Financial Details")
     st.markdown("---")
 
+    # Optional bank statement import pre-fills income, expenses and debt
+    with st.expander("🏦 Import bank statements (CSV / OFX)"):
+        statement_files = st.file_uploader(
+            "Upload one or more statement exports",
+            type=["csv", "ofx", "qfx"],
+            accept_multiple_files=True,
+        )
+        if statement_files:
+            files_key = tuple((f.name, f.size) for f in statement_files)
+            if st.session_state.get("imported_files") != files_key:
+                try:
+                    with st.spinner("🔄 Reading statements..."):
+                        st.session_state["imported_profile"] = transactions.import_statements(
+                            [(f.name, f) for f in statement_files]
+                        )
+                except transactions.StatementFormatError as e:
+                    st.session_state["imported_profile"] = None
+                    st.error(f"⚠️ Could not read statements: {e}")
+                st.session_state["imported_files"] = files_key
+        else:
+            st.session_state.pop("imported_files", None)
+            st.session_state.pop("imported_profile", None)
+
+        imported = st.session_state.get("imported_profile")
+        if imported:
+            st.caption(
+                f"Averaged {imported['months']} month(s) from {imported['first_month']} to "
+                f"{imported['last_month']} ({imported['transactions']:,} transactions)."
+            )
+
+    imported = st.session_state.get("imported_profile") or {}
+    income_default = int(round(imported.get("income", 6000) / 100) * 100)
+    expenses_default = int(round(imported.get("expenses", 2500) / 100) * 100)
+    debt_default = int(round(imported.get("debt", 0) / 50) * 50)
+
     # Input section with better layout
     col1, col2 = st.columns(2)
     
@@ -424,13 +446,13 @@ elif page == "📈 Financial Input":
         age = st.number_input("Age", min_value=18, max_value=100, value=28, step=1)
         
         st.markdown("### 💰 Income & Expenses")
-        income = st.number_input("Monthly Income ($)", min_value=0, value=6000, step=100)
-        expenses = st.number_input("Monthly Expenses ($)", min_value=0, value=2500, step=100)
+        income = st.number_input("Monthly Income ($)", min_value=0, value=income_default, step=100)
+        expenses = st.number_input("Monthly Expenses ($)", min_value=0, value=expenses_default, step=100)
     
     with col2:
         st.markdown("### 💳 Savings & Debt")
         savings = st.number_input("Total Savings ($)", min_value=0, value=50000, step=500)
-        debt = st.number_input("Monthly Loan Payment ($)", min_value=0, value=0, step=50)
+        debt = st.number_input("Monthly Loan Payment ($)", min_value=0, value=debt_default, step=50)
 
     st.markdown("### 📊 Loan Details")
     col3, col4 = st.columns(2)
@@ -449,53 +471,136 @@ elif page == "📈 Financial Input":
 
     if submitted:
         with st.spinner("🔄 Analyzing your data... please wait"):
-            payload = {
-                "age": age,
-                "monthly_income_usd": income,
-                "monthly_expenses_usd": expenses,
-                "savings_usd": savings,
-                "monthly_emi_usd": debt,
-                "loan_interest_rate_pct": interest_rate,
-                "loan_term_months": loan_term
-            }
+            payload = backend.build_payload(
+                age, income, expenses, savings, debt, interest_rate, loan_term
+            )
 
             try:
-                response = requests.post(f"{API_URL}/predict", json=payload)
-                if response.status_code == 200:
-                    result = response.json()
-                    prediction = result.get('prediction', 'Unknown')
-                    confidence = round(result.get('confidence', 0) * 100, 1)
-                    model_source = result.get('source', 'N/A')
+                result = models.Prediction.decode(backend.predict(
+                    payload, deadline=backend.Deadline(backend.PAGE_BUDGETS["financial_input"])
+                ))
+                prediction = result.prediction
+                confidence = round(result.confidence * 100, 1)
+                model_source = result.source
                     
-                    # Display result in a beautiful card
-                    if prediction.lower() in ['at risk', 'atrisk', 'at_risk']:
-                        st.markdown(f"""
-                            <div class="result-box status-risk">
-                                <h2 style='color: #ef4444; margin: 0;'>🚨 Financial Status: At Risk</h2>
-                            </div>
-                        """, unsafe_allow_html=True)
-                    else:  # Healthy
-                        st.markdown(f"""
-                            <div class="result-box status-healthy">
-                                <h2 style='color: #10b981; margin: 0;'>✅ Financial Status: Healthy</h2>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-                    # Save session data
-                    st.session_state["last_result"] = result
-                    st.session_state["last_input"] = payload
-                else:
-                    st.error("⚠️ Could not connect to the prediction API.")
+                # Display result in a beautiful card
+                if prediction.lower() in ['at risk', 'atrisk', 'at_risk']:
+                    st.markdown(f"""
+                        <div class="result-box status-risk">
+                            <h2 style='color: #ef4444; margin: 0;'>🚨 Financial Status: At Risk</h2>
+                        </div>
+                    """, unsafe_allow_html=True)
+                else:  # Healthy
+                    st.markdown(f"""
+                        <div class="result-box status-healthy">
+                            <h2 style='color: #10b981; margin: 0;'>✅ Financial Status: Healthy</h2>
+                        </div>
+                    """, unsafe_allow_html=True)
+
+                # Save session data
+                st.session_state["last_result"] = result
+                st.session_state["last_input"] = payload
+            except backend.Overloaded as e:
+                show_overloaded(e)
+            except backend.BackendError:
+                st.error("⚠️ Could not connect to the prediction API.")
             except Exception as e:
                 st.error(f"🚨 Error: {e}")
 
+    # 🗂️ Scenario comparison: several named what-ifs scored together, side by side
+    st.markdown("---")
+    st.markdown("### 🗂️ Compare Scenarios")
+    st.caption(
+        f"Add up to {scenarios.MAX_SCENARIOS} named what-ifs (e.g. \"New job\", \"Pay off car\") and analyze "
+        "them in one click. Only new or edited scenarios are sent again."
+    )
+    saved_scenarios = st.session_state.get(scenarios.STATE_KEY)
+    # Off by default: the editor table alone is most of this page's payload budget
+    st.session_state.setdefault("compare_scenarios", bool(saved_scenarios))
+    if st.toggle("Compare scenarios", key="compare_scenarios"):
+        current = backend.build_payload(age, income, expenses, savings, debt, interest_rate, loan_term)
+        scenario_rows = st.session_state.setdefault(
+            "scenario_rows",
+            [{"name": name, **entry["inputs"]} for name, entry in saved_scenarios.items()]
+            if saved_scenarios else scenarios.default_rows(current),
+        )
+        edited = st.data_editor(
+            pd.DataFrame(scenario_rows, columns=["name", *backend.PAYLOAD_FIELDS]),
+            key="scenario_editor",
+            num_rows="dynamic",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "name": st.column_config.TextColumn("Scenario", required=True),
+                **{
+                    field: st.column_config.NumberColumn(header, min_value=lo, max_value=hi, step=step)
+                    for field, (header, lo, hi, step) in scenarios.COLUMNS.items()
+                },
+            },
+        )
+        named, problems = scenarios.rows(edited.to_dict("records"))
+        for problem in problems:
+            st.caption(f"⚠️ {problem}")
+
+        scenario_results = scenarios.cached(st.session_state, named)
+        if st.button("🗂️ Analyze All Scenarios", disabled=not named):
+            with st.spinner("🔄 Analyzing your scenarios..."):
+                try:
+                    scenario_results = scenarios.analyze(
+                        st.session_state, named,
+                        deadline=backend.Deadline(backend.PAGE_BUDGETS["financial_input"]),
+                    )
+                except backend.Overloaded as e:
+                    show_overloaded(e)
+                except backend.BackendError:
+                    st.error("⚠️ Could not connect to the prediction API.")
+                except Exception as e:
+                    st.error(f"🚨 Error: {e}")
+
+        shown = [(name, payload) for name, payload in named if name in scenario_results]
+        if shown:
+            # One scale for every column so the charts line up
+            y_low = min([0] + [p["monthly_income_usd"] - p["monthly_expenses_usd"] - p["monthly_emi_usd"] for _, p in shown])
+            y_high = max(p["monthly_income_usd"] for _, p in shown) * 1.15 or 1
+            first_score = scenario_results[shown[0][0]].health_score
+            for column, (index, (name, payload)) in zip(st.columns(len(shown)), enumerate(shown)):
+                with column:
+                    result = scenario_results[name]
+                    local_metrics = backend.compute_local_metrics(payload)
+                    at_risk = result.prediction.lower() in ['at risk', 'atrisk', 'at_risk']
+                    st.markdown(f"""
+                        <div class="result-box {'status-risk' if at_risk else 'status-healthy'}" style="padding: 1rem; margin: 0 0 1rem 0;">
+                            <h4 style='margin: 0;'>{escape(name)}</h4>
+                            <span style='color: {'#ef4444' if at_risk else '#10b981'}; font-weight: 600;'>
+                                {'🚨 At Risk' if at_risk else '✅ Healthy'}
+                            </span>
+                        </div>
+                    """, unsafe_allow_html=True)
+                    st.metric("📊 Health Score", f"{result.health_score}/100",
+                              delta=result.health_score - first_score if index else None)
+                    st.metric("🎯 Confidence", f"{result.confidence * 100:.1f}%")
+                    st.metric("💸 Cash Flow", f"${local_metrics['cash_flow']:,.0f}")
+                    st.metric("🛟 Emergency Fund", f"{local_metrics['emergency_months']:.1f} months")
+                    show_chart(
+                        charts.create_cash_flow_waterfall(
+                            payload["monthly_income_usd"], payload["monthly_expenses_usd"], payload["monthly_emi_usd"],
+                            title="💰 Cash Flow", y_range=(y_low, y_high),
+                        ),
+                        use_container_width=True, config={"displayModeBar": False},
+                    )
+                    if st.button("📌 Use on other pages", key=f"use_scenario_{name}"):
+                        st.session_state["last_input"] = payload
+                        st.session_state["last_result"] = result
+                        st.toast(f"Insights, You vs others and Plan now use “{name}”.")
+            st.caption("Scores are compared with the first scenario.")
+
 # ----------------------------------------
 # 📊 INSIGHTS PAGE (Updated Color Theme)
 # ----------------------------------------
 elif page == "📊 Insights":
 
     # 🎨 Custom Page Styling (Blue Theme)
-    st.markdown("""
+    st.markdown(styled("""
         <style>
         /* 🌤️ Page background */
         [data-testid="stAppViewContainer"] {
@@ -579,7 +684,7 @@ elif page == "📊 Insights":
             margin-bottom: 25px;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
 
     # 🌟 Header
     st.markdown(f"""
@@ -597,11 +702,11 @@ elif page == "📊 Insights":
     if "last_result" not in st.session_state:
         st.warning("Please analyze your data first from the Financial Input page.")
     else:
-        result = st.session_state["last_result"]
-        metrics = result.get("metrics", {})
-        prediction = result.get("prediction", "Unknown")
-        confidence = result.get("confidence", 0)
-        health_score = result.get("health_score", 0)
+        result = models.Prediction.decode(st.session_state["last_result"])
+        metrics = result.metrics
+        prediction = result.prediction
+        confidence = result.confidence
+        health_score = result.health_score
         payload = st.session_state.get("last_input", {})
 
         # Extract
@@ -609,11 +714,12 @@ elif page == "📊 Insights":
         expenses = payload.get("monthly_expenses_usd", 0)
         savings = payload.get("savings_usd", 0)
         debt = payload.get("monthly_emi_usd", 0)
-        expense_ratio = metrics.get("expense_ratio", 0)
-        emergency_months = metrics.get("emergency_months", 0)
-        loan_to_income = metrics.get("loan_to_income", 0)
-        cash_flow = income - expenses
-        savings_rate = (savings / (income * 12)) * 100 if income > 0 else 0
+        expense_ratio = metrics.expense_ratio
+        emergency_months = metrics.emergency_months
+        loan_to_income = metrics.loan_to_income
+        local_metrics = backend.compute_local_metrics(payload)
+        cash_flow = local_metrics["cash_flow"]
+        savings_rate = local_metrics["savings_rate"]
 
         # 💎 KPI Section
         st.markdown("## 💎 Key Financial Indicators")
@@ -630,63 +736,67 @@ elif page == "📊 Insights":
         col1, col2 = st.columns(2)
 
         with col1:
-            df = pd.DataFrame({
-                "Category": ["Income", "Expenses", "Debt", "Savings"],
-                "Amount": [income, expenses, debt, savings]
-            })
-            fig1 = px.bar(
-                df, x="Category", y="Amount",
-                color="Category",
-                color_discrete_map={
-                    "Income": "#1e3a8a", "Expenses": "#3b82f6",
-                    "Debt": "#60a5fa", "Savings": "#fde68a"
-                },
-                title="Your Financial Composition"
-            )
-            fig1.update_layout(
-                title_font=dict(size=18, color="#1e3a8a", family="Poppins"),
-                font=dict(size=13, family="Poppins", color="#1e3a8a"),
-                yaxis_title="Amount ($)",
-                height=400,
-                plot_bgcolor="#F0F8FF",
-                paper_bgcolor="#F0F8FF",
-                margin=dict(l=40, r=40, t=60, b=40),
-                showlegend=True,
-            )
-            st.plotly_chart(fig1, config={"displayModeBar": False}, use_container_width=True)
+            fig1 = charts.create_composition_bar(income, expenses, debt, savings)
+            show_chart(fig1, config={"displayModeBar": False}, use_container_width=True)
 
         with col2:
-            st.plotly_chart(create_cash_flow_waterfall(income, expenses, debt), use_container_width=True)
+            show_chart(charts.create_cash_flow_waterfall(income, expenses, debt), use_container_width=True)
 
         # ⚖️ Ratios & Emergency Gauge
         st.markdown("### ⚖️ Financial Ratios & Coverage")
         col3, col4 = st.columns(2)
 
         with col3:
-            df_ratios = pd.DataFrame({
-                "Metric": ["Expense Ratio", "Loan-to-Income", "Emergency Months"],
-                "Value": [expense_ratio, loan_to_income, emergency_months]
-            })
-            fig2 = px.bar(
-                df_ratios, x="Metric", y="Value",
-                color="Value",
-                color_continuous_scale=["#93c5fd", "#3b82f6", "#1e3a8a"],
-                title="📊 Financial Ratios Overview"
-            )
-            fig2.update_layout(
-                title_font=dict(size=18, color="#1e3a8a", family="Poppins"),
-                font=dict(size=13, family="Poppins", color="#1e3a8a"),
-                yaxis_title="Value",
-                height=400,
-                plot_bgcolor="#F0F8FF",
-                paper_bgcolor="#F0F8FF",
-                margin=dict(l=40, r=40, t=60, b=40),
-                coloraxis_showscale=False
-            )
-            st.plotly_chart(fig2, config={"displayModeBar": False}, use_container_width=True)
+            fig2 = charts.create_ratios_bar(expense_ratio, loan_to_income, emergency_months)
+            show_chart(fig2, config={"displayModeBar": False}, use_container_width=True)
 
         with col4:
-            st.plotly_chart(create_emergency_fund_gauge(emergency_months), use_container_width=True, config={"displayModeBar": False})
+            show_chart(charts.create_emergency_fund_gauge(emergency_months), use_container_width=True, config={"displayModeBar": False})
+
+        # 🎚️ What-if Sensitivity
+        st.markdown("---")
+        st.subheader("🎚️ What Would Change Your Result?")
+        st.caption("Each input is nudged down and up and re-scored in one batch; the longest bars move your score the most.")
+        # Without the inputs behind last_result the nudges would be applied to the default profile
+        sensitivity_inputs = backend.payload_from_profile(payload) if payload else None
+        cached_sensitivity = st.session_state.get("cached_sensitivity")
+        if sensitivity_inputs is None:
+            st.warning("⚠️ Your inputs were not kept with this result. Please run Analyze again on the "
+                       "'📈 Financial Input' page to test what-if changes.")
+        elif st.button("🎚️ Test what-if changes") or (
+            cached_sensitivity and cached_sensitivity.get("inputs") == sensitivity_inputs
+        ):
+            status = st.empty()
+            try:
+                analysis = session_store.remember(
+                    st.session_state, "cached_sensitivity", sensitivity_inputs,
+                    lambda: background.run(
+                        st.session_state, page, sensitivity_inputs,
+                        lambda deadline: sensitivity.analyze(sensitivity_inputs, deadline=deadline),
+                        backend.PAGE_BUDGETS["insights"], status, "🔄 Testing what-if changes"
+                    )
+                )
+                show_chart(charts.create_sensitivity_tornado(analysis), use_container_width=True,
+                           config={"displayModeBar": False})
+                flips = [
+                    f"**{row['label']}** {direction} to `{charts.input_text(row['field'], row[direction]['value'])}`"
+                    for row in analysis["rows"] for direction in ("down", "up")
+                    if row[direction] and row[direction]["flips"]
+                ]
+                top = analysis["rows"][0]
+                if flips:
+                    st.success(f"🔁 These single changes would flip your status: {', '.join(flips)}")
+                elif not top["swing"]:
+                    st.info("None of these nudges changes your score; your result is stable around your current inputs.")
+                else:
+                    st.info(f"No single nudge flips your status; **{top['label']}** moves your score the most "
+                            f"({top['swing']} points between its lower and higher value).")
+            except backend.Overloaded as e:
+                show_overloaded(e)
+            except backend.BackendError:
+                st.error("⚠️ Could not score the what-if changes.")
+            except Exception as e:
+                st.error(f"🚨 Error testing what-if changes: {e}")
 
         # 💡 AI Summary
         st.markdown("---")
@@ -705,7 +815,7 @@ elif page == "📊 Insights":
 # ----------------------------------------
 elif page == "💡 You vs others":
     # Apply custom CSS for beautiful light blue theme
-    st.markdown("""
+    st.markdown(styled("""
         <style>
         .stApp {
             background-color: #F0F8FF;
@@ -831,7 +941,7 @@ elif page == "💡 You vs others":
             font-weight: 600;
         }
         </style>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     st.title("👥 You vs Others")
     st.markdown("### Compare your financial profile with similar users")
@@ -840,89 +950,119 @@ elif page == "💡 You vs others":
         st.warning("⚠️ Please analyze your data first from the '📈 Financial Input' page.")
     else:
         try:
-            with st.spinner("🔄 Loading your comparison data..."):
-                response = requests.post(f"{API_URL}/cluster", json=st.session_state["last_input"])
-                
-            if response.status_code == 200:
-                cluster_info = response.json()
-                
-                # 🎯 Cluster Information Card
-                st.markdown('<div class="info-card">', unsafe_allow_html=True)
-                
-                cluster_name = cluster_info.get('cluster_name', 'N/A')
-                st.markdown(f'<div class="cluster-badge">🏷️ Your Group: {cluster_name}</div>', unsafe_allow_html=True)
-                
-                description = cluster_info.get('description', 'No description available')
-                st.markdown(f"**📝 Description:** {description}")
-                
-                health_status = cluster_info.get('health_status', 'N/A')
-                if 'healthy' in health_status.lower():
-                    st.markdown(f'<div class="status-badge status-healthy">💚 {health_status}</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown(f'<div class="status-badge status-risk">⚠️ {health_status}</div>', unsafe_allow_html=True)
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-
-                st.markdown("---")
-
-                # 📊 Comparison Section
-                comp = cluster_info.get("comparison", {})
-                group_name = comp.get('group_name', 'N/A')
-                
-                st.markdown('<div class="comparison-card">', unsafe_allow_html=True)
-                st.subheader(f"📊 How You Compare with {group_name}")
-                
-                comparison_data = {
-                    "Metric": ["Income", "Savings", "Debt"],
-                    "Yours": [
-                        comp.get("income", {}).get("yours", 0),
-                        comp.get("savings", {}).get("yours", 0),
-                        comp.get("debt", {}).get("yours", 0)
-                    ],
-                    "Group Avg": [
-                        comp.get("income", {}).get("group_average", 0),
-                        comp.get("savings", {}).get("group_average", 0),
-                        comp.get("debt", {}).get("group_average", 0)
-                    ],
-                    "Assessment": [
-                        comp.get("income", {}).get("assessment", ""),
-                        comp.get("savings", {}).get("assessment", ""),
-                        comp.get("debt", {}).get("assessment", "")
-                    ]
-                }
-
-                df_comp = pd.DataFrame(comparison_data)
-                st.dataframe(df_comp, use_container_width=True, hide_index=True)
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-
-                st.markdown("---")
-
-                # 💡 Characteristics Section
-                st.markdown('<div class="metrics-container">', unsafe_allow_html=True)
-                st.subheader("💡 Financial Profile Breakdown")
-                
-                ch = cluster_info.get("characteristics", {})
-
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric("💵 Cash Flow", ch.get("cash_flow", "N/A"), 
-                             help="Your monthly income minus expenses")
-                    st.metric("🚨 Emergency Fund", ch.get("emergency_fund", "N/A"),
-                             help="Savings relative to monthly expenses")
-                with col2:
-                    st.metric("📊 Expense Ratio", ch.get("expense_ratio", "N/A"),
-                             help="Percentage of income spent on expenses")
-                    st.metric("💳 Debt Level", ch.get("debt_level", "N/A"),
-                             help="Debt burden relative to income")
-                
-                st.markdown('</div>', unsafe_allow_html=True)
-                
-                # Success message at bottom
-                st.success("✅ Comparison analysis completed successfully!")
-
+            # Layout first; the cluster call runs on a worker while the skeleton shows
+            status = st.empty()
+            skeleton = st.empty()
+            skeleton.markdown(render_skeleton([
+                "🏷️ Your Group", "📊 How You Compare", "💡 Financial Profile Breakdown"
+            ]), unsafe_allow_html=True)
+            user_input = st.session_state["last_input"]
+            try:
+                cluster_info = session_store.remember(
+                    st.session_state, "cached_cluster", user_input,
+                    lambda: background.run(
+                        st.session_state, page, user_input,
+                        lambda deadline: models.ClusterInfo.decode(
+                            clusters.cluster_info(user_input, deadline=deadline)
+                        ),
+                        backend.PAGE_BUDGETS["you_vs_others"], status,
+                        "🔄 Loading your comparison data"
+                    )
+                )
+            finally:
+                skeleton.empty()
+
+            # 🎯 Cluster Information Card
+            st.markdown('<div class="info-card">', unsafe_allow_html=True)
+
+            cluster_name = cluster_info.cluster_name
+            st.markdown(f'<div class="cluster-badge">🏷️ Your Group: {cluster_name}</div>', unsafe_allow_html=True)
+
+            description = cluster_info.description
+            st.markdown(f"**📝 Description:** {description}")
+
+            health_status = cluster_info.health_status
+            if 'healthy' in health_status.lower():
+                st.markdown(f'<div class="status-badge status-healthy">💚 {health_status}</div>', unsafe_allow_html=True)
             else:
-                st.error("⚠️ Could not fetch cluster data from the server.")
+                st.markdown(f'<div class="status-badge status-risk">⚠️ {health_status}</div>', unsafe_allow_html=True)
+
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown("---")
+
+            # 📊 Comparison Section
+            comp = cluster_info.comparison
+            group_name = comp.group_name
+
+            st.markdown('<div class="comparison-card">', unsafe_allow_html=True)
+            st.subheader(f"📊 How You Compare with {group_name}")
+
+            comparison_data = {
+                "Metric": ["Income", "Savings", "Debt"],
+                "Yours": [comp.income.yours, comp.savings.yours, comp.debt.yours],
+                "Group Avg": [comp.income.group_average, comp.savings.group_average, comp.debt.group_average],
+                "Assessment": [comp.income.assessment, comp.savings.assessment, comp.debt.assessment]
+            }
+
+            # Percentile ranks against the peer dataset, when one is installed
+            ranks = peers.percentile_ranks(st.session_state["last_input"])
+            if ranks:
+                comparison_data["Percentile"] = [
+                    peers.ordinal(ranks[key]) if key in ranks else "N/A"
+                    for key in ("income", "savings", "debt")
+                ]
+
+            df_comp = pd.DataFrame(comparison_data)
+            st.dataframe(df_comp, use_container_width=True, hide_index=True)
+
+            if ranks:
+                st.markdown("#### 📈 Where You Stand Among All Users")
+                dataset = peers.get_dataset()
+                dist_cols = st.columns(len(ranks))
+                for dist_col, key in zip(dist_cols, ranks):
+                    column = peers.PEER_COLUMNS[key]
+                    edges, counts = dataset.histogram(column)
+                    with dist_col:
+                        show_chart(
+                            charts.create_peer_distribution_chart(
+                                edges, counts, st.session_state["last_input"].get(column, 0),
+                                key.title(), ranks[key]
+                            ),
+                            use_container_width=True, config={"displayModeBar": False}
+                        )
+
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            st.markdown("---")
+
+            # 💡 Characteristics Section
+            st.markdown('<div class="metrics-container">', unsafe_allow_html=True)
+            st.subheader("💡 Financial Profile Breakdown")
+
+            ch = cluster_info.characteristics
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("💵 Cash Flow", ch.cash_flow, 
+                         help="Your monthly income minus expenses")
+                st.metric("🚨 Emergency Fund", ch.emergency_fund,
+                         help="Savings relative to monthly expenses")
+            with col2:
+                st.metric("📊 Expense Ratio", ch.expense_ratio,
+                         help="Percentage of income spent on expenses")
+                st.metric("💳 Debt Level", ch.debt_level,
+                         help="Debt burden relative to income")
+
+            st.markdown('</div>', unsafe_allow_html=True)
+
+            # Success message at bottom
+            st.success("✅ Comparison analysis completed successfully!")
+
+        except backend.Overloaded as e:
+            show_overloaded(e)
+        except backend.BackendError:
+            st.error("⚠️ Could not fetch cluster data from the server.")
         except Exception as e:
             st.error(f"🚨 Error fetching comparison data: {e}")
 # ----------------------------------------
@@ -930,7 +1070,7 @@ elif page == "💡 You vs others":
 # ----------------------------------------
 elif page == "🧠 Plan":
     # Custom CSS for theme
-    st.markdown("""
+    st.markdown(styled("""
     <style>
         /* Main background */
         .stApp {
@@ -1060,7 +1200,7 @@ elif page == "🧠 Plan":
             box-shadow: 0 4px 6px rgba(30, 58, 138, 0.2);
         }
     </style>
-    """, unsafe_allow_html=True)
+    """), unsafe_allow_html=True)
     
     st.title("🧭 Personalized Financial Plan")
 
@@ -1071,246 +1211,313 @@ elif page == "🧠 Plan":
         user_input = st.session_state["last_input"]
 
         # Prepare payload
-        plan_payload = {
-            "age": user_input.get("age", 0),
-            "monthly_income_usd": user_input.get("monthly_income_usd", 0),
-            "monthly_expenses_usd": user_input.get("monthly_expenses_usd", 0),
-            "savings_usd": user_input.get("savings_usd", 0),
-            "monthly_emi_usd": user_input.get("monthly_emi_usd", 0),
-            "loan_interest_rate_pct": user_input.get("loan_interest_rate_pct", 5.0),
-            "loan_term_months": user_input.get("loan_term_months", 24)
-        }
+        plan_payload = backend.build_plan_payload(user_input)
 
         # Validate inputs
-        if (
-            plan_payload["age"] <= 0 or
-            plan_payload["monthly_income_usd"] <= 0 or
-            plan_payload["monthly_expenses_usd"] <= 0
-        ):
+        if not backend.is_plan_payload_valid(plan_payload):
             st.warning("⚠️ Please enter valid non-zero values for age, income, and expenses.")
             st.info("💡 Go to the Financial Input page and click 'Analyze My Financial Health' again.")
         else:
             try:
-                response = requests.post(f"{API_URL}/plan", json=plan_payload)
-
-                if response.status_code == 200:
-                    plan_data = response.json()
-                    
-                    if plan_data and isinstance(plan_data, dict):
-                        # ============================================================
-                        # 📊 FINANCIAL SUMMARY
-                        # ============================================================
-                        st.markdown("## 💡 Financial Summary")
-                        summary = plan_data.get("summary", {})
-                        structured = plan_data.get("structured", {})
-
-                        col1, col2, col3, col4 = st.columns(4)
-                        with col1:
-                            health_status = summary.get("health_status", "N/A")
-                            status_color = "🟢" if health_status == "Healthy" else "🟡" if health_status == "At Risk" else "🔴"
-                            st.metric(f"{status_color} Health Status", health_status)
-                        with col2:
-                            st.metric("📊 Health Score", f"{summary.get('health_score', 0)}/100")
-                        with col3:
-                            severity = structured.get("severity", "N/A").upper()
-                            severity_emoji = "🔴" if severity == "CRITICAL" else "🟠" if severity == "HIGH" else "🟡" if severity == "MODERATE" else "🟢"
-                            st.metric(f"{severity_emoji} Severity", severity)
-                        with col4:
-                            st.metric("🎯 Action Items", summary.get("action_items", 0))
-
-                        st.markdown(f"""
-                        <div class="custom-card">
-                            <strong style="color: #1e3a8a; font-size: 18px;">🎯 Top Priority:</strong> 
-                            <span style="color: #3b82f6; font-size: 16px;">{summary.get('top_priority', 'N/A')}</span>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        st.markdown("---")
-
-                        # ============================================================
-                        # ⚠️ ISSUES & ✅ STRENGTHS
-                        # ============================================================
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown("### ⚠️ Issues Identified")
-                            issues = structured.get("issues", [])
-                            if issues:
-                                for issue in issues:
-                                    issue_type = issue.get("type", "").upper()
-                                    icon = "🔴" if issue_type == "CRITICAL" else "🟠"
-                                    with st.expander(f"{icon} {issue.get('title', 'N/A')}", expanded=True):
-                                        st.write(issue.get("description", "No details"))
-                            else:
-                                st.success("🎉 No issues found! You're doing great!")
-
-                        with col2:
-                            st.markdown("### ✅ Your Strengths")
-                            strengths = structured.get("strengths", [])
-                            if strengths:
-                                for strength in strengths:
-                                    with st.expander(f"✅ {strength.get('title', 'N/A')}", expanded=True):
-                                        st.write(strength.get("description", ""))
-                            else:
-                                st.info("Focus on building your financial foundation first.")
-
-                        st.markdown("---")
-
-                        # ============================================================
-                        # 📈 DETAILED RECOMMENDATIONS
-                        # ============================================================
-                        st.markdown("## 📈 Detailed Recommendations")
-                        recs = plan_data.get("recommendations", {})
-
-                        # Emergency Fund
-                        st.markdown("### 🏦 Emergency Fund")
-                        ef = recs.get("emergency_fund", {})
+                # Layout first; the plan call runs on a worker while the skeleton shows
+                status = st.empty()
+                skeleton = st.empty()
+                skeleton.markdown(render_skeleton([
+                    "💡 Financial Summary", "📈 Detailed Recommendations", "📝 Your Complete Action Plan"
+                ]), unsafe_allow_html=True)
+                try:
+                    plan_data = session_store.remember(
+                        st.session_state, "cached_plan", plan_payload,
+                        lambda: background.run(
+                            st.session_state, page, plan_payload,
+                            background.BackendCall("plan", plan_payload, models.Plan.decode),
+                            backend.PAGE_BUDGETS["plan"], status, "🔄 Building your plan"
+                        )
+                    )
+                finally:
+                    skeleton.empty()
+
+                if plan_data:
+                    # ============================================================
+                    # 📊 FINANCIAL SUMMARY
+                    # ============================================================
+                    st.markdown("## 💡 Financial Summary")
+                    summary = plan_data.summary
+                    structured = plan_data.structured
+
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        health_status = summary.health_status
+                        status_color = "🟢" if health_status == "Healthy" else "🟡" if health_status == "At Risk" else "🔴"
+                        st.metric(f"{status_color} Health Status", health_status)
+                    with col2:
+                        st.metric("📊 Health Score", f"{summary.health_score}/100")
+                    with col3:
+                        severity = structured.severity.upper()
+                        severity_emoji = "🔴" if severity == "CRITICAL" else "🟠" if severity == "HIGH" else "🟡" if severity == "MODERATE" else "🟢"
+                        st.metric(f"{severity_emoji} Severity", severity)
+                    with col4:
+                        st.metric("🎯 Action Items", summary.action_items)
+
+                    st.markdown(f"""
+                    <div class="custom-card">
+                        <strong style="color: #1e3a8a; font-size: 18px;">🎯 Top Priority:</strong> 
+                        <span style="color: #3b82f6; font-size: 16px;">{summary.top_priority}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                    st.markdown("---")
+
+                    # ============================================================
+                    # ⚠️ ISSUES & ✅ STRENGTHS
+                    # ============================================================
+                    col1, col2 = st.columns(2)
+
+                    with col1:
+                        st.markdown("### ⚠️ Issues Identified")
+                        issues = structured.issues
+                        if issues:
+                            for issue in issues:
+                                issue_type = issue.type.upper()
+                                icon = "🔴" if issue_type == "CRITICAL" else "🟠"
+                                with st.expander(f"{icon} {issue.title}", expanded=True):
+                                    st.write(issue.description or "No details")
+                        else:
+                            st.success("🎉 No issues found! You're doing great!")
+
+                    with col2:
+                        st.markdown("### ✅ Your Strengths")
+                        strengths = structured.strengths
+                        if strengths:
+                            for strength in strengths:
+                                with st.expander(f"✅ {strength.title}", expanded=True):
+                                    st.write(strength.description)
+                        else:
+                            st.info("Focus on building your financial foundation first.")
+
+                    st.markdown("---")
+
+                    # ============================================================
+                    # 📈 DETAILED RECOMMENDATIONS
+                    # ============================================================
+                    st.markdown("## 📈 Detailed Recommendations")
+                    recs = plan_data.recommendations
+
+                    # Emergency Fund
+                    st.markdown("### 🏦 Emergency Fund")
+                    ef = recs.emergency_fund
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Current", f"${ef.current_amount:,.0f}")
+                        st.caption(f"{ef.current_months:.1f} months")
+                    with col2:
+                        st.metric("Target", f"${ef.target_amount:,.0f}")
+                        st.caption("6 months coverage")
+                    with col3:
+                        st.metric("Monthly Save", f"${ef.monthly_contribution:,.0f}")
+                        if ef.months_to_goal > 0:
+                            st.caption(f"⏱️ {ef.months_to_goal:.0f} months to goal")
+
+                    # Progress bar
+                    if ef.target_amount > 0:
+                        progress = min(ef.current_amount / ef.target_amount, 1.0)
+                        st.progress(progress)
+                        st.caption(f"{progress*100:.1f}% Complete")
+
+                    st.markdown("---")
+
+                    # Debt Management
+                    st.markdown("### 💳 Debt Management")
+                    debt = recs.debt
+
+                    if debt.should_focus:
+                        st.warning("⚠️ Debt reduction should be your priority!")
                         col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("Current", f"${ef.get('current_amount', 0):,.0f}")
-                            st.caption(f"{ef.get('current_months', 0):.1f} months")
+                            st.metric("Current Payment", f"${debt.current_payment:,.0f}/mo")
                         with col2:
-                            st.metric("Target", f"${ef.get('target_amount', 0):,.0f}")
-                            st.caption("6 months coverage")
+                            st.metric("Recommended", f"${debt.total_payment:,.0f}/mo")
+                            st.caption(f"+${debt.extra_payment:,.0f} extra")
                         with col3:
-                            st.metric("Monthly Save", f"${ef.get('monthly_contribution', 0):,.0f}")
-                            if ef.get('months_to_goal', 0) > 0:
-                                st.caption(f"⏱️ {ef.get('months_to_goal', 0):.0f} months to goal")
+                            st.metric("Payoff Timeline", f"{debt.payoff_months:.0f} months")
+                    else:
+                        st.success("✅ Your debt level is manageable!")
 
-                        # Progress bar
-                        if ef.get('target_amount', 0) > 0:
-                            progress = min(ef.get('current_amount', 0) / ef.get('target_amount', 1), 1.0)
-                            st.progress(progress)
-                            st.caption(f"{progress*100:.1f}% Complete")
+                    st.markdown("---")
 
-                        st.markdown("---")
+                    # Investment Analysis
+                    st.markdown("### 📊 Investment Strategy")
+                    inv = recs.investment
+                    inv_type = recs.investment_type
 
-                        # Debt Management
-                        st.markdown("### 💳 Debt Management")
-                        debt = recs.get("debt", {})
-                        
-                        if debt.get("should_focus", False):
-                            st.warning("⚠️ Debt reduction should be your priority!")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        if inv.can_invest:
+                            st.success("✅ You're ready to invest!")
+                            st.metric("Recommended Monthly", f"${inv.recommended_monthly:,.0f}")
+                        else:
+                            st.warning("⏳ Build your foundation first before investing")
+                            st.caption("Focus on emergency fund and debt reduction")
+
+                    with col2:
+                        st.markdown(f"**Investment Type:** {inv_type.type}")
+                        st.metric("Risk Score", f"{inv_type.risk_score}/100")
+                        st.caption(inv_type.reasoning)
+
+                    # Asset Allocation Chart
+                    if inv_type.allocation:
+                        allocation = inv_type.allocation
+                        fig = charts.create_allocation_pie(allocation)
+                        show_chart(fig, use_container_width=True)
+
+                        # Rolling-window backtest over the bundled returns history (cached per allocation)
+                        results = backtest.run_backtest(allocation, inv.recommended_monthly)
+                        if results:
+                            st.markdown("#### ⏳ How This Allocation Did Historically")
+                            years = st.radio(
+                                "Investing for", list(results), horizontal=True,
+                                format_func=lambda y: f"{y} years"
+                            )
+                            outcome = results[years]
                             col1, col2, col3 = st.columns(3)
                             with col1:
-                                st.metric("Current Payment", f"${debt.get('current_payment', 0):,.0f}/mo")
+                                st.metric("Bad Case (10th pct)", f"${outcome['p10']:,.0f}")
                             with col2:
-                                st.metric("Recommended", f"${debt.get('total_payment', 0):,.0f}/mo")
-                                st.caption(f"+${debt.get('extra_payment', 0):,.0f} extra")
+                                st.metric("Median", f"${outcome['p50']:,.0f}")
                             with col3:
-                                st.metric("Payoff Timeline", f"{debt.get('payoff_months', 0):.0f} months")
-                        else:
-                            st.success("✅ Your debt level is manageable!")
-
-                        st.markdown("---")
-
-                        # Investment Analysis
-                        st.markdown("### 📊 Investment Strategy")
-                        inv = recs.get("investment", {})
-                        inv_type = recs.get("investment_type", {})
-
-                        col1, col2 = st.columns(2)
+                                st.metric("Good Case (90th pct)", f"${outcome['p90']:,.0f}")
+                            st.caption(
+                                f"${inv.recommended_monthly:,.0f}/mo for {years} years "
+                                f"(${outcome['contributed']:,.0f} contributed), simulated from every start month "
+                                f"between {outcome['first_start']} and {outcome['last_start']} "
+                                f"({outcome['windows']:,} windows). Worst ${outcome['worst']:,.0f}, "
+                                f"best ${outcome['best']:,.0f}. Past returns do not guarantee future results."
+                            )
+                            fig = charts.create_backtest_fan_chart(outcome["bands"], inv.recommended_monthly)
+                            show_chart(fig, use_container_width=True)
+
+                    st.markdown("---")
+
+                    # Joint split of the monthly surplus (computed locally, cached per input)
+                    split = goals.optimize_split(user_input, recs)
+                    if split:
+                        st.markdown("### 🧮 Optimized Surplus Split")
+                        st.caption(
+                            f"How to divide your ${split['surplus']:,.0f}/mo surplus to reach safety fastest "
+                            f"while paying the least net interest ({split['candidates']} splits simulated)."
+                        )
+                        col1, col2, col3 = st.columns(3)
                         with col1:
-                            if inv.get("can_invest", False):
-                                st.success("✅ You're ready to invest!")
-                                st.metric("Recommended Monthly", f"${inv.get('recommended_monthly', 0):,.0f}")
-                            else:
-                                st.warning("⏳ Build your foundation first before investing")
-                                st.caption("Focus on emergency fund and debt reduction")
-
+                            st.metric("🏦 Emergency Fund", f"${split['monthly']['emergency_fund']:,.0f}/mo")
+                            if split["months_to_safety"] is not None:
+                                st.caption(f"Fully funded in {split['months_to_safety']} months")
                         with col2:
-                            st.markdown(f"**Investment Type:** {inv_type.get('type', 'N/A')}")
-                            st.metric("Risk Score", f"{inv_type.get('risk_score', 0)}/100")
-                            st.caption(inv_type.get('reasoning', ''))
-
-                        # Asset Allocation Chart
-                        if inv_type.get('allocation'):
-                            allocation = inv_type.get('allocation', {})
-                            fig = go.Figure(data=[go.Pie(
-                                labels=list(allocation.keys()),
-                                values=list(allocation.values()),
-                                hole=.3,
-                                marker=dict(colors=['#1e3a8a', '#3b82f6', '#60a5fa', '#93c5fd', '#fde68a'])
-                            )])
-                            fig.update_layout(
-                                title="Recommended Asset Allocation",
-                                height=300,
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                plot_bgcolor='rgba(0,0,0,0)',
-                                font=dict(color='#1e3a8a')
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
+                            st.metric("💳 Extra Debt Payment", f"${split['monthly']['debt']:,.0f}/mo")
+                            if split["debt_free_month"]:
+                                st.caption(f"Debt-free in {split['debt_free_month']} months")
+                        with col3:
+                            st.metric("📊 Investing", f"${split['monthly']['investing']:,.0f}/mo")
+                            st.caption(f"Interest paid: ${split['interest_paid']:,.0f}")
+
+                        baseline = split.get("baseline")
+                        if baseline and baseline["months_to_safety"] is not None and split["months_to_safety"] is not None:
+                            sooner = baseline["months_to_safety"] - split["months_to_safety"]
+                            saved = baseline["interest_paid"] - split["interest_paid"]
+                            if sooner > 0 or saved > 1:
+                                st.info(
+                                    f"💡 Compared with the separate recommendations above: safety {max(sooner, 0)} "
+                                    f"months sooner and ${max(saved, 0):,.0f} less interest."
+                                )
 
                         st.markdown("---")
 
-                        # Expense Reduction (if applicable)
-                        expense_red = recs.get("expense_reduction")
-                        if expense_red:
-                            st.markdown("### 💰 Expense Reduction Opportunity")
-                            st.warning("⚠️ Your expenses are high - consider reducing them!")
-                            
-                            col1, col2, col3 = st.columns(3)
-                            with col1:
-                                st.metric("Current", f"${expense_red.get('current', 0):,.0f}/mo")
-                            with col2:
-                                st.metric("Target", f"${expense_red.get('recommended', 0):,.0f}/mo")
-                            with col3:
-                                st.metric("Potential Savings", f"${expense_red.get('savings_monthly', 0):,.0f}/mo")
-                            
-                            st.markdown("**Focus on reducing:**")
-                            for category in expense_red.get('categories', []):
-                                st.markdown(f"• {category}")
-                            
-                            st.markdown("---")
+                    # Expense Reduction (if applicable)
+                    expense_red = recs.expense_reduction
+                    if expense_red:
+                        st.markdown("### 💰 Expense Reduction Opportunity")
+                        st.warning("⚠️ Your expenses are high - consider reducing them!")
 
-                        # Savings Recommendations
-                        st.markdown("### 💎 Savings Plan")
-                        savings = recs.get("savings", {})
-                        col1, col2 = st.columns(2)
+                        col1, col2, col3 = st.columns(3)
                         with col1:
-                            st.metric("Current Savings Rate", f"{savings.get('current_rate', 0)*100:.1f}%")
-                            st.caption(f"${savings.get('current_monthly', 0):,.0f}/month")
+                            st.metric("Current", f"${expense_red.current:,.0f}/mo")
                         with col2:
-                            st.metric("Target Savings Rate", f"{savings.get('target_rate', 0)*100:.1f}%")
-                            st.caption(f"${savings.get('recommended_monthly', 0):,.0f}/month")
+                            st.metric("Target", f"${expense_red.recommended:,.0f}/mo")
+                        with col3:
+                            st.metric("Potential Savings", f"${expense_red.savings_monthly:,.0f}/mo")
+
+                        spending = (st.session_state.get("imported_profile") or {}).get("categories")
+                        if spending:
+                            # Per-category totals from the imported bank statements
+                            cuts = categories.reduction_targets(spending, expense_red.savings_monthly)
+                            st.markdown("**Your spending by category (from imported statements):**")
+                            for category, amount in spending.items():
+                                line = f"• {category}: ${amount:,.0f}/mo"
+                                if cuts.get(category):
+                                    line += f" — cut ${cuts[category]:,.0f}/mo"
+                                st.markdown(line)
+                        else:
+                            st.markdown("**Focus on reducing:**")
+                            for category in expense_red.categories:
+                                st.markdown(f"• {category}")
 
                         st.markdown("---")
 
-                        # ============================================================
-                        # 📝 NARRATIVE PLAN
-                        # ============================================================
-                        st.markdown("## 📝 Your Complete Action Plan")
-                        narrative = plan_data.get("narrative", "")
-                        
-                        if narrative:
-                            st.text_area(
-                                "Detailed Financial Plan",
-                                narrative,
-                                height=400,
-                                help="This is your personalized step-by-step financial plan"
-                            )
-                            
-                            # Download button
-                            st.download_button(
-                                label="📥 Download Plan as Text",
-                                data=narrative,
-                                file_name=f"financial_plan_{datetime.now().strftime('%Y%m%d')}.txt",
-                                mime="text/plain"
-                            )
+                    # Savings Recommendations
+                    st.markdown("### 💎 Savings Plan")
+                    savings = recs.savings
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Current Savings Rate", f"{savings.current_rate*100:.1f}%")
+                        st.caption(f"${savings.current_monthly:,.0f}/month")
+                    with col2:
+                        st.metric("Target Savings Rate", f"{savings.target_rate*100:.1f}%")
+                        st.caption(f"${savings.recommended_monthly:,.0f}/month")
+
+                    st.markdown("---")
+
+                    # ============================================================
+                    # 📝 NARRATIVE PLAN
+                    # ============================================================
+                    st.markdown("## 📝 Your Complete Action Plan")
+                    narrative = plan_data.narrative
+
+                    if narrative:
+                        st.text_area(
+                            "Detailed Financial Plan",
+                            narrative,
+                            height=400,
+                            help="This is your personalized step-by-step financial plan"
+                        )
+
+                        # Download button
+                        st.download_button(
+                            label="📥 Download Plan as Text",
+                            data=narrative,
+                            file_name=f"financial_plan_{datetime.now().strftime('%Y%m%d')}.txt",
+                            mime="text/plain"
+                        )
+
+                    st.markdown("---")
+                    st.markdown(f"""
+                    <div style="text-align: center; color: #64748b; padding: 20px;">
+                        <p>🕒 Plan generated at: {plan_data.generated_at}</p>
+                        <p style="color: #3b82f6; font-weight: 600;">✨ Generated by Ezhalni Financial Health AI</p>
+                    </div>
+                    """, unsafe_allow_html=True)
 
-                        st.markdown("---")
-                        st.markdown(f"""
-                        <div style="text-align: center; color: #64748b; padding: 20px;">
-                            <p>🕒 Plan generated at: {plan_data.get('generated_at', 'N/A')}</p>
-                            <p style="color: #3b82f6; font-weight: 600;">✨ Generated by Ezhalni Financial Health AI</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    else:
-                        st.warning("📋 No plan data returned from API.")
                 else:
-                    st.error(f"⚠️ Could not generate plan (HTTP {response.status_code})")
+                    st.warning("📋 No plan data returned from API.")
 
+            except backend.Overloaded as e:
+                show_overloaded(e)
+            except backend.BackendError as e:
+                st.error(f"⚠️ Could not generate plan (HTTP {e.status_code})")
             except Exception as e:
                 st.error(f"🚨 Error fetching plan: {e}")
-                st.caption("Please try again or check your internet connection.")
\ No newline at end of file
+                st.caption("Please try again or check your internet connection.")
+
+# ----------------------------------------
+# 🗄️ PERSIST SESSION
+# ----------------------------------------
+session_store.save(st.session_state)
+memory.track(st.session_state, st.session_state["_admission_id"])
@@ -0,0 +1,294 @@
+"""
+Process-wide asyncio HTTP client on one dedicated event-loop thread.
+
+A blocking backend call holds a thread for the whole network wait, so the
+number of requests in flight is capped by the number of threads. Here the
+requests are coroutines on a single loop thread: any thread calls
+submit(coroutine) and gets a concurrent.futures.Future back, which it can
+wait on, poll, cancel (the request is abandoned and its connection closed)
+or hand to background.wait(). Hundreds of pending calls cost one coroutine
+each, not one thread each.
+
+AsyncClient speaks HTTP/1.1 over a small pool of keep-alive connections per
+base URL (POOL_SIZE, EZHALNI_ASYNC_POOL, default 16); requests beyond the
+pool queue for a free connection. Bodies are sent as given, responses are
+read by Content-Length or chunked encoding and gzip/deflate bodies are
+decoded. It only uses the standard library, so it needs nothing beyond
+requirements.txt.
+
+Deployments configured for requests keep working: HTTP_PROXY, HTTPS_PROXY,
+ALL_PROXY and NO_PROXY pick the proxy (plain requests go to it with an
+absolute URL, HTTPS is tunnelled with CONNECT; http:// proxies only),
+REQUESTS_CA_BUNDLE or CURL_CA_BUNDLE replaces the trusted CAs, and
+redirects are followed up to MAX_REDIRECTS the way requests does.
+
+    future = async_client.submit(async_client.get_client(url).request("POST", "/plan", body, headers))
+"""
+import asyncio
+import base64
+import gzip
+import json
+import os
+import ssl
+import threading
+import urllib.request
+import zlib
+from urllib.parse import unquote, urljoin, urlsplit
+
+POOL_SIZE = int(os.environ.get("EZHALNI_ASYNC_POOL", "16"))
+MAX_HEADER_LINES = 100
+MAX_REDIRECTS = 30
+REDIRECTS = (301, 302, 303, 307, 308)
+
+
+class ProxyError(ConnectionError):
+    """The proxy refused to open a tunnel"""
+
+
+class Response:
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers  # lower-cased names
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+# ----------------------------------------
+# 🔁 EVENT-LOOP THREAD
+# ----------------------------------------
+_loop = {"value": None}
+_loop_lock = threading.Lock()
+
+
+def get_loop():
+    """The shared event loop, started on its own daemon thread on first use"""
+    with _loop_lock:
+        if _loop["value"] is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="ezhalni-async", daemon=True).start()
+            _loop["value"] = loop
+        return _loop["value"]
+
+
+def submit(coroutine):
+    """Schedules a coroutine on the shared loop; returns a concurrent.futures.Future"""
+    return asyncio.run_coroutine_threadsafe(coroutine, get_loop())
+
+
+def run(coroutine, timeout=None):
+    """Blocking wrapper: submit() and wait for the result"""
+    future = submit(coroutine)
+    try:
+        return future.result(timeout)
+    finally:
+        future.cancel()
+
+
+# ----------------------------------------
+# 🧭 ENVIRONMENT
+# ----------------------------------------
+def ssl_context():
+    """Default TLS context, trusting REQUESTS_CA_BUNDLE / CURL_CA_BUNDLE instead when set"""
+    bundle = os.environ.get("REQUESTS_CA_BUNDLE") or os.environ.get("CURL_CA_BUNDLE")
+    if bundle and os.path.isdir(bundle):
+        return ssl.create_default_context(capath=bundle)
+    return ssl.create_default_context(cafile=bundle or None)
+
+
+def proxy_for(url):
+    """Proxy URL (split) for a split target URL from the *_PROXY variables, or None to connect directly"""
+    proxies = urllib.request.getproxies()
+    proxy = proxies.get(url.scheme) or proxies.get("all")
+    if not proxy or urllib.request.proxy_bypass(url.netloc):
+        return None
+    proxy = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+    if proxy.scheme != "http":
+        raise ValueError(f"Unsupported proxy {proxy.geturl()!r}; only http:// proxies are supported")
+    return proxy
+
+
+# ----------------------------------------
+# 🌐 CLIENT
+# ----------------------------------------
+class AsyncClient:
+    """HTTP/1.1 keep-alive client for one base URL; only used from the loop thread"""
+
+    def __init__(self, base_url, pool_size=POOL_SIZE):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.origin = f"{url.scheme}://{url.netloc}"
+        self.base_path = url.path.rstrip("/")
+        self.host_header = url.netloc
+        self.ssl = ssl_context() if url.scheme == "https" else None
+        self.proxy = proxy_for(url)
+        self.proxy_headers = {}
+        if self.proxy is not None and self.proxy.username:
+            credentials = f"{unquote(self.proxy.username)}:{unquote(self.proxy.password or '')}"
+            self.proxy_headers["Proxy-Authorization"] = "Basic " + base64.b64encode(credentials.encode()).decode()
+        self.pool_size = pool_size
+        self._slots = None
+        self._idle = []  # (reader, writer) ready for the next request
+        self.stats = {"requests": 0, "connections_opened": 0, "pending": 0, "peak_pending": 0}
+
+    async def request(self, method, path, body=b"", headers=None, timeout=None):
+        """Response for one request, redirects followed; raises TimeoutError after `timeout` seconds"""
+        self.stats["pending"] += 1
+        self.stats["peak_pending"] = max(self.stats["peak_pending"], self.stats["pending"])
+        try:
+            async with asyncio.timeout(timeout):
+                client, target, headers = self, self.base_path + path, dict(headers or {})
+                for _ in range(MAX_REDIRECTS + 1):
+                    response = await client._send(method, target, body, headers)
+                    location = response.headers.get("location")
+                    if response.status_code not in REDIRECTS or not location:
+                        return response
+                    url = urlsplit(urljoin(client.origin + target, location))
+                    origin = f"{url.scheme}://{url.netloc}"
+                    client = client if origin == client.origin else get_client(origin)
+                    target = (url.path or "/") + (f"?{url.query}" if url.query else "")
+                    # Like requests: 303 turns anything but HEAD into a GET, 301/302 turn POST into one
+                    if (response.status_code == 303 and method != "HEAD") or (
+                            response.status_code in (301, 302) and method == "POST"):
+                        method, body = "GET", b""
+                        headers = {k: v for k, v in headers.items()
+                                   if k.lower() not in ("content-encoding", "content-type")}
+                raise ConnectionError(f"exceeded {MAX_REDIRECTS} redirects")
+        finally:
+            self.stats["pending"] -= 1
+
+    async def _send(self, method, target, body, headers):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        async with self._slots:
+            return await self._exchange(method, target, body, headers)
+
+    async def _exchange(self, method, target, body, headers):
+        self.stats["requests"] += 1
+        # An idle connection may have been closed by the server; retry those once on a fresh one
+        while True:
+            reused = bool(self._idle)
+            reader, writer = self._idle.pop() if reused else await self._connect()
+            try:
+                writer.write(self._head(method, target, body, headers) + body)
+                await writer.drain()
+                response, keep_alive = await self._read_response(reader, method)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                writer.close()
+                if reused and not isinstance(e, _Truncated):
+                    continue
+                raise
+            except BaseException:
+                # Timed out or cancelled mid-exchange: the connection is in an unknown state
+                writer.close()
+                raise
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return response
+
+    async def _connect(self):
+        self.stats["connections_opened"] += 1
+        if self.proxy is None:
+            return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        reader, writer = await asyncio.open_connection(self.proxy.hostname, self.proxy.port or 80)
+        if self.ssl is None:
+            return reader, writer  # plain HTTP is sent to the proxy with absolute URLs
+        try:
+            await self._tunnel(reader, writer)
+            await writer.start_tls(self.ssl, server_hostname=self.host)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _tunnel(self, reader, writer):
+        authority = f"{self.host}:{self.port}"
+        lines = [f"CONNECT {authority} HTTP/1.1", f"Host: {authority}"]
+        lines += [f"{name}: {value}" for name, value in self.proxy_headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+        status_line = await reader.readline()
+        for _ in range(MAX_HEADER_LINES):
+            if (await reader.readline()) in (b"\r\n", b"\n", b""):
+                break
+        if status_line.split()[1:2] != [b"200"]:
+            raise ProxyError(f"proxy refused CONNECT {authority}: {status_line.decode('latin-1').strip()!r}")
+
+    def _head(self, method, target, body, headers):
+        if self.proxy is not None and self.ssl is None:
+            target = self.origin + target
+            headers = {**self.proxy_headers, **headers}
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {self.host_header}",
+                 "Connection: keep-alive", f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _read_response(self, reader, method):
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        version, status = status_line.split()[:2]
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        status = int(status)
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        try:
+            if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+                content = b""
+            elif "chunked" in headers.get("transfer-encoding", "").lower():
+                content = await self._read_chunked(reader)
+            elif "content-length" in headers:
+                content = await reader.readexactly(int(headers["content-length"]))
+            else:
+                content, keep_alive = await reader.read(), False
+        except asyncio.IncompleteReadError as e:
+            raise _Truncated(e.partial, e.expected) from None
+
+        encoding = headers.get("content-encoding", "").lower()
+        if encoding == "gzip":
+            content = gzip.decompress(content)
+        elif encoding == "deflate":
+            content = zlib.decompress(content)
+        return Response(status, headers, content), keep_alive
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+
+class _Truncated(asyncio.IncompleteReadError):
+    """The server started answering and then hung up; not safe to resend"""
+
+
+_clients = {}
+
+
+def get_client(base_url):
+    """Shared client for a base URL (one connection pool per URL)"""
+    client = _clients.get(base_url)
+    if client is None:
+        client = _clients.setdefault(base_url, AsyncClient(base_url))
+    return client
+
+
+def stats():
+    return {url: dict(client.stats, idle=len(client._idle)) for url, client in list(_clients.items())}
@@ -0,0 +1,635 @@
+import asyncio
+import gzip
+import importlib
+import json
+import math
+import numbers
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+import requests
+
+import admission
+import async_client
+import precomputed
+from admission import Overloaded  # re-exported so pages only need backend
+
+# ----------------------------------------
+# 🔗 API CONFIG
+# ----------------------------------------
+API_URL = os.environ.get(
+    "EZHALNI_API_URL",
+    "https://financial-health-api-444234949353.europe-west1.run.app"
+)
+DEFAULT_TIMEOUT = 30
+
+# "http" calls API_URL (submitted calls from async_client's shared event loop);
+# "async" makes every call from that loop;
+# "inprocess" calls the engine named by EZHALNI_ENGINE ("package.module:attribute")
+# directly in this process
+TRANSPORT = os.environ.get("EZHALNI_TRANSPORT", "http")
+ENGINE = os.environ.get("EZHALNI_ENGINE")
+
+# Request bodies at least this large are sent gzip-compressed
+COMPRESS_MIN_BYTES = 1024
+# Endpoints whose responses are cached and revalidated with If-None-Match
+CONDITIONAL_ENDPOINTS = ("cluster", "plan")
+ETAG_CACHE_SIZE = 512
+
+# Seconds each page may spend on backend calls in total
+PAGE_BUDGETS = {
+    "financial_input": 20,
+    "insights": 10,
+    "you_vs_others": 10,
+    "plan": 15,
+}
+# Hedging: if an attempt is slower than this latency percentile, send a second one
+HEDGE_ENABLED = os.environ.get("EZHALNI_HEDGE", "0") == "1"
+HEDGE_ENDPOINTS = ("cluster", "plan")
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_DEFAULT_DELAY = 2.0
+LATENCY_WINDOW = 200
+# Requests of one predict_many() batch sent at once (sync transports use threads for them)
+BATCH_CONCURRENCY = 16
+
+# The seven fields every model endpoint expects, in widget order
+PAYLOAD_FIELDS = (
+    "age",
+    "monthly_income_usd",
+    "monthly_expenses_usd",
+    "savings_usd",
+    "monthly_emi_usd",
+    "loan_interest_rate_pct",
+    "loan_term_months",
+)
+
+# Same defaults as the Financial Input widgets
+DEFAULT_PROFILE = {
+    "age": 28,
+    "monthly_income_usd": 6000,
+    "monthly_expenses_usd": 2500,
+    "savings_usd": 50000,
+    "monthly_emi_usd": 0,
+    "loan_interest_rate_pct": 0.0,
+    "loan_term_months": 0,
+}
+
+
+class BackendError(Exception):
+    """Raised when the API answers with a non-200 status"""
+
+    def __init__(self, endpoint, status_code):
+        super().__init__(f"{endpoint} returned HTTP {status_code}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a page's backend budget runs out before a call could finish"""
+
+
+class Deadline:
+    """A page-level time budget shared by all backend calls made for one render"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def timeout(self, timeout, endpoint="backend"):
+        """Caps a per-call timeout to what is left of the budget"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{endpoint} skipped: the {self.seconds}s page budget is used up")
+        return min(timeout, remaining)
+
+
+# ----------------------------------------
+# 🧾 PAYLOAD CONSTRUCTION
+# ----------------------------------------
+def build_payload(age, income, expenses, savings, debt, interest_rate, loan_term):
+    return {
+        "age": age,
+        "monthly_income_usd": income,
+        "monthly_expenses_usd": expenses,
+        "savings_usd": savings,
+        "monthly_emi_usd": debt,
+        "loan_interest_rate_pct": interest_rate,
+        "loan_term_months": loan_term
+    }
+
+
+def payload_from_profile(profile):
+    """Builds a payload from a (possibly partial) profile dict, filling widget defaults"""
+    if not isinstance(profile, dict):
+        raise TypeError(f"A profile must be a JSON object, got {type(profile).__name__}")
+    unknown = set(profile) - set(PAYLOAD_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown profile fields: {', '.join(sorted(unknown))}")
+    payload = {field: profile.get(field, DEFAULT_PROFILE[field]) for field in PAYLOAD_FIELDS}
+    for field, value in payload.items():
+        if isinstance(value, bool) or not isinstance(value, numbers.Real):
+            raise TypeError(f"{field} must be a number, got {type(value).__name__} {value!r}")
+        if not math.isfinite(value):
+            raise ValueError(f"{field} must be finite, got {value!r}")
+    return payload
+
+
+def build_plan_payload(user_input):
+    """/plan falls back to a 5% / 24 month loan when those fields are missing"""
+    return {
+        "age": user_input.get("age", 0),
+        "monthly_income_usd": user_input.get("monthly_income_usd", 0),
+        "monthly_expenses_usd": user_input.get("monthly_expenses_usd", 0),
+        "savings_usd": user_input.get("savings_usd", 0),
+        "monthly_emi_usd": user_input.get("monthly_emi_usd", 0),
+        "loan_interest_rate_pct": user_input.get("loan_interest_rate_pct", 5.0),
+        "loan_term_months": user_input.get("loan_term_months", 24)
+    }
+
+
+def is_plan_payload_valid(plan_payload):
+    return (
+        plan_payload["age"] > 0 and
+        plan_payload["monthly_income_usd"] > 0 and
+        plan_payload["monthly_expenses_usd"] > 0
+    )
+
+
+# ----------------------------------------
+# 🧮 LOCAL METRICS
+# ----------------------------------------
+def compute_local_metrics(payload):
+    """Ratios the dashboard derives without calling the API"""
+    income = payload.get("monthly_income_usd", 0)
+    expenses = payload.get("monthly_expenses_usd", 0)
+    savings = payload.get("savings_usd", 0)
+    debt = payload.get("monthly_emi_usd", 0)
+    return {
+        "cash_flow": income - expenses,
+        "available_cash": income - expenses - debt,
+        "savings_rate": (savings / (income * 12)) * 100 if income > 0 else 0,
+        "expense_ratio": expenses / income if income > 0 else 0,
+        "loan_to_income": debt / income if income > 0 else 0,
+        "emergency_months": savings / expenses if expenses > 0 else 0,
+    }
+
+
+# ----------------------------------------
+# 🌐 HTTP CLIENT
+# ----------------------------------------
+_session = requests.Session()
+_session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+# (endpoint, request body) -> (etag, decoded response), least recently used first
+_etag_cache = OrderedDict()
+_etag_lock = threading.Lock()
+# Flipped off if the server rejects compressed bodies with 415
+_compress_requests = True
+# Monotonic time of the last real (non-probe) backend request
+_activity = {"last_request_at": None}
+
+
+def last_request_at():
+    return _activity["last_request_at"]
+
+
+def _encode_body(payload):
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    headers = {"Content-Type": "application/json"}
+    if _compress_requests and len(body) >= COMPRESS_MIN_BYTES:
+        return body, gzip.compress(body), {**headers, "Content-Encoding": "gzip"}
+    return body, body, headers
+
+
+def _revalidate(endpoint, key, headers):
+    """Cached (etag, response) for a conditional endpoint; adds If-None-Match to headers"""
+    if endpoint not in CONDITIONAL_ENDPOINTS:
+        return None
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+        if cached is not None:
+            _etag_cache.move_to_end(key)
+            headers["If-None-Match"] = cached[0]
+    return cached
+
+
+def _store(endpoint, key, etag, data):
+    if endpoint in CONDITIONAL_ENDPOINTS and etag:
+        with _etag_lock:
+            _etag_cache[key] = (etag, data)
+            _etag_cache.move_to_end(key)
+            while len(_etag_cache) > ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+
+
+def _post(endpoint, payload, timeout=DEFAULT_TIMEOUT):
+    global _compress_requests
+    key_body, body, headers = _encode_body(payload)
+    key = (endpoint, key_body)
+    cached = _revalidate(endpoint, key, headers)
+
+    response = _session.post(f"{API_URL}/{endpoint}", data=body, headers=headers, timeout=timeout)
+
+    if response.status_code == 415 and "Content-Encoding" in headers:
+        _compress_requests = False
+        return _post(endpoint, payload, timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    if response.status_code != 200:
+        raise BackendError(endpoint, response.status_code)
+
+    data = response.json()
+    precomputed.observe_model_version(data.get("model_version"))
+    _store(endpoint, key, response.headers.get("ETag"), data)
+    return data
+
+
+def _get(endpoint, timeout=DEFAULT_TIMEOUT):
+    """Conditional GET; the response is revalidated with its ETag on every call"""
+    key = (endpoint, b"")
+    headers = {}
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+
+    _activity["last_request_at"] = time.monotonic()
+    response = _session.get(f"{API_URL}/{endpoint}", headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    if response.status_code != 200:
+        raise BackendError(endpoint, response.status_code)
+
+    data = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        with _etag_lock:
+            _etag_cache[key] = (etag, data)
+    return data
+
+
+# ----------------------------------------
+# ⏱️ DEADLINES & HEDGING
+# ----------------------------------------
+_latencies = {}  # endpoint -> recent successful latencies in seconds
+_latency_lock = threading.Lock()
+_hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="ezhalni-hedge")
+
+
+def _timed_post(endpoint, payload, timeout):
+    started = _activity["last_request_at"] = time.monotonic()
+    data = _post(endpoint, payload, timeout)
+    with _latency_lock:
+        _latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(time.monotonic() - started)
+    return data
+
+
+def hedge_delay(endpoint):
+    """HEDGE_PERCENTILE of recent latencies, or HEDGE_DEFAULT_DELAY until enough samples exist"""
+    with _latency_lock:
+        samples = sorted(_latencies.get(endpoint, ()))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    return samples[min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE))]
+
+
+def _hedged_post(endpoint, payload, timeout):
+    """Sends a second attempt if the first is slow; the first successful answer wins"""
+    started = time.monotonic()
+    pending = {_hedge_pool.submit(_timed_post, endpoint, payload, timeout)}
+    done, pending = wait(pending, timeout=min(hedge_delay(endpoint), timeout))
+    remaining = timeout - (time.monotonic() - started)
+    if not done and remaining > 0:
+        pending.add(_hedge_pool.submit(_timed_post, endpoint, payload, remaining))
+
+    error = None
+    while True:
+        for future in done:
+            if future.exception() is None:
+                # The losing attempt finishes in the background within its own timeout
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{endpoint} did not answer within {timeout:.1f}s")
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+
+
+def _call(endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+    if deadline is not None:
+        timeout = deadline.timeout(timeout, endpoint)
+    if HEDGE_ENABLED and endpoint in HEDGE_ENDPOINTS:
+        return _hedged_post(endpoint, payload, timeout)
+    return _timed_post(endpoint, payload, timeout)
+
+
+def clear_response_cache():
+    with _etag_lock:
+        _etag_cache.clear()
+
+
+# ----------------------------------------
+# 🔁 ASYNC HTTP CLIENT
+# ----------------------------------------
+# Same request, caching and hedging as above, as coroutines on async_client's loop
+_ACCEPT = {"Accept-Encoding": "gzip, deflate"}
+
+
+async def _post_async(endpoint, payload, timeout):
+    global _compress_requests
+    key_body, body, headers = _encode_body(payload)
+    key = (endpoint, key_body)
+    cached = _revalidate(endpoint, key, headers)
+    try:
+        response = await async_client.get_client(API_URL).request(
+            "POST", f"/{endpoint}", body, {**_ACCEPT, **headers}, timeout
+        )
+    except TimeoutError:
+        raise DeadlineExceeded(f"{endpoint} did not answer within {timeout:.1f}s") from None
+
+    if response.status_code == 415 and "Content-Encoding" in headers:
+        _compress_requests = False
+        return await _post_async(endpoint, payload, timeout)
+    if response.status_code == 304 and cached is not None:
+        return cached[1]
+    if response.status_code != 200:
+        raise BackendError(endpoint, response.status_code)
+
+    data = response.json()
+    precomputed.observe_model_version(data.get("model_version"))
+    _store(endpoint, key, response.headers.get("etag"), data)
+    return data
+
+
+async def _timed_post_async(endpoint, payload, timeout):
+    started = _activity["last_request_at"] = time.monotonic()
+    data = await _post_async(endpoint, payload, timeout)
+    with _latency_lock:
+        _latencies.setdefault(endpoint, deque(maxlen=LATENCY_WINDOW)).append(time.monotonic() - started)
+    return data
+
+
+async def _hedged_post_async(endpoint, payload, timeout):
+    """_hedged_post without the threads; the losing attempt is cancelled"""
+    started = time.monotonic()
+    pending = {asyncio.ensure_future(_timed_post_async(endpoint, payload, timeout))}
+    done, pending = await asyncio.wait(pending, timeout=min(hedge_delay(endpoint), timeout))
+    remaining = timeout - (time.monotonic() - started)
+    if not done and remaining > 0:
+        pending.add(asyncio.ensure_future(_timed_post_async(endpoint, payload, remaining)))
+
+    error = None
+    try:
+        while True:
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+                error = attempt.exception()
+            if not pending:
+                raise error
+            remaining = timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{endpoint} did not answer within {timeout:.1f}s")
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for attempt in pending:
+            attempt.cancel()
+
+
+async def _call_async(endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+    if deadline is not None:
+        timeout = deadline.timeout(timeout, endpoint)
+    if HEDGE_ENABLED and endpoint in HEDGE_ENDPOINTS:
+        return await _hedged_post_async(endpoint, payload, timeout)
+    return await _timed_post_async(endpoint, payload, timeout)
+
+
+# ----------------------------------------
+# 🔌 TRANSPORTS
+# ----------------------------------------
+class HttpTransport:
+    """
+    Calls the model service at API_URL over HTTP. Blocking calls use the
+    requests session; submit() runs the same request on async_client's
+    event loop, so cancelling its Future abandons the request and closes
+    its connection instead of leaving a thread blocked until the timeout.
+    """
+
+    name = "http"
+
+    def health(self, timeout=5, record=True):
+        if record:
+            _activity["last_request_at"] = time.monotonic()
+        response = _session.get(f"{API_URL}/health", timeout=timeout)
+        body = response.json() if response.status_code == 200 else {}
+        return response.status_code, body
+
+    def call(self, endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+        return _call(endpoint, payload, timeout, deadline)
+
+    def submit(self, endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None, decode=None):
+        async def call():
+            data = await _call_async(endpoint, payload, timeout, deadline)
+            return decode(data) if decode else data
+        return async_client.submit(call())
+
+    def cluster_definitions(self, timeout=DEFAULT_TIMEOUT, deadline=None):
+        # Fetched once per DEFINITIONS_TTL by clusters, so the blocking client is fine here
+        if deadline is not None:
+            timeout = deadline.timeout(timeout, "cluster/definitions")
+        return _get("cluster/definitions", timeout)
+
+
+class AsyncHttpTransport(HttpTransport):
+    """
+    HttpTransport with every call on the shared event loop, multiplexed
+    over async_client's small connection pool; call() is the blocking
+    wrapper around submit().
+    """
+
+    name = "async"
+
+    def health(self, timeout=5, record=True):
+        if record:
+            _activity["last_request_at"] = time.monotonic()
+        response = async_client.run(async_client.get_client(API_URL).request("GET", "/health", timeout=timeout))
+        body = response.json() if response.status_code == 200 else {}
+        return response.status_code, body
+
+    def call(self, endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+        future = self.submit(endpoint, payload, timeout, deadline)
+        try:
+            return future.result()
+        finally:
+            future.cancel()
+
+
+class InProcessTransport:
+    """
+    Calls model objects loaded into this process: no HTTP, no JSON.
+
+    The engine is any object with predict(payload), cluster(payload) and
+    plan(payload) returning the same dicts as the HTTP endpoints, plus an
+    optional cluster_definitions().
+    """
+
+    name = "inprocess"
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def health(self, timeout=5, record=True):
+        return 200, {"status": "healthy", "transport": self.name}
+
+    def call(self, endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+        if deadline is not None:
+            deadline.timeout(timeout, endpoint)
+        return getattr(self.engine, endpoint)(payload)
+
+    def cluster_definitions(self, timeout=DEFAULT_TIMEOUT, deadline=None):
+        definitions = getattr(self.engine, "cluster_definitions", None)
+        if definitions is None:
+            raise BackendError("cluster/definitions", 404)
+        return definitions()
+
+
+def load_engine(spec):
+    """Imports 'package.module:attribute' and returns the attribute"""
+    module_name, _, attribute = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute) if attribute else module
+
+
+def make_transport(name=TRANSPORT, engine=ENGINE):
+    if name == "http":
+        return HttpTransport()
+    if name == "async":
+        return AsyncHttpTransport()
+    if name == "inprocess":
+        if not engine:
+            raise ValueError("EZHALNI_ENGINE must name the model engine for the in-process transport")
+        return InProcessTransport(load_engine(engine) if isinstance(engine, str) else engine)
+    raise ValueError(f"Unknown transport {name!r}; expected 'http', 'async' or 'inprocess'")
+
+
+_transport = make_transport()
+
+
+def get_transport():
+    return _transport
+
+
+def set_transport(transport):
+    global _transport
+    _transport = transport
+
+
+# ----------------------------------------
+# 📡 PAGE-FACING CALLS
+# ----------------------------------------
+def get_health(timeout=5, record=True):
+    """Returns (status_code, body) from /health; keep-warm probes pass record=False"""
+    status_code, body = _transport.health(timeout, record)
+    precomputed.observe_model_version(body.get("model_version"))
+    return status_code, body
+
+
+# predict/cluster/plan go through admission control and may raise Overloaded;
+# predict/cluster answer from the precomputed table first when one is installed
+def predict(payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+    stored = precomputed.lookup("predict", payload)
+    if stored is not None:
+        return stored
+    with admission.admit(deadline):
+        return _transport.call("predict", payload, timeout, deadline)
+
+
+def cluster(payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+    stored = precomputed.lookup("cluster", payload)
+    if stored is not None:
+        return stored
+    with admission.admit(deadline):
+        return _transport.call("cluster", payload, timeout, deadline)
+
+
+def plan(payload, timeout=DEFAULT_TIMEOUT, deadline=None):
+    with admission.admit(deadline):
+        return _transport.call("plan", build_plan_payload(payload), timeout, deadline)
+
+
+def can_submit():
+    """True when submit() leaves no thread waiting on the network (the HTTP transports)"""
+    return hasattr(_transport, "submit")
+
+
+def submit(endpoint, payload, timeout=DEFAULT_TIMEOUT, deadline=None, decode=None):
+    """
+    predict/cluster/plan as a concurrent.futures.Future resolving to
+    decode(response). Admission is checked here, on the calling thread, and
+    the slot is held until the future is done.
+    """
+    if endpoint == "plan":
+        payload = build_plan_payload(payload)
+    else:
+        stored = precomputed.lookup(endpoint, payload)
+        if stored is not None:
+            future = Future()
+            future.set_result(decode(stored) if decode else stored)
+            return future
+    gate = ExitStack()
+    gate.enter_context(admission.admit(deadline))
+    try:
+        future = _transport.submit(endpoint, payload, timeout, deadline, decode)
+    except BaseException:
+        gate.close()
+        raise
+    future.add_done_callback(lambda _: gate.close())
+    return future
+
+
+_batch_pool = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="ezhalni-batch")
+
+
+def predict_many(payloads, timeout=DEFAULT_TIMEOUT, deadline=None):
+    """
+    /predict for several payloads, admitted as one call. Each distinct
+    payload is sent once, precomputed answers are used first and the rest
+    are sent concurrently, so the batch takes about as long as its slowest
+    request. Responses come back in payload order.
+    """
+    keys = [json.dumps(payload, sort_keys=True) for payload in payloads]
+    responses, missing = {}, {}
+    for key, payload in zip(keys, payloads):
+        if key not in responses:
+            responses[key] = precomputed.lookup("predict", payload)
+            if responses[key] is None:
+                missing[key] = payload
+    if missing:
+        with admission.admit(deadline):
+            if can_submit():
+                futures = {key: _transport.submit("predict", p, timeout, deadline) for key, p in missing.items()}
+            else:
+                futures = {key: _batch_pool.submit(_transport.call, "predict", p, timeout, deadline)
+                           for key, p in missing.items()}
+            try:
+                for key, future in futures.items():
+                    responses[key] = future.result()
+            finally:
+                for future in futures.values():
+                    future.cancel()
+    return [responses[key] for key in keys]
+
+
+def cluster_definitions(timeout=DEFAULT_TIMEOUT, deadline=None):
+    """Centroids, scaling parameters and group stats behind /cluster"""
+    return _transport.cluster_definitions(timeout, deadline)
@@ -0,0 +1,137 @@
+"""
+Backend calls on worker threads so pages can render their skeleton first.
+
+A page starts its call with run(), which submits it to a shared pool and
+then waits in short polls, refreshing a status placeholder each time. The
+refresh gives Streamlit a point to interrupt the script, so navigating
+away never waits for the backend. Tasks are kept per session and page:
+rerunning the same page with the same inputs picks up the running task,
+and cancel_except() cancels every other page's task on the next run.
+
+Cancelling marks the task's CancellableDeadline, so the call stops before
+its next backend request (or hedge). A request already sent by a pool
+worker cannot be recalled: the worker stays busy until the answer arrives
+or the socket times out, and that timeout is the page's remaining budget.
+
+A BackendCall is a single predict/cluster/plan request. With the HTTP
+transports it is submitted to the shared event loop instead of the pool,
+so a page waiting on the network holds no worker at all, and cancelling it
+abandons the request and closes its connection at once. The in-process
+transport runs it on the pool like any other call.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import backend
+
+MAX_WORKERS = int(os.environ.get("EZHALNI_BACKGROUND_WORKERS", "8"))
+POLL_SECONDS = 0.1
+STATE_KEY = "_background_tasks"
+
+_pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ezhalni-page")
+
+
+class Cancelled(backend.DeadlineExceeded):
+    """Raised inside a call whose page was navigated away from"""
+
+
+class CancellableDeadline(backend.Deadline):
+    def __init__(self, seconds):
+        super().__init__(seconds)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def remaining(self):
+        return 0.0 if self.cancelled else super().remaining()
+
+    def timeout(self, timeout, endpoint="backend"):
+        if self.cancelled:
+            raise Cancelled(f"{endpoint} skipped: the page was left")
+        return super().timeout(timeout, endpoint)
+
+
+class BackendCall:
+    """call(deadline) for one backend request, decoded on arrival"""
+
+    def __init__(self, endpoint, payload, decode):
+        self.endpoint = endpoint
+        self.payload = payload
+        self.decode = decode
+
+    def __call__(self, deadline):
+        return self.decode(getattr(backend, self.endpoint)(self.payload, deadline=deadline))
+
+    def submit(self, deadline):
+        """Future of the decoded response; errors raised before sending end up in the future too"""
+        try:
+            return backend.submit(self.endpoint, self.payload, deadline=deadline, decode=self.decode)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+            return future
+
+
+class Task:
+    def __init__(self, page, inputs, future, deadline):
+        self.page = page
+        self.inputs = inputs
+        self.future = future
+        self.deadline = deadline
+
+    def cancel(self):
+        self.deadline.cancel()
+        self.future.cancel()
+
+
+def start(session_state, page, inputs, call, seconds):
+    """Submits call(deadline), or returns the page's running task for the same inputs"""
+    tasks = session_state.setdefault(STATE_KEY, {})
+    task = tasks.get(page)
+    if task is not None and task.inputs == inputs and not task.deadline.cancelled:
+        return task
+    if task is not None:
+        task.cancel()
+    deadline = CancellableDeadline(seconds)
+    if isinstance(call, BackendCall) and backend.can_submit():
+        future = call.submit(deadline)
+    else:
+        # The copied context carries the admission session id onto the worker
+        future = _pool.submit(contextvars.copy_context().run, call, deadline)
+    task = tasks[page] = Task(page, inputs, future, deadline)
+    return task
+
+
+def wait(session_state, task, status, message="🔄 Loading"):
+    """Result of the task; polls so Streamlit can stop the script while it waits"""
+    started = time.monotonic()
+    try:
+        while True:
+            try:
+                return task.future.result(timeout=POLL_SECONDS)
+            except FutureTimeout:
+                status.caption(f"{message}… {time.monotonic() - started:.1f}s")
+    finally:
+        if task.future.done():
+            session_state.get(STATE_KEY, {}).pop(task.page, None)
+            status.empty()
+
+
+def run(session_state, page, inputs, call, seconds, status, message="🔄 Loading"):
+    """start() then wait(): the page's backend call, off the script thread"""
+    return wait(session_state, start(session_state, page, inputs, call, seconds), status, message)
+
+
+def cancel_except(session_state, page):
+    """Cancels the tasks of every page but this one (the user navigated away)"""
+    tasks = session_state.get(STATE_KEY, {})
+    for other in [p for p in tasks if p != page]:
+        tasks.pop(other).cancel()
@@ -0,0 +1,134 @@
+"""
+Historical backtest of the Plan page's recommended asset allocation.
+
+The returns dataset is a CSV of total returns with one column per asset
+class, named like the allocation keys the API returns, by month or by year:
+
+    month,Stocks,Bonds,Cash        year,Stocks,Bonds,Cash
+    1990-01,-0.0688,-0.0116,0.0066  1990,-0.0306,0.0624,0.0755
+    ...                             ...
+
+A yearly return is spread evenly over its twelve months, which keeps every
+yearly total but hides the swings within each year. data/returns.csv ships
+US annual returns from 1928: S&P 500 with dividends (Stocks), 10-year
+Treasury bonds (Bonds) and 3-month Treasury bills (Cash).
+
+Every start month is simulated at once. With G the cumulative growth of the
+monthly-rebalanced portfolio and S the running sum of 1/G, the value after
+m months of contributing 1 at the start of each month from start s is
+G[s+m] * (S[s+m] - S[s]), so all windows and horizons are a few array
+operations. Outcomes are computed for a contribution of 1 and cached per
+allocation; any monthly amount just scales them, so revisits are instant.
+"""
+import os
+from functools import cache, lru_cache
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RETURNS_PATH = os.environ.get("EZHALNI_RETURNS_DATA", os.path.join(BASE_DIR, "data", "returns.csv"))
+HORIZON_YEARS = (5, 10, 20)
+PERCENTILES = (10, 50, 90)
+
+
+class ReturnsDataset:
+    def __init__(self, path):
+        frame = pd.read_csv(path)
+        if "year" in frame.columns:
+            years = frame.pop("year").astype(int)
+            # (1 + r) ** (1/12) - 1 per month compounds back to r over the year
+            frame = ((1 + frame) ** (1 / 12) - 1).loc[frame.index.repeat(12)].reset_index(drop=True)
+            frame.insert(0, "month", [f"{year}-{m:02d}" for year in years for m in range(1, 13)])
+        self.months = frame.pop("month").astype(str).to_numpy()
+        self.assets = {name.lower(): name for name in frame.columns}
+        self.returns = frame.to_numpy(dtype=np.float64)
+
+    def portfolio_returns(self, allocation):
+        """Monthly returns of the allocation rebalanced every month, or None for unknown assets"""
+        weights = np.zeros(self.returns.shape[1])
+        columns = list(self.assets.values())
+        for asset, weight in allocation.items():
+            name = self.assets.get(str(asset).lower())
+            if name is None:
+                return None
+            weights[columns.index(name)] += weight
+        if weights.sum() <= 0:
+            return None
+        return self.returns @ (weights / weights.sum())
+
+
+@cache
+def get_dataset():
+    """Process-wide returns dataset, or None when none is installed"""
+    if os.path.exists(RETURNS_PATH):
+        return ReturnsDataset(RETURNS_PATH)
+    return None
+
+
+# ----------------------------------------
+# 📈 ROLLING-WINDOW SIMULATION
+# ----------------------------------------
+def window_values(portfolio, months):
+    """
+    (windows, months) values of contributing 1 per month, one row per start
+    month with a full `months` of history after it
+    """
+    growth = np.concatenate([[1.0], np.cumprod(1 + portfolio)])
+    inverse_sum = np.concatenate([[0.0], np.cumsum(1 / growth[:-1])])
+    starts = np.arange(len(portfolio) - months + 1)[:, None]
+    ends = starts + np.arange(1, months + 1)[None, :]
+    return growth[ends] * (inverse_sum[ends] - inverse_sum[starts])
+
+
+@lru_cache(maxsize=64)
+def _unit_backtest(allocation_items):
+    dataset = get_dataset()
+    if dataset is None:
+        return None
+    portfolio = dataset.portfolio_returns(dict(allocation_items))
+    if portfolio is None:
+        return None
+    horizons = {}
+    for years in HORIZON_YEARS:
+        months = years * 12
+        if len(portfolio) < months:
+            continue
+        values = window_values(portfolio, months)
+        horizons[years] = {
+            "windows": len(values),
+            "bands": np.percentile(values, PERCENTILES, axis=0),
+            "worst": float(values[:, -1].min()),
+            "best": float(values[:, -1].max()),
+            "first_start": str(dataset.months[0]),
+            "last_start": str(dataset.months[len(values) - 1]),
+        }
+    return horizons
+
+
+def run_backtest(allocation, monthly):
+    """
+    Outcome ranges for contributing `monthly` into the allocation over each
+    horizon in HORIZON_YEARS: {years: {"contributed", "p10", "p50", "p90",
+    "worst", "best", "windows", "bands", ...}}, or None without data
+    """
+    if not allocation or monthly <= 0:
+        return None
+    items = tuple(sorted((str(k), round(float(v), 6)) for k, v in allocation.items()))
+    unit = _unit_backtest(items)
+    if not unit:
+        return None
+    results = {}
+    for years, outcome in unit.items():
+        final = outcome["bands"][:, -1] * monthly
+        results[years] = {
+            "contributed": monthly * years * 12,
+            **{f"p{p}": float(v) for p, v in zip(PERCENTILES, final)},
+            "worst": outcome["worst"] * monthly,
+            "best": outcome["best"] * monthly,
+            "windows": outcome["windows"],
+            "first_start": outcome["first_start"],
+            "last_start": outcome["last_start"],
+            "bands": outcome["bands"] * monthly,
+        }
+    return results
@@ -0,0 +1,143 @@
+"""
+Figure construction benchmark: validated px/go builders vs charts.py.
+
+Each case is timed end to end as st.plotly_chart sees it: build the figure,
+convert it with plotly.tools.return_figure_from_figure_or_data and serialize
+it with plotly.io.to_json. The "legacy" builders are the original app.py
+versions and are kept here only as the baseline.
+
+    python bench_charts.py [--repeat 200]
+"""
+import argparse
+import time
+
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import plotly.tools
+
+import charts
+
+INCOME, EXPENSES, DEBT, SAVINGS = 6000, 2500, 300, 50000
+ALLOCATION = {"Stocks": 0.6, "Bonds": 0.3, "Cash": 0.1}
+
+_STYLE = dict(
+    title_font=dict(size=18, color="#1e3a8a", family="Poppins"),
+    font=dict(size=13, family="Poppins", color="#1e3a8a"),
+    height=400,
+    plot_bgcolor="#F0F8FF",
+    paper_bgcolor="#F0F8FF",
+    margin=dict(l=40, r=40, t=60, b=40),
+)
+
+
+# ----------------------------------------
+# 🐢 LEGACY BUILDERS
+# ----------------------------------------
+def legacy_waterfall():
+    df = pd.DataFrame([
+        {'Category': 'Income', 'Amount': INCOME},
+        {'Category': 'Expenses', 'Amount': -EXPENSES},
+        {'Category': 'Debt Payment', 'Amount': -DEBT},
+        {'Category': 'Available Cash', 'Amount': INCOME - EXPENSES - DEBT}
+    ])
+    fig = go.Figure(go.Waterfall(
+        x=df['Category'], y=df['Amount'], textposition="outside",
+        text=df['Amount'].apply(lambda x: f"${x:,.0f}"),
+        connector={"line": {"color": "#3b82f6"}},
+        increasing={"marker": {"color": "#3b82f6"}},
+        decreasing={"marker": {"color": "#1e3a8a"}},
+        totals={"marker": {"color": "#fde68a"}}
+    ))
+    fig.update_layout(title="💰 Monthly Cash Flow Overview", yaxis_title="Amount ($)", showlegend=False, **_STYLE)
+    return fig
+
+
+def legacy_gauge():
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number", value=SAVINGS / EXPENSES,
+        title={'text': "💰 Emergency Fund Coverage (months)", 'font': {'size': 18, 'color': '#1e3a8a', 'family': 'Poppins'}},
+        number={'font': {'size': 50, 'color': '#1e3a8a', 'family': 'Poppins'}},
+        gauge={
+            'axis': {'range': [0, 6], 'tickfont': {'size': 12, 'color': '#1e3a8a', 'family': 'Poppins'}},
+            'bar': {'color': '#1e3a8a'},
+            'steps': [{'range': [0, 3], 'color': "#10b981"}, {'range': [3, 6], 'color': "#60a5fa"}],
+            'threshold': {'line': {'color': '#10b981', 'width': 4}, 'thickness': 0.75, 'value': 4.5}
+        }
+    ))
+    fig.update_layout(height=400, font=_STYLE["font"], paper_bgcolor="#F0F8FF",
+                      plot_bgcolor="#F0F8FF", margin=_STYLE["margin"])
+    return fig
+
+
+def legacy_composition():
+    df = pd.DataFrame({"Category": ["Income", "Expenses", "Debt", "Savings"],
+                       "Amount": [INCOME, EXPENSES, DEBT, SAVINGS]})
+    fig = px.bar(df, x="Category", y="Amount", color="Category",
+                 color_discrete_map={"Income": "#1e3a8a", "Expenses": "#3b82f6",
+                                     "Debt": "#60a5fa", "Savings": "#fde68a"},
+                 title="Your Financial Composition")
+    fig.update_layout(yaxis_title="Amount ($)", showlegend=True, **_STYLE)
+    return fig
+
+
+def legacy_ratios():
+    df = pd.DataFrame({"Metric": ["Expense Ratio", "Loan-to-Income", "Emergency Months"],
+                       "Value": [EXPENSES / INCOME, DEBT / INCOME, SAVINGS / EXPENSES]})
+    fig = px.bar(df, x="Metric", y="Value", color="Value",
+                 color_continuous_scale=["#93c5fd", "#3b82f6", "#1e3a8a"],
+                 title="📊 Financial Ratios Overview")
+    fig.update_layout(yaxis_title="Value", coloraxis_showscale=False, **_STYLE)
+    return fig
+
+
+def legacy_pie():
+    fig = go.Figure(data=[go.Pie(labels=list(ALLOCATION.keys()), values=list(ALLOCATION.values()), hole=.3,
+                                 marker=dict(colors=['#1e3a8a', '#3b82f6', '#60a5fa', '#93c5fd', '#fde68a']))])
+    fig.update_layout(title="Recommended Asset Allocation", height=300, paper_bgcolor='rgba(0,0,0,0)',
+                      plot_bgcolor='rgba(0,0,0,0)', font=dict(color='#1e3a8a'))
+    return fig
+
+
+CASES = [
+    ("waterfall", legacy_waterfall, lambda: charts.create_cash_flow_waterfall(INCOME, EXPENSES, DEBT)),
+    ("gauge", legacy_gauge, lambda: charts.create_emergency_fund_gauge(SAVINGS / EXPENSES)),
+    ("composition bar", legacy_composition, lambda: charts.create_composition_bar(INCOME, EXPENSES, DEBT, SAVINGS)),
+    ("ratios bar", legacy_ratios, lambda: charts.create_ratios_bar(EXPENSES / INCOME, DEBT / INCOME, SAVINGS / EXPENSES)),
+    ("allocation pie", legacy_pie, lambda: charts.create_allocation_pie(ALLOCATION)),
+]
+
+
+def _as_streamlit_would(build):
+    figure = plotly.tools.return_figure_from_figure_or_data(build(), validate_figure=True)
+    return pio.to_json(figure, validate=False)
+
+
+def _time(build, repeat):
+    _as_streamlit_would(build)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        spec = _as_streamlit_would(build)
+    return (time.perf_counter() - started) / repeat * 1000, len(spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'chart':<16}{'legacy ms':>11}{'builder ms':>12}{'speedup':>9}{'legacy B':>10}{'builder B':>11}")
+    totals = [0.0, 0.0]
+    for name, legacy, builder in CASES:
+        legacy_ms, legacy_bytes = _time(legacy, args.repeat)
+        builder_ms, builder_bytes = _time(builder, args.repeat)
+        totals[0] += legacy_ms
+        totals[1] += builder_ms
+        print(f"{name:<16}{legacy_ms:>11.2f}{builder_ms:>12.2f}{legacy_ms / builder_ms:>8.1f}x"
+              f"{legacy_bytes:>10}{builder_bytes:>11}")
+    print(f"{'all charts':<16}{totals[0]:>11.2f}{totals[1]:>12.2f}{totals[0] / totals[1]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
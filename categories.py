@@ -0,0 +1,120 @@
+"""
+Merchant categorizer for imported bank transactions.
+
+Descriptions are split into lower-case word tokens and matched against a
+trie built once from CATEGORY_KEYWORDS and GENERIC_KEYWORDS, so one pass
+over the tokens finds every keyword (multi-word ones such as "whole foods"
+included) no matter how many keywords there are. Merchant names and
+phrases rank first, the longest at the earliest position winning, which
+lets "uber eats" beat "uber". Generic words such as "market" or "bar" only
+decide when nothing more specific matched; the last one wins, since the
+kind of business usually ends the name ("Blue Water Grill"). Statements
+repeat the same merchants constantly, so categorize_series() normalizes
+descriptions (store numbers and dates drop out), classifies each distinct
+merchant once and caches the result across imports.
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+OTHER = "Other"
+CACHE_SIZE = 1 << 16
+
+CATEGORY_KEYWORDS = {
+    "Housing": ["rent", "landlord", "property management", "hoa", "apartments", "home depot", "lowes"],
+    "Utilities": ["electric", "water bill", "water dept", "utility", "utilities", "pg e", "con edison",
+                  "comcast", "xfinity", "verizon", "at t", "t mobile", "metro pcs", "spectrum", "internet"],
+    "Groceries": ["grocery", "groceries", "supermarket", "farmers market", "food market", "whole foods",
+                  "trader joe", "kroger", "safeway", "aldi", "costco", "publix", "wegmans", "heb", "instacart"],
+    "Dining": ["restaurant", "cafe", "coffee", "starbucks", "mcdonalds", "mcdonald", "chipotle", "pizza",
+               "burger", "doordash", "grubhub", "uber eats", "postmates", "dunkin", "subway", "bar grill",
+               "bar and grill", "sports bar", "wine bar"],
+    "Transport": ["uber", "lyft", "taxi", "shell", "chevron", "exxon", "bp", "fuel", "gas station", "parking",
+                  "transit", "metro card", "toll", "dmv"],
+    "Shopping": ["amazon", "amzn", "target", "walmart", "best buy", "ebay", "etsy", "ikea", "macys",
+                 "nordstrom", "zara", "shein"],
+    "Subscriptions": ["netflix", "spotify", "hulu", "disney plus", "hbo", "apple com bill", "youtube premium",
+                      "prime video", "audible", "patreon", "subscription"],
+    "Entertainment": ["cinema", "amc", "theatre", "theater", "steam", "playstation", "xbox", "ticketmaster",
+                      "concert"],
+    "Health": ["pharmacy", "cvs", "walgreens", "clinic", "dental", "dentist", "hospital", "medical", "gym",
+               "fitness", "planet fitness"],
+    "Insurance": ["insurance", "geico", "state farm", "progressive", "allstate"],
+    "Travel": ["airline", "airlines", "airbnb", "hotel", "marriott", "hilton", "expedia", "booking com"],
+}
+
+# Words that also appear in unrelated merchant names ("Bar Harbor Shell",
+# "Metro PCS"); they only count when no keyword above matches
+GENERIC_KEYWORDS = {
+    "Groceries": ["market"],
+    "Dining": ["bar", "grill"],
+    "Utilities": ["energy", "water"],
+    "Transport": ["metro"],
+}
+
+# Categories where cutting back is realistic; the rest are treated as fixed
+DISCRETIONARY = ("Dining", "Shopping", "Subscriptions", "Entertainment", "Travel")
+
+_TOKEN = re.compile(r"[a-z]+")
+_END = object()
+
+
+def _tokens(text):
+    return _TOKEN.findall(text.lower())
+
+
+def _build_trie(keywords, generic):
+    """Nested token dicts; a keyword's last node maps _END to (category, is generic)"""
+    root = {}
+    for weak, table in ((False, keywords), (True, generic)):
+        for category, words in table.items():
+            for word in words:
+                node = root
+                for token in _tokens(word):
+                    node = node.setdefault(token, {})
+                node.setdefault(_END, (category, weak))
+    return root
+
+
+_TRIE = _build_trie(CATEGORY_KEYWORDS, GENERIC_KEYWORDS)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def categorize(description):
+    """Category for one transaction description, OTHER when nothing matches"""
+    tokens = _tokens(description)
+    generic = OTHER
+    for start in range(len(tokens)):
+        node, match = _TRIE, None
+        for token in tokens[start:]:
+            node = node.get(token)
+            if node is None:
+                break
+            match = node.get(_END, match)
+        if match is not None:
+            category, weak = match
+            if not weak:
+                return category
+            generic = category
+    return generic
+
+
+def categorize_series(descriptions):
+    """Vectorized categorize(): each distinct merchant is classified once"""
+    normalized = descriptions.fillna("").astype(str).str.lower().str.replace(r"[^a-z]+", " ", regex=True)
+    codes, uniques = pd.factorize(normalized.str.strip())
+    names = [categorize(text) for text in uniques]
+    return pd.Series(pd.Index(names).take(codes), index=descriptions.index)
+
+
+def reduction_targets(spending, savings_goal):
+    """
+    Splits a monthly savings goal across DISCRETIONARY categories in
+    proportion to their spend (never more than the category itself)
+    """
+    flexible = {name: amount for name, amount in spending.items() if name in DISCRETIONARY}
+    total = sum(flexible.values())
+    if total <= 0 or savings_goal <= 0:
+        return {}
+    return {name: min(amount, savings_goal * amount / total) for name, amount in flexible.items()}
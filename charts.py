@@ -0,0 +1,318 @@
+"""
+Figure builders for every dashboard chart.
+
+Figures are written as plain plotly dicts and wrapped with
+go.Figure(..., _validate=False), which skips plotly's per-property
+validation. Every figure carries the small "ezhalni" template, so plotly
+does not inject its large default template, and THEME_LAYOUT is merged
+into each layout so the look survives Streamlit replacing the template on
+the client. bench_charts.py measures the saving.
+"""
+import plotly.graph_objects as go
+import plotly.io as pio
+
+import peers
+
+# ----------------------------------------
+# 🎨 THEME
+# ----------------------------------------
+NAVY = "#1e3a8a"
+BLUE = "#3b82f6"
+SKY = "#60a5fa"
+LIGHT_BLUE = "#93c5fd"
+GOLD = "#fde68a"
+BACKGROUND = "#F0F8FF"
+FONT_FAMILY = "Poppins"
+
+THEME_LAYOUT = {
+    "font": {"size": 13, "family": FONT_FAMILY, "color": NAVY},
+    "title": {"font": {"size": 18, "color": NAVY, "family": FONT_FAMILY}},
+    "plot_bgcolor": BACKGROUND,
+    "paper_bgcolor": BACKGROUND,
+    "margin": {"l": 40, "r": 40, "t": 60, "b": 40},
+    "height": 400,
+}
+
+pio.templates["ezhalni"] = go.layout.Template(layout={"colorway": [NAVY, BLUE, SKY, LIGHT_BLUE, GOLD]})
+# The registered template as a plain dict, converted once; builders embed it unvalidated
+_TEMPLATE = pio.templates["ezhalni"].to_plotly_json()
+
+
+def _layout(title=None, title_size=None, **overrides):
+    """THEME_LAYOUT with overrides; nested dicts are merged one level deep"""
+    layout = {key: dict(value) if isinstance(value, dict) else value for key, value in THEME_LAYOUT.items()}
+    layout["title"] = {"font": dict(THEME_LAYOUT["title"]["font"])}
+    if title is not None:
+        layout["title"]["text"] = title
+    if title_size is not None:
+        layout["title"]["font"]["size"] = title_size
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(layout.get(key), dict):
+            layout[key] = {**layout[key], **value}
+        else:
+            layout[key] = value
+    layout["template"] = _TEMPLATE
+    return layout
+
+
+def _figure(data, layout):
+    return go.Figure({"data": data, "layout": layout}, _validate=False)
+
+
+# ----------------------------------------
+# 💰 CASH FLOW WATERFALL CHART FUNCTION
+# ----------------------------------------
+def create_cash_flow_waterfall(income, expenses, debt, title="💰 Monthly Cash Flow Overview", y_range=None):
+    """y_range fixes the axis, so side-by-side scenarios share one scale"""
+    categories = ["Income", "Expenses", "Debt Payment", "Available Cash"]
+    amounts = [income, -expenses, -debt, income - expenses - debt]
+    return _figure(
+        [{
+            "type": "waterfall",
+            "x": categories,
+            "y": amounts,
+            "textposition": "outside",
+            "text": [f"${x:,.0f}" for x in amounts],
+            "connector": {"line": {"color": BLUE}},
+            "increasing": {"marker": {"color": BLUE}},
+            "decreasing": {"marker": {"color": NAVY}},
+            "totals": {"marker": {"color": GOLD}},
+        }],
+        _layout(
+            title,
+            yaxis={"title": {"text": "Amount ($)"}, **({"range": list(y_range)} if y_range else {})},
+            showlegend=False,
+        ),
+    )
+
+
+# 💰 Emergency Fund Coverage Gauge with Dynamic Status
+def create_emergency_fund_gauge(emergency_months):
+    if emergency_months < 3:
+        status = "🔴 At Risk"
+        gauge_color = ["#ef4444", GOLD]
+    elif 3 <= emergency_months < 6:
+        status = "🟡 Stable"
+        gauge_color = [GOLD, "#10b981"]
+    else:
+        status = "🟢 Secure"
+        gauge_color = ["#10b981", SKY]
+
+    return _figure(
+        [{
+            "type": "indicator",
+            "mode": "gauge+number",
+            "value": emergency_months,
+            "title": {
+                "text": f"💰 Emergency Fund Coverage (months)<br><span style='font-size:18px'>{status}</span>",
+                "font": {"size": 18, "color": NAVY, "family": FONT_FAMILY},
+            },
+            "number": {"font": {"size": 50, "color": NAVY, "family": FONT_FAMILY}},
+            "gauge": {
+                "axis": {
+                    "range": [0, 6],
+                    "tickfont": {"size": 12, "color": NAVY, "family": FONT_FAMILY},
+                },
+                "bar": {"color": NAVY},
+                "steps": [
+                    {"range": [0, 3], "color": gauge_color[0]},
+                    {"range": [3, 6], "color": gauge_color[1]},
+                ],
+                "threshold": {
+                    "line": {"color": "#10b981", "width": 4},
+                    "thickness": 0.75,
+                    "value": 4.5,
+                },
+            },
+        }],
+        _layout(),
+    )
+
+
+# 📈 Peer Distribution with the user's position marked
+def create_peer_distribution_chart(edges, counts, value, label, percentile):
+    edges = [float(e) for e in edges]
+    centers = [(a + b) / 2 for a, b in zip(edges[:-1], edges[1:])]
+    marker_x = min(max(value, edges[0]), edges[-1])
+    return _figure(
+        [{
+            "type": "bar",
+            "x": centers,
+            "y": [int(c) for c in counts],
+            "width": edges[1] - edges[0],
+            "marker": {"color": LIGHT_BLUE},
+            "hovertemplate": "$%{x:,.0f}: %{y:,} users<extra></extra>",
+        }],
+        _layout(
+            f"{label} Distribution",
+            title_size=16,
+            xaxis={"title": {"text": f"{label} ($)"}},
+            yaxis={"title": {"text": "Users"}},
+            font={"size": 12},
+            height=300,
+            margin={"r": 20, "t": 50},
+            showlegend=False,
+            shapes=[{
+                "type": "line", "xref": "x", "yref": "paper",
+                "x0": marker_x, "x1": marker_x, "y0": 0, "y1": 1,
+                "line": {"color": NAVY, "width": 3},
+            }],
+            annotations=[{
+                "x": marker_x, "y": 1, "xref": "x", "yref": "paper",
+                "xanchor": "left", "yanchor": "top", "showarrow": False,
+                "text": f"You ({peers.ordinal(percentile)})",
+                "font": {"color": NAVY, "family": FONT_FAMILY},
+            }],
+        ),
+    )
+
+
+# ----------------------------------------
+# 📊 PAGE CHARTS
+# ----------------------------------------
+def create_composition_bar(income, expenses, debt, savings):
+    colors = {"Income": NAVY, "Expenses": BLUE, "Debt": SKY, "Savings": GOLD}
+    amounts = {"Income": income, "Expenses": expenses, "Debt": debt, "Savings": savings}
+    return _figure(
+        [
+            {
+                "type": "bar",
+                "name": category,
+                "legendgroup": category,
+                "offsetgroup": category,
+                "x": [category],
+                "y": [amounts[category]],
+                "marker": {"color": color},
+                "hovertemplate": "Category=%{x}<br>Amount=%{y}<extra></extra>",
+            }
+            for category, color in colors.items()
+        ],
+        _layout(
+            "Your Financial Composition",
+            xaxis={"title": {"text": "Category"}, "categoryorder": "array", "categoryarray": list(colors)},
+            yaxis={"title": {"text": "Amount ($)"}},
+            legend={"title": {"text": "Category"}},
+            barmode="relative",
+            showlegend=True,
+        ),
+    )
+
+
+def create_ratios_bar(expense_ratio, loan_to_income, emergency_months):
+    values = [expense_ratio, loan_to_income, emergency_months]
+    return _figure(
+        [{
+            "type": "bar",
+            "x": ["Expense Ratio", "Loan-to-Income", "Emergency Months"],
+            "y": values,
+            "marker": {"color": values, "coloraxis": "coloraxis"},
+            "hovertemplate": "Metric=%{x}<br>Value=%{y}<extra></extra>",
+        }],
+        _layout(
+            "📊 Financial Ratios Overview",
+            xaxis={"title": {"text": "Metric"}},
+            yaxis={"title": {"text": "Value"}},
+            coloraxis={
+                "colorscale": [[0.0, LIGHT_BLUE], [0.5, BLUE], [1.0, NAVY]],
+                "showscale": False,
+            },
+        ),
+    )
+
+
+def create_allocation_pie(allocation):
+    return _figure(
+        [{
+            "type": "pie",
+            "labels": list(allocation.keys()),
+            "values": list(allocation.values()),
+            "hole": .3,
+            "marker": {"colors": [NAVY, BLUE, SKY, LIGHT_BLUE, GOLD]},
+        }],
+        _layout(
+            "Recommended Asset Allocation",
+            height=300,
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+        ),
+    )
+
+
+def create_backtest_fan_chart(bands, monthly, step=3):
+    """10th-90th percentile band and median of historical outcomes, one point per `step` months"""
+    months = range(step - 1, bands.shape[1], step)
+    years = [round((m + 1) / 12, 2) for m in months]
+    low, median, high = ([round(float(band[m])) for m in months] for band in bands)
+    return _figure(
+        [
+            {"type": "scatter", "x": years, "y": high, "mode": "lines", "name": "90th percentile",
+             "line": {"color": LIGHT_BLUE, "width": 0}, "hovertemplate": "$%{y:,.0f}<extra>Good case</extra>"},
+            {"type": "scatter", "x": years, "y": low, "mode": "lines", "name": "10th–90th percentile",
+             "fill": "tonexty", "fillcolor": "rgba(147,197,253,0.45)", "line": {"color": LIGHT_BLUE, "width": 0},
+             "hovertemplate": "$%{y:,.0f}<extra>Bad case</extra>"},
+            {"type": "scatter", "x": years, "y": median, "mode": "lines", "name": "Median",
+             "line": {"color": NAVY, "width": 3}, "hovertemplate": "$%{y:,.0f}<extra>Median</extra>"},
+            {"type": "scatter", "x": years, "y": [round(monthly * (m + 1)) for m in months], "mode": "lines",
+             "name": "Contributed", "line": {"color": GOLD, "width": 2, "dash": "dash"},
+             "hovertemplate": "$%{y:,.0f}<extra>Contributed</extra>"},
+        ],
+        _layout(
+            "⏳ Historical Outcomes of This Allocation",
+            title_size=16,
+            xaxis={"title": {"text": "Years investing"}},
+            yaxis={"title": {"text": "Portfolio value ($)"}},
+            legend={"orientation": "h", "y": -0.2},
+            height=360,
+        ),
+    )
+
+
+# 🎚️ Input sensitivity: health score change from nudging each input down and up
+_INPUT_FORMATS = {
+    "age": "{:.0f}",
+    "loan_interest_rate_pct": "{:.1f}%",
+    "loan_term_months": "{:.0f} mo",
+}
+
+
+def input_text(field, value):
+    """A payload field's value as the widgets show it"""
+    return _INPUT_FORMATS.get(field, "${:,.0f}").format(value)
+
+
+def create_sensitivity_tornado(analysis):
+    """Tornado of sensitivity.analyze() rows, largest swing on top, bars drawn from the base score"""
+    base = analysis["base"]["health_score"]
+    rows = analysis["rows"][::-1]
+    traces = []
+    for direction, name, color in (("down", "Lower input", SKY), ("up", "Higher input", NAVY)):
+        outcomes = [row[direction] for row in rows]
+        traces.append({
+            "type": "bar",
+            "orientation": "h",
+            "name": name,
+            "y": [row["label"] for row in rows],
+            "x": [o["health_score"] - base if o else 0 for o in outcomes],
+            "base": base,
+            "marker": {"color": color},
+            "customdata": [
+                [input_text(row["field"], o["value"]), o["health_score"],
+                 o["prediction"] + (" ⚠️ flips" if o["flips"] else "")] if o else ["can't move", base, ""]
+                for row, o in zip(rows, outcomes)
+            ],
+            "hovertemplate": "%{y} at %{customdata[0]}: score %{customdata[1]} (%{x:+.0f})<br>%{customdata[2]}"
+                             "<extra>" + name + "</extra>",
+        })
+    return _figure(
+        traces,
+        _layout(
+            "🎚️ What Moves Your Health Score",
+            xaxis={"title": {"text": "Health score"}},
+            barmode="overlay",
+            shapes=[{"type": "line", "xref": "x", "yref": "paper", "x0": base, "x1": base, "y0": 0, "y1": 1,
+                     "line": {"color": NAVY, "width": 2, "dash": "dot"}}],
+            legend={"orientation": "h", "y": -0.2},
+            margin={"l": 110},
+            height=420,
+        ),
+    )
@@ -0,0 +1,170 @@
+"""
+Headless Ezhalni runner for batch scoring.
+
+Reads profiles (JSON objects keyed by the seven payload fields) from files or
+stdin, computes the local metrics on a process pool, calls the API with a
+bounded number of concurrent requests and streams one JSON line per profile
+to stdout, in input order.
+
+    python cli.py profiles.jsonl --endpoints predict,cluster --concurrency 8
+    cat profiles.json | python cli.py - --workers 4
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+import backend
+
+ENDPOINTS = {
+    "predict": backend.predict,
+    "cluster": backend.cluster,
+    "plan": backend.plan,
+}
+
+
+# ----------------------------------------
+# 📥 PROFILE READING
+# ----------------------------------------
+def _iter_stream(stream):
+    """Accepts a JSON array, a single JSON object or JSON lines"""
+    first = ""
+    for line in stream:
+        if line.strip():
+            first = line
+            break
+    if not first:
+        return
+    if first.lstrip().startswith("["):
+        for profile in json.loads(first + stream.read()):
+            yield profile
+        return
+    try:
+        yield json.loads(first)
+    except json.JSONDecodeError:
+        # A pretty-printed single object spans several lines
+        yield json.loads(first + stream.read())
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_profiles(paths):
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from _iter_stream(sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield from _iter_stream(f)
+
+
+# ----------------------------------------
+# ⚙️ SCORING
+# ----------------------------------------
+def _call_endpoints(payload, endpoints, timeout):
+    results, errors = {}, {}
+    for name in endpoints:
+        try:
+            if name == "plan" and not backend.is_plan_payload_valid(backend.build_plan_payload(payload)):
+                errors[name] = "age, income and expenses must be non-zero for /plan"
+                continue
+            results[name] = ENDPOINTS[name](payload, timeout=timeout)
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
+
+
+def _local_metrics(payload):
+    """(metrics, None) or (None, error): one bad row must not stop the pool's map"""
+    try:
+        return backend.compute_local_metrics(payload), None
+    except Exception as e:
+        return None, str(e)
+
+
+def score(profiles, endpoints, workers, concurrency, timeout, batch_size, out):
+    """Scores profiles batch by batch so memory stays bounded on large inputs"""
+    counts = {"profiles": 0, "errors": 0}
+    profiles = iter(profiles)
+    index = 0
+    with ProcessPoolExecutor(max_workers=workers) as cpu_pool, \
+            ThreadPoolExecutor(max_workers=concurrency) as io_pool:
+        while True:
+            batch = list(islice(profiles, batch_size))
+            if not batch:
+                break
+
+            payloads, records = [], []
+            for profile in batch:
+                record = {"index": index}
+                index += 1
+                try:
+                    payloads.append(backend.payload_from_profile(profile))
+                    record["input"] = payloads[-1]
+                except (TypeError, ValueError) as e:
+                    record["errors"] = {"input": str(e)}
+                records.append(record)
+
+            chunksize = max(1, len(payloads) // ((workers or os.cpu_count() or 1) * 4))
+            metrics = cpu_pool.map(_local_metrics, payloads, chunksize=chunksize)
+            calls = [io_pool.submit(_call_endpoints, p, endpoints, timeout) for p in payloads]
+            valid = iter(zip(metrics, calls))
+
+            for record in records:
+                if "input" in record:
+                    (record["metrics"], metrics_error), call = next(valid)
+                    results, errors = call.result()
+                    record.update(results)
+                    if metrics_error:
+                        errors["metrics"] = metrics_error
+                    if errors:
+                        record["errors"] = errors
+                counts["profiles"] += 1
+                counts["errors"] += "errors" in record
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score financial profiles without the dashboard")
+    parser.add_argument("paths", nargs="*", help="Profile files (JSON, JSON array or JSONL); '-' or none reads stdin")
+    parser.add_argument("--endpoints", default="predict",
+                        help="Comma-separated API calls per profile: predict, cluster, plan, or 'none'")
+    parser.add_argument("--api-url", default=None, help=f"Backend base URL (default {backend.API_URL})")
+    parser.add_argument("--transport", choices=("http", "async", "inprocess"), default=None,
+                        help=f"Backend transport (default {backend.TRANSPORT})")
+    parser.add_argument("--engine", default=None,
+                        help="Model engine for --transport inprocess, as package.module:attribute")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for local metrics")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum in-flight API requests")
+    parser.add_argument("--timeout", type=float, default=backend.DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    parser.add_argument("--batch-size", type=int, default=256, help="Profiles read ahead per batch")
+    args = parser.parse_args(argv)
+
+    endpoints = [] if args.endpoints == "none" else [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+    if args.api_url:
+        backend.API_URL = args.api_url.rstrip("/")
+    if args.transport or args.engine:
+        try:
+            backend.set_transport(backend.make_transport(args.transport or backend.TRANSPORT, args.engine or backend.ENGINE))
+        except (ImportError, AttributeError, ValueError) as e:
+            parser.error(str(e))
+
+    counts = score(
+        iter_profiles(args.paths), endpoints,
+        workers=args.workers, concurrency=max(1, args.concurrency),
+        timeout=args.timeout, batch_size=max(1, args.batch_size), out=sys.stdout,
+    )
+    print(f"Scored {counts['profiles']} profiles ({counts['errors']} with errors)", file=sys.stderr)
+    return 1 if counts["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""
+Local nearest-centroid assignment for the You vs Others page.
+
+The cluster definitions (centroids, scaling parameters and group stats) only
+change when the model is retrained, so they are fetched once from
+/cluster/definitions, kept per model version and revalidated with an ETag
+every DEFINITIONS_TTL seconds. Assignment itself is a vectorized distance
+computation, so a batch of profiles costs one matrix operation.
+"""
+import threading
+import time
+
+import numpy as np
+
+import backend
+
+DEFINITIONS_TTL = 3600
+COMPARED_FIELDS = {
+    "income": "monthly_income_usd",
+    "savings": "savings_usd",
+    "debt": "monthly_emi_usd",
+}
+
+
+class ClusterModel:
+    """Cluster definitions unpacked into arrays for one model version"""
+
+    def __init__(self, definitions):
+        self.version = definitions.get("model_version", "unknown")
+        self.features = list(definitions["features"])
+        self.tolerance = definitions.get("assessment_tolerance", 0.1)
+        self.clusters = definitions["clusters"]
+        self.mean = np.asarray(definitions["scaling"]["mean"], dtype=float)
+        self.scale = np.asarray(definitions["scaling"]["scale"], dtype=float)
+        centroids = np.asarray([c["centroid"] for c in self.clusters], dtype=float)
+        self.scaled_centroids = (centroids - self.mean) / self.scale
+
+    def assign(self, payloads):
+        """Returns the index of the nearest cluster for every payload"""
+        X = np.asarray([[p.get(f, 0) for f in self.features] for p in payloads], dtype=float)
+        X = (X - self.mean) / self.scale
+        # ||x - c||² = ||x||² - 2x·c + ||c||²; ||x||² is constant per row
+        distances = (self.scaled_centroids ** 2).sum(axis=1) - 2 * X @ self.scaled_centroids.T
+        return distances.argmin(axis=1)
+
+    def _assess(self, yours, average, lower_is_better=False):
+        if average and abs(yours - average) / average < self.tolerance:
+            return "Similar"
+        better = yours < average if lower_is_better else yours > average
+        return "Better" if better else "Worse"
+
+    def cluster_info(self, payload, index):
+        """Builds the same response shape as POST /cluster"""
+        c = self.clusters[index]
+        stats = c["group_stats"]
+        metrics = backend.compute_local_metrics(payload)
+        comparison = {"group_name": c["cluster_name"]}
+        for key, field in COMPARED_FIELDS.items():
+            yours = payload.get(field, 0)
+            comparison[key] = {
+                "yours": yours,
+                "group_average": stats[key],
+                "assessment": self._assess(yours, stats[key], lower_is_better=key == "debt"),
+            }
+        return {
+            "cluster_id": c["cluster_id"],
+            "cluster_name": c["cluster_name"],
+            "description": c["description"],
+            "health_status": c["health_status"],
+            "comparison": comparison,
+            "characteristics": {
+                "cash_flow": f"${metrics['cash_flow']:,.0f}",
+                "emergency_fund": f"{metrics['emergency_months']:.1f} months",
+                "expense_ratio": f"{metrics['expense_ratio'] * 100:.1f}%",
+                "debt_level": "Low" if metrics["loan_to_income"] < 0.15 else "High",
+            },
+            "model_version": self.version,
+        }
+
+
+# ----------------------------------------
+# 🗂️ DEFINITIONS CACHE
+# ----------------------------------------
+_models = {}  # model version -> ClusterModel
+_current = {"version": None, "checked_at": None, "refreshing": False}
+_lock = threading.Lock()
+
+
+def get_model(deadline=None):
+    """Current ClusterModel, or None when the API does not publish definitions"""
+    # The lock only guards the cache; the fetch itself runs outside it so a slow
+    # API never blocks other sessions past their own deadlines
+    with _lock:
+        checked_at = _current["checked_at"]
+        current = _models.get(_current["version"])
+        if checked_at is not None and time.monotonic() - checked_at < DEFINITIONS_TTL:
+            return current
+        if _current["refreshing"] and current is not None:
+            # Another session is revalidating; the last known version is fine meanwhile
+            return current
+        _current["refreshing"] = True
+    try:
+        definitions = backend.cluster_definitions(deadline=deadline)
+    except backend.DeadlineExceeded:
+        # Out of time (or cancelled) says nothing about the API; check again next call
+        with _lock:
+            _current["refreshing"] = False
+        raise
+    except Exception:
+        # Keep serving the last known version; retry after the TTL
+        with _lock:
+            _current.update(checked_at=time.monotonic(), refreshing=False)
+            return _models.get(_current["version"])
+    version = definitions.get("model_version", "unknown")
+    model = _models.get(version) or ClusterModel(definitions)
+    with _lock:
+        if version not in _models:
+            _models.clear()
+            _models[version] = model
+        _current.update(version=version, checked_at=time.monotonic(), refreshing=False)
+        return _models[version]
+
+
+def assign_batch(payloads, deadline=None):
+    """Cluster info for many profiles with a single distance computation"""
+    model = get_model(deadline)
+    if model is None:
+        return [backend.cluster(p, deadline=deadline) for p in payloads]
+    if not payloads:
+        return []
+    return [model.cluster_info(p, i) for p, i in zip(payloads, model.assign(payloads))]
+
+
+def cluster_info(payload, deadline=None):
+    """Drop-in replacement for backend.cluster() that assigns locally when it can"""
+    return assign_batch([payload], deadline)[0]
@@ -0,0 +1,187 @@
+"""
+Joint split of the monthly surplus between emergency fund, debt and investing.
+
+The Plan page's recommendations are sized independently. optimize_split()
+instead simulates every candidate split of the surplus (income - expenses
+- loan payment) on a SPLIT_STEP grid at once, month by month with numpy
+arrays, and picks the split with the lowest cost:
+
+    months until the emergency fund reaches its target
+    + (loan interest paid - investment growth) / monthly surplus
+
+so interest is weighed in months of surplus, and extra loan payments only
+win over investing while the loan rate beats EXPECTED_RETURN. Money for a
+finished goal rolls over: a full emergency fund's share is split between
+the loan and investing in the ratio of their shares, and a paid-off loan's
+share and freed payment go to the emergency fund, then investing.
+
+Results are cached per input, so reruns and page revisits are free; each
+caller gets its own copy, so changing one never reaches the cache.
+"""
+import copy
+from functools import lru_cache
+
+import numpy as np
+
+import backend
+
+SPLIT_STEP = 0.05
+HORIZON_MONTHS = 120
+EMERGENCY_TARGET_MONTHS = 6
+EXPECTED_RETURN = 0.06  # yearly, for the investing share
+
+
+def loan_balance(payment, rate_pct, term_months):
+    """Outstanding principal implied by an annuity payment, rate and remaining term"""
+    if payment <= 0 or term_months <= 0:
+        return 0.0
+    rate = rate_pct / 100 / 12
+    if rate == 0:
+        return float(payment * term_months)
+    return float(payment * (1 - (1 + rate) ** -term_months) / rate)
+
+
+def split_grid(step=SPLIT_STEP, emergency=True, debt=True):
+    """(n, 3) array of emergency/debt/investing shares that sum to 1"""
+    steps = int(round(1 / step))
+    shares = [
+        (i / steps, j / steps, (steps - i - j) / steps)
+        for i in range(steps + 1 if emergency else 1)
+        for j in range(steps + 1 - i if debt else 1)
+    ]
+    return np.array(shares)
+
+
+def simulate(shares, surplus, savings, target, payment, balance, rate_pct, months=HORIZON_MONTHS):
+    """Month-by-month outcome for every row of shares, as a dict of arrays"""
+    ef_share, debt_share, invest_share = (shares[:, k] * surplus for k in range(3))
+    n = len(shares)
+    loan_rate = rate_pct / 100 / 12
+    growth = (1 + EXPECTED_RETURN) ** (1 / 12) - 1
+    # Without a balance the payment is just a fixed expense that never frees up
+    payment = payment if balance > 0 else 0.0
+    # A full emergency fund's share follows the debt:investing ratio (all to debt if both are 0)
+    rest = debt_share + invest_share
+    spill_to_debt = np.divide(debt_share, rest, out=np.ones(n), where=rest > 0)
+
+    ef = np.full(n, float(savings))
+    loan = np.full(n, float(balance))
+    invested = np.zeros(n)
+    contributed = np.zeros(n)
+    interest = np.zeros(n)
+    never = months + 1
+    safe_at = np.where(ef >= target, 0, never)
+    debt_free_at = np.where(loan <= 0, 0, never)
+
+    for month in range(1, months + 1):
+        has_loan = loan > 0
+        owed = loan * loan_rate
+        interest += owed
+        loan += owed
+
+        # A paid-off loan frees its share and the regular payment
+        to_ef = ef_share + np.where(has_loan, 0.0, debt_share + payment)
+        ef_in = np.minimum(to_ef, np.maximum(target - ef, 0.0))
+        spill = to_ef - ef_in
+        to_debt = np.where(has_loan, spill * spill_to_debt, 0.0)
+        pay = np.where(has_loan, payment + debt_share, 0.0) + to_debt
+        paid = np.minimum(pay, loan)
+        invest_in = invest_share + (spill - to_debt) + (pay - paid)
+
+        ef += ef_in
+        loan -= paid
+        invested = invested * (1 + growth) + invest_in
+        contributed += invest_in
+
+        safe_at = np.where((safe_at == never) & (ef >= target - 0.005), month, safe_at)
+        debt_free_at = np.where((debt_free_at == never) & (loan <= 0.005), month, debt_free_at)
+
+    return {
+        "safe_at": safe_at,
+        "debt_free_at": debt_free_at,
+        "interest": interest,
+        "invested": invested,
+        "growth": invested - contributed,
+    }
+
+
+def _cost(outcome, surplus):
+    return outcome["safe_at"] + (outcome["interest"] - outcome["growth"]) / surplus
+
+
+def _summary(outcome, index, months):
+    def month(value):
+        return int(value) if value <= months else None
+
+    return {
+        "months_to_safety": month(outcome["safe_at"][index]),
+        "debt_free_month": month(outcome["debt_free_at"][index]),
+        "interest_paid": round(float(outcome["interest"][index]), 2),
+        "invested": round(float(outcome["invested"][index]), 2),
+    }
+
+
+@lru_cache(maxsize=1024)
+def _optimize(income, expenses, savings, payment, rate_pct, term_months, baseline):
+    surplus = income - expenses - payment
+    if surplus <= 0:
+        return None
+    target = expenses * EMERGENCY_TARGET_MONTHS
+    balance = loan_balance(payment, rate_pct, term_months)
+    shares = split_grid(emergency=savings < target, debt=balance > 0)
+    if baseline is not None:
+        shares = np.vstack([shares, baseline])
+    outcome = simulate(shares, surplus, savings, target, payment, balance, rate_pct)
+    cost = _cost(outcome, surplus)
+    candidates = len(shares) - (baseline is not None)
+    best = int(np.argmin(cost[:candidates]))
+    ef, debt, invest = (float(x) for x in shares[best])
+    return {
+        "surplus": surplus,
+        "shares": {"emergency_fund": ef, "debt": debt, "investing": invest},
+        "monthly": {
+            "emergency_fund": round(ef * surplus, 2),
+            "debt": round(debt * surplus, 2),
+            "investing": round(invest * surplus, 2),
+        },
+        **_summary(outcome, best, HORIZON_MONTHS),
+        "baseline": _summary(outcome, len(shares) - 1, HORIZON_MONTHS) if baseline is not None else None,
+        "candidates": candidates,
+    }
+
+
+def baseline_shares(recommendations, surplus):
+    """The API's independent recommendations (models.Recommendations) as shares of the surplus, or None"""
+    if recommendations is None or surplus <= 0:
+        return None
+    amounts = (
+        recommendations.emergency_fund.monthly_contribution,
+        recommendations.debt.extra_payment,
+        recommendations.investment.recommended_monthly,
+    )
+    total = sum(amounts)
+    if total <= 0:
+        return None
+    # Unassigned surplus is treated as invested so both plans spend the same money
+    scale = min(1.0, surplus / total)
+    ef, debt, _ = (a * scale / surplus for a in amounts)
+    return (ef, debt, 1.0 - ef - debt)
+
+
+def optimize_split(payload, recommendations=None):
+    """
+    Best emergency/debt/investing split of the monthly surplus for a
+    payload, compared with the API's recommendations when given; None when
+    there is no surplus to split; the result is the caller's to change
+    """
+    values = backend.payload_from_profile(payload)
+    income = float(values["monthly_income_usd"])
+    expenses = float(values["monthly_expenses_usd"])
+    payment = float(values["monthly_emi_usd"])
+    baseline = baseline_shares(recommendations, income - expenses - payment)
+    result = _optimize(
+        income, expenses, float(values["savings_usd"]), payment,
+        float(values["loan_interest_rate_pct"]), int(values["loan_term_months"]),
+        tuple(round(s, 6) for s in baseline) if baseline else None,
+    )
+    return copy.deepcopy(result)
@@ -0,0 +1,173 @@
+"""
+Keep-warm probes for the scale-to-zero Cloud Run backend.
+
+One scheduler thread per process (start() is idempotent, so every session
+can call it) sends GET /health at an adaptive cadence during business
+hours:
+
+- a probe is skipped when real backend traffic already happened within the
+  current interval, since that traffic keeps the instance warm;
+- a slow probe counts as a cold start and halves the interval, down to
+  MIN_INTERVAL; every COOL_PROBES warm probes in a row stretch it back
+  towards MAX_INTERVAL.
+
+Enable with EZHALNI_KEEP_WARM=1. Hours come from EZHALNI_KEEP_WARM_HOURS
+("08:00-20:00", or "22:00-06:00" for a window that runs past midnight) and
+EZHALNI_KEEP_WARM_DAYS ("mon-fri", the days the window starts on), in the
+timezone named by EZHALNI_KEEP_WARM_TZ (server local time when unset).
+"""
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, time as dtime
+from zoneinfo import ZoneInfo
+
+import backend
+
+ENABLED = os.environ.get("EZHALNI_KEEP_WARM", "0") == "1"
+BUSINESS_HOURS = os.environ.get("EZHALNI_KEEP_WARM_HOURS", "08:00-20:00")
+BUSINESS_DAYS = os.environ.get("EZHALNI_KEEP_WARM_DAYS", "mon-fri")
+TIMEZONE = os.environ.get("EZHALNI_KEEP_WARM_TZ")
+
+BASE_INTERVAL = float(os.environ.get("EZHALNI_KEEP_WARM_INTERVAL", "300"))
+MIN_INTERVAL = 60.0
+MAX_INTERVAL = 900.0
+COOL_PROBES = 6
+# A /health answer slower than this means the instance was started for us
+COLD_START_SECONDS = 2.0
+PROBE_TIMEOUT = 30
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _parse_hours(spec):
+    """(start, end); an end earlier than the start means the window runs past midnight"""
+    start, end = spec.split("-")
+    start, end = dtime.fromisoformat(start.strip()), dtime.fromisoformat(end.strip())
+    if start == end:
+        raise ValueError(f"Empty keep-warm window {spec!r}")
+    return start, end
+
+
+def _parse_days(spec):
+    days = set()
+    for part in spec.lower().split(","):
+        first, _, last = part.strip().partition("-")
+        i, j = DAYS.index(first), DAYS.index(last or first)
+        days.update(DAYS[k % 7] for k in range(i, j + 1 if j >= i else j + 8))
+    return days
+
+
+class KeepWarmScheduler:
+    def __init__(self, hours=BUSINESS_HOURS, days=BUSINESS_DAYS, timezone=TIMEZONE,
+                 interval=BASE_INTERVAL, clock=time.monotonic, now=None):
+        self.hours = _parse_hours(hours)
+        self.days = _parse_days(days)
+        self.tz = ZoneInfo(timezone) if timezone else None
+        self.interval = interval
+        self.clock = clock
+        self._now = now or (lambda: datetime.now(self.tz))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._warm_streak = 0
+        self.stats = {
+            "probes": 0,
+            "skipped_traffic": 0,
+            "skipped_off_hours": 0,
+            "failures": 0,
+            "cold_starts": 0,
+            "last_probe_seconds": None,
+        }
+        self.cold_start_events = deque(maxlen=100)
+
+    def in_business_hours(self):
+        now = self._now()
+        start, end = self.hours
+        if start < end:
+            return DAYS[now.weekday()] in self.days and start <= now.time() < end
+        # Overnight window ("22:00-06:00"): the small hours belong to the previous day's window
+        if now.time() >= start:
+            return DAYS[now.weekday()] in self.days
+        return now.time() < end and DAYS[now.weekday() - 1] in self.days
+
+    def tick(self):
+        """Makes one probe decision; returns 'probe', 'traffic', 'off_hours' or 'failed'"""
+        if not self.in_business_hours():
+            self._bump("skipped_off_hours")
+            return "off_hours"
+        last = backend.last_request_at()
+        if last is not None and self.clock() - last < self.interval:
+            self._bump("skipped_traffic")
+            return "traffic"
+
+        started = self.clock()
+        try:
+            status_code, _ = backend.get_health(timeout=PROBE_TIMEOUT, record=False)
+        except Exception:
+            status_code = None
+        elapsed = self.clock() - started
+        with self._lock:
+            self.stats["probes"] += 1
+            self.stats["last_probe_seconds"] = round(elapsed, 3)
+            if status_code != 200:
+                self.stats["failures"] += 1
+                return "failed"
+            if elapsed >= COLD_START_SECONDS:
+                self._record_cold_start(elapsed)
+            else:
+                self._warm_streak += 1
+                if self._warm_streak >= COOL_PROBES:
+                    self._warm_streak = 0
+                    self.interval = min(MAX_INTERVAL, self.interval * 1.5)
+        return "probe"
+
+    def _record_cold_start(self, elapsed):
+        self.stats["cold_starts"] += 1
+        self.cold_start_events.append({"at": self._now().isoformat(), "seconds": round(elapsed, 3)})
+        self._warm_streak = 0
+        self.interval = max(MIN_INTERVAL, self.interval / 2)
+
+    def _bump(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def run(self):
+        while not self._stop.is_set():
+            self.tick()
+            self._stop.wait(self.interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "interval_seconds": self.interval,
+                "cold_start_events": list(self.cold_start_events),
+            }
+
+
+# ----------------------------------------
+# 🧵 PROCESS-WIDE SCHEDULER
+# ----------------------------------------
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start(force=False):
+    """Starts the scheduler once per process; a no-op unless enabled"""
+    global _scheduler
+    if not (ENABLED or force):
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = KeepWarmScheduler()
+            threading.Thread(target=_scheduler.run, name="ezhalni-keep-warm", daemon=True).start()
+        return _scheduler
+
+
+def stats():
+    with _scheduler_lock:
+        return _scheduler.snapshot() if _scheduler else {"enabled": False}
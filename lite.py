@@ -0,0 +1,497 @@
+"""
+Low-bandwidth "lite" mode: static SVG charts and no decorative motion.
+
+On slow links the interactive charts are the heaviest part of a rerun:
+the figure JSON plus, on first use, the plotly.js bundle the browser has
+to download and run. In lite mode pages show the same figures as static
+SVG images, rendered here from the plain dicts charts.py builds, and the
+pages' inline CSS loses its animations and transitions.
+
+A session starts in lite mode when the browser asks to save data
+(Save-Data: on) or reports a slow link through the ECT / Downlink client
+hints; the sidebar toggle switches it either way. EZHALNI_LITE_MODE=on or
+off replaces the detection for every new session.
+
+Rendered images are cached by figure content, so reruns and revisits with
+the same inputs reuse the markup. Coordinates are rounded to whole pixels,
+shared attributes sit on groups, labels on one baseline share a <text>,
+bars and gridlines are merged into single paths and whitespace is left
+out; with server.enableWebsocketCompression the markup is also deflated
+on the wire.
+"""
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from html import escape
+
+import charts
+import models
+
+MODE = os.environ.get("EZHALNI_LITE_MODE", "auto").lower()
+SLOW_CONNECTIONS = ("slow-2g", "2g", "3g")
+MIN_DOWNLINK_MBPS = 1.5
+
+WIDTH = 700
+CACHE_SIZE = 256
+# Plot area margins; wider than the plotly ones since labels are not auto-fitted
+_MARGIN = {"l": 72, "r": 24, "t": 64, "b": 56}
+# Left edge of horizontal bar plots, which have category labels there
+_HBAR_LEFT = 120
+_GRID = "#fff"
+_DASHES = {"dash": "6,4", "dot": "2,3", "dashdot": "6,3,2,3"}
+
+
+# ----------------------------------------
+# 📶 DETECTION
+# ----------------------------------------
+def detect(headers):
+    """Whether a session should start in lite mode, from its request headers"""
+    if MODE in ("on", "off"):
+        return MODE == "on"
+    headers = {str(k).lower(): str(v).lower() for k, v in (headers or {}).items()}
+    if headers.get("save-data") == "on" or headers.get("ect") in SLOW_CONNECTIONS:
+        return True
+    try:
+        return float(headers.get("downlink", "")) < MIN_DOWNLINK_MBPS
+    except ValueError:
+        return False
+
+
+# ----------------------------------------
+# 🎞️ MOTION
+# ----------------------------------------
+_KEYFRAMES = re.compile(r"@keyframes[^{]*\{(?:[^{}]*\{[^{}]*\})*[^{}]*\}")
+_MOTION = re.compile(r"(?<![\w-])(?:animation|transition)\s*:[^;}]*;?")
+
+
+def strip_motion(markup):
+    """Inline CSS/HTML without @keyframes, animation or transition rules"""
+    return _MOTION.sub("", _KEYFRAMES.sub("", markup))
+
+
+# ----------------------------------------
+# 🖼️ STATIC CHARTS
+# ----------------------------------------
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def chart_svg(fig):
+    """SVG markup for a charts.py figure (or its dict), cached by content"""
+    spec = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else fig
+    key = hashlib.sha1(json.dumps(spec, sort_keys=True, default=models.json_default).encode()).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    svg = render(spec)
+    with _cache_lock:
+        _cache[key] = svg
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return svg
+
+
+def render(spec):
+    """SVG for bar (vertical or horizontal), waterfall and line figures, a pie, or a gauge indicator"""
+    data, layout = spec.get("data", []), spec.get("layout", {})
+    height = int(layout.get("height") or 400)
+    font = layout.get("font", {})
+    types = {trace.get("type", "scatter") for trace in data}
+    if types == {"indicator"}:
+        body = _gauge(data[0], height)
+    else:
+        body = _title(layout.get("title", {}).get("text", ""), 32)
+        if types == {"pie"}:
+            body += _pie(data[0], height)
+        elif types == {"bar"} and all(trace.get("orientation") == "h" for trace in data):
+            body += _horizontal_bars(data, layout, height)
+        else:
+            body += _cartesian(data, layout, height)
+    # Inline SVG in HTML needs no xmlns and is as wide as its container by default
+    background = layout.get("paper_bgcolor", "#fff")
+    background = "" if _transparent(background) else f' style="background:{background}"'
+    return (
+        f'<svg viewBox="0 0 {WIDTH} {height}"{background} '
+        f'font-family="{escape(font.get("family", charts.FONT_FAMILY))},sans-serif" font-size="13" '
+        f'text-anchor="middle" fill="{font.get("color", charts.NAVY)}">'
+        + "".join(body) + "</svg>"
+    )
+
+
+def _transparent(color):
+    return color in ("transparent", "rgba(0,0,0,0)") or str(color).replace(" ", "").endswith(",0)")
+
+
+def _n(value):
+    return str(round(value))
+
+
+def _values(trace, key):
+    """A trace's data array; plotly treats a missing or null one as empty"""
+    return list(trace.get(key) or ())
+
+
+def _label(value):
+    value = round(value, 9)
+    for scale, suffix in ((1e6, "M"), (1e3, "k")):
+        if abs(value) >= scale:
+            return f"{value / scale:.3g}{suffix}"
+    return f"{value:.3g}"
+
+
+def _text(x, y, text, anchor=None, size=None, extra=""):
+    """<text>; anchor and size are inherited unless given"""
+    anchor = f' text-anchor="{anchor}"' if anchor else ""
+    size = f' font-size="{size}"' if size else ""
+    return f'<text x="{_n(x)}" y="{_n(y)}"{anchor}{size}{extra}>{escape(str(text))}</text>'
+
+
+def _group(attributes, children):
+    return [f"<g {attributes}>", *children, "</g>"] if children else []
+
+
+def _row(y, labels, attributes=""):
+    """One <text> for labels on a shared baseline: [(x, text)] as <tspan>s"""
+    spans = "".join(f'<tspan x="{_n(x)}">{escape(str(text))}</tspan>' for x, text in labels)
+    return [f'<text y="{_n(y)}"{attributes}>{spans}</text>'] if labels else []
+
+
+def _swatch(x, y, width, height, color):
+    return f'<path d="M{_n(x)} {_n(y)}h{width}v{height}h-{width}z" fill="{color}"/>'
+
+
+def _title(text, y, size=18):
+    lines = re.sub(r"<[^>]+>", "", re.sub(r"<br\s*/?>", "\n", text)).split("\n")
+    return [_text(WIDTH / 2, y + i * (size + 6), line, size=size if i == 0 else size - 2, extra=' font-weight="600"')
+            for i, line in enumerate(lines) if line.strip()]
+
+
+def _ticks(lo, hi, count=5):
+    if hi <= lo:
+        hi = lo + 1
+    raw = (hi - lo) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.floor(lo / step + 1e-9)
+    last = math.ceil(hi / step - 1e-9)
+    return [round(i * step, 9) for i in range(first, last + 1)]
+
+
+def _colors(trace, layout, count):
+    color = trace.get("marker", {}).get("color", charts.NAVY)
+    if not isinstance(color, (list, tuple)):
+        return [color] * count
+    if color and not isinstance(color[0], str):
+        scale = layout.get("coloraxis", {}).get("colorscale") or [[0, charts.LIGHT_BLUE], [1, charts.NAVY]]
+        lo, hi = min(color), max(color)
+        return [_scale_color(scale, (v - lo) / (hi - lo) if hi > lo else 1.0) for v in color]
+    return list(color)
+
+
+def _scale_color(scale, t):
+    for (t0, c0), (t1, c1) in zip(scale, scale[1:]):
+        if t <= t1:
+            f = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+            rgb = [round(int(c0[i:i + 2], 16) * (1 - f) + int(c1[i:i + 2], 16) * f) for i in (1, 3, 5)]
+            return "#" + "".join(f"{v:02x}" for v in rgb)
+    return scale[-1][1]
+
+
+def _cartesian(data, layout, height):
+    left, right, top, bottom = _MARGIN["l"], WIDTH - _MARGIN["r"], _MARGIN["t"], height - _MARGIN["b"]
+    named = [t for t in data if t.get("type", "scatter") == "scatter" and t.get("name")]
+    if named:
+        bottom -= 24
+
+    # Categories sit at 0.5, 1.5, ...; numeric axes use the data as is
+    categories = list(layout.get("xaxis", {}).get("categoryarray", ()))
+    categorical = any(isinstance(x, str) for t in data for x in _values(t, "x"))
+    if categorical:
+        for trace in data:
+            categories += [x for x in _values(trace, "x") if x not in categories]
+
+    def position(x):
+        return categories.index(x) + 0.5 if categorical else float(x)
+
+    bars, labels, connectors, lines = [], [], [], []
+    for trace in data:
+        kind = trace.get("type", "scatter")
+        xs, ys = _values(trace, "x"), _values(trace, "y")
+        if kind == "bar":
+            width = trace.get("width", 0.8 if categorical else None)
+            for x, y, color in zip(xs, ys, _colors(trace, layout, len(ys))):
+                # Null values are gaps, as in plotly
+                if x is not None and y is not None:
+                    bars.append((position(x), width, 0.0, float(y), color))
+        elif kind == "waterfall":
+            measures = trace.get("measure") or []
+            texts = trace.get("text") or []
+            level = 0.0
+            for i, (x, y) in enumerate(zip(xs, ys)):
+                y = y or 0
+                measure = measures[i] if i < len(measures) else "relative"
+                if measure == "total":
+                    base, end, key = 0.0, level, "totals"
+                elif measure == "absolute":
+                    base, end, key = 0.0, float(y), "totals"
+                else:
+                    base, end = level, level + float(y)
+                    key = "increasing" if y >= 0 else "decreasing"
+                color = trace.get(key, {}).get("marker", {}).get("color", charts.BLUE)
+                bars.append((position(x), 0.8, base, end, color))
+                if i < len(texts):
+                    labels.append((position(x), max(base, end), texts[i]))
+                if i + 1 < len(xs):
+                    connectors.append((position(x) + 0.4, position(xs[i + 1]) - 0.4, end))
+                level = end
+        elif kind == "scatter":
+            points = [(float(x), float(y)) for x, y in zip(xs, ys) if x is not None and y is not None]
+            if points:
+                lines.append((trace, points))
+
+    if categorical:
+        x0, x1 = 0.0, float(max(len(categories), 1))
+    else:
+        edges = [x for x, w, *_ in bars for x in (x - (w or 0) / 2, x + (w or 0) / 2)]
+        edges += [x for _, points in lines for x, _ in points]
+        x0, x1 = (min(edges), max(edges)) if edges else (0.0, 1.0)
+    values = [v for bar in bars for v in bar[2:4]] + [y for _, points in lines for _, y in points]
+    values += list(layout.get("yaxis", {}).get("range") or ())
+    lo, hi = min(values + [0.0]), max(values + [0.0])
+    if labels:
+        hi += (hi - lo) * 0.1
+    y_ticks = _ticks(lo, hi)
+    y0, y1 = y_ticks[0], y_ticks[-1]
+
+    def sx(x):
+        return left + (x - x0) / ((x1 - x0) or 1) * (right - left)
+
+    def sy(y):
+        return bottom - (y - y0) / ((y1 - y0) or 1) * (bottom - top)
+
+    out = []
+    if layout.get("plot_bgcolor", "#fff") != layout.get("paper_bgcolor", "#fff"):
+        out.append(f'<rect x="{left}" y="{top}" width="{right - left}" height="{_n(bottom - top)}" '
+                   f'fill="{layout.get("plot_bgcolor", "#fff")}"/>')
+    out.append(f'<path d="{"".join(f"M{left} {_n(sy(t))}H{right}" for t in y_ticks)}" stroke="{_GRID}"/>')
+    out += _group('font-size="11" text-anchor="end"',
+                  [_text(left - 6, sy(t) + 4, _label(t)) for t in y_ticks])
+    if categorical:
+        x_labels = [(sx(i + 0.5), c) for i, c in enumerate(categories)]
+    else:
+        x_labels = [(sx(t), _label(t)) for t in _ticks(x0, x1) if x0 <= t <= x1]
+    out += _row(bottom + 18, x_labels, ' font-size="11"')
+
+    # One path per bar color; touching bars from zero (histograms) become one step outline
+    shapes, zero = {}, round(sy(0))
+    for x, width, base, end, color in bars:
+        width = width or (x1 - x0) / max(len(bars), 1)
+        a, b = round(sx(x - width / 2)), round(sx(x + width / 2))
+        y, h = round(sy(max(base, end))), round(abs(sy(base) - sy(end)))
+        d = shapes.setdefault(color, [])
+        if base == 0 <= end and d and d[-1].endswith(f"H{a}V{zero}z"):
+            d[-1] = d[-1][:-len(f"V{zero}z")] + f"V{y}H{b}V{zero}z"
+        elif base == 0 <= end:
+            d.append(f"M{a} {zero}V{y}H{b}V{zero}z")
+        else:
+            d.append(f"M{a} {y}h{b - a}v{h}h{a - b}z")
+    out += [f'<path d="{"".join(d)}" fill="{color}"/>' for color, d in shapes.items()]
+    if connectors:
+        d = "".join(f"M{_n(sx(a))} {_n(sy(level))}H{_n(sx(b))}" for a, b, level in connectors)
+        out.append(f'<path d="{d}" stroke="{charts.BLUE}"/>')
+    out += _group('font-size="12"', [_text(sx(x), sy(y) - 6, text) for x, y, text in labels])
+
+    previous = None
+    for trace, points in lines:
+        points = [(round(sx(x)), round(sy(y))) for x, y in points]
+        if trace.get("fill") == "tonexty" and previous:
+            outline = points + previous[::-1]
+            out.append(f'<path d="{_polyline(outline)}z" fill="{trace.get("fillcolor", charts.LIGHT_BLUE)}"/>')
+        line = trace.get("line", {})
+        if line.get("width", 2):
+            dash = _DASHES.get(line.get("dash"))
+            dash = f' stroke-dasharray="{dash}"' if dash else ""
+            out.append(f'<path d="{_polyline(points)}" fill="none" stroke="{line.get("color", charts.NAVY)}" '
+                       f'stroke-width="{line.get("width", 2)}"{dash}/>')
+        previous = points
+
+    for shape in layout.get("shapes", ()):
+        if shape.get("type") == "line" and shape.get("xref") == "x":
+            x = _n(sx(shape["x0"]))
+            line = shape.get("line", {})
+            out.append(f'<path d="M{x} {top}V{_n(bottom)}" stroke="{line.get("color", charts.NAVY)}" '
+                       f'stroke-width="{line.get("width", 2)}"/>')
+    for note in layout.get("annotations", ()):
+        anchor = {"left": "start", "right": "end"}.get(note.get("xanchor"), "middle")
+        out.append(_text(sx(note["x"]) + (4 if anchor == "start" else 0), top + 14, note.get("text", ""),
+                         anchor=None if anchor == "middle" else anchor))
+
+    x_title = layout.get("xaxis", {}).get("title", {}).get("text")
+    y_title = layout.get("yaxis", {}).get("title", {}).get("text")
+    if x_title:
+        out.append(_text((left + right) / 2, bottom + 40, x_title))
+    if y_title:
+        middle = _n((top + bottom) / 2)
+        out.append(f'<text transform="translate(16 {middle}) rotate(-90)">{escape(y_title)}</text>')
+    out += _legend(named, height - 12)
+    return out
+
+
+def _horizontal_bars(data, layout, height):
+    """Category rows from the bottom up, as plotly draws them; each bar starts at its trace's base"""
+    left, right, top, bottom = _HBAR_LEFT, WIDTH - _MARGIN["r"], _MARGIN["t"], height - _MARGIN["b"]
+    named = [trace for trace in data if trace.get("name")]
+    if named:
+        bottom -= 24
+    categories = []
+    for trace in data:
+        categories += [y for y in _values(trace, "y") if y not in categories]
+    bars = [
+        (categories.index(y), float(trace.get("base", 0)), float(trace.get("base", 0)) + float(x), color)
+        for trace in data
+        for y, x, color in zip(_values(trace, "y"), _values(trace, "x"),
+                               _colors(trace, layout, len(_values(trace, "x"))))
+        if x is not None and y is not None
+    ]
+    lines = [shape["x0"] for shape in layout.get("shapes", ()) if shape.get("type") == "line" and shape.get("xref") == "x"]
+    values = [v for _, a, b, _ in bars for v in (a, b)] + lines
+    x_ticks = _ticks(min(values + [0.0]), max(values + [0.0]))
+    x0, x1 = x_ticks[0], x_ticks[-1]
+    band = (bottom - top) / max(len(categories), 1)
+
+    def sx(x):
+        return left + (x - x0) / ((x1 - x0) or 1) * (right - left)
+
+    def sy(row):
+        return bottom - (row + 0.5) * band
+
+    out = []
+    if layout.get("plot_bgcolor", "#fff") != layout.get("paper_bgcolor", "#fff"):
+        out.append(f'<rect x="{left}" y="{top}" width="{right - left}" height="{_n(bottom - top)}" '
+                   f'fill="{layout.get("plot_bgcolor", "#fff")}"/>')
+    out.append(f'<path d="{"".join(f"M{_n(sx(t))} {top}V{_n(bottom)}" for t in x_ticks)}" stroke="{_GRID}"/>')
+    out += _row(bottom + 18, [(sx(t), _label(t)) for t in x_ticks], ' font-size="11"')
+    out += _group('font-size="12" text-anchor="end"',
+                  [_text(left - 8, sy(row) + 4, category) for row, category in enumerate(categories)])
+    shapes = {}
+    for row, start, end, color in bars:
+        if start != end:
+            a, b = sorted((round(sx(start)), round(sx(end))))
+            y = round(sy(row) - band * 0.3)
+            shapes.setdefault(color, []).append(f"M{a} {y}h{b - a}v{round(band * 0.6)}h{a - b}z")
+    out += [f'<path d="{"".join(d)}" fill="{color}"/>' for color, d in shapes.items()]
+    for shape in layout.get("shapes", ()):
+        if shape.get("type") == "line" and shape.get("xref") == "x":
+            line = shape.get("line", {})
+            dash = _DASHES.get(line.get("dash"))
+            dash = f' stroke-dasharray="{dash}"' if dash else ""
+            out.append(f'<path d="M{_n(sx(shape["x0"]))} {top}V{_n(bottom)}" stroke="{line.get("color", charts.NAVY)}" '
+                       f'stroke-width="{line.get("width", 2)}"{dash}/>')
+    x_title = layout.get("xaxis", {}).get("title", {}).get("text")
+    if x_title:
+        out.append(_text((left + right) / 2, bottom + 40, x_title))
+    out += _legend([{"name": t["name"], "line": {"color": t.get("marker", {}).get("color")}} for t in named],
+                   height - 12)
+    return out
+
+
+def _polyline(points):
+    """Path through integer points, as relative steps after the first"""
+    (x, y), steps = points[0], []
+    for px, py in points[1:]:
+        steps.append(f"{px - x}{py - y:+d}".replace("+", " "))
+        x, y = px, py
+    # A minus sign already separates numbers
+    return f"M{points[0][0]} {points[0][1]}l" + "".join(s if s[0] == "-" or i == 0 else " " + s for i, s in enumerate(steps))
+
+
+def _legend(traces, y):
+    out, x = [], _MARGIN["l"]
+    for trace in traces:
+        line = trace.get("line", {})
+        color = line.get("color") if line.get("width", 2) else trace.get("fillcolor", line.get("color"))
+        out.append(_swatch(x, y - 9, 18, 8, color or charts.NAVY))
+        out.append(_text(x + 24, y, trace["name"]))
+        x += 40 + 7 * len(trace["name"])
+    return _group('font-size="12" text-anchor="start"', out)
+
+
+def _point(cx, cy, radius, degrees):
+    angle = math.radians(degrees)
+    return cx + radius * math.cos(angle), cy + radius * math.sin(angle)
+
+
+def _sector(cx, cy, outer, inner, start, end, color):
+    """Ring segment between two angles (degrees, clockwise from 3 o'clock)"""
+    end = min(end, start + 359.99)
+    large = int(end - start > 180)
+    (ax, ay), (bx, by) = _point(cx, cy, outer, start), _point(cx, cy, outer, end)
+    (cx2, cy2), (dx, dy) = _point(cx, cy, inner, end), _point(cx, cy, inner, start)
+    return (f'<path d="M{_n(ax)} {_n(ay)}A{_n(outer)} {_n(outer)} 0 {large} 1 {_n(bx)} {_n(by)}'
+            f'L{_n(cx2)} {_n(cy2)}A{_n(inner)} {_n(inner)} 0 {large} 0 {_n(dx)} {_n(dy)}Z" fill="{color}"/>')
+
+
+def _pie(trace, height):
+    labels, values = _values(trace, "labels"), [float(v or 0) for v in _values(trace, "values")]
+    colors = trace.get("marker", {}).get("colors") or [charts.NAVY]
+    total = sum(values) or 1.0
+    cx, cy = WIDTH * 0.4, (_MARGIN["t"] + height) / 2
+    outer = (height - _MARGIN["t"]) / 2 - 12
+    inner = outer * trace.get("hole", 0)
+    out, percents, angle = [], [], -90.0
+    # plotly's default: largest slice first, clockwise from 12 o'clock
+    for i in sorted(range(len(values)), key=lambda i: -values[i]):
+        sweep = values[i] / total * 360
+        out.append(_sector(cx, cy, outer, inner, angle, angle + sweep, colors[i % len(colors)]))
+        if sweep > 12:
+            x, y = _point(cx, cy, (outer + inner) / 2, angle + sweep / 2)
+            percents.append(_text(x, y + 4, f"{values[i] / total:.0%}"))
+        angle += sweep
+    legend = []
+    for row, label in enumerate(labels):
+        y = cy - 10 * len(labels) + row * 20
+        legend.append(_swatch(cx + outer + 40, y - 9, 12, 12, colors[row % len(colors)]))
+        legend.append(_text(cx + outer + 58, y + 2, label))
+    return out + _group('font-size="12" fill="#fff"', percents) + _group('text-anchor="start"', legend)
+
+
+def _gauge(trace, height):
+    gauge = trace.get("gauge", {})
+    lo, hi = gauge.get("axis", {}).get("range", [0, 1])
+    # Without a value plotly draws the dial only
+    value = trace.get("value")
+    title = trace.get("title", {})
+    out = _title(title.get("text", ""), 32, title.get("font", {}).get("size", 18))
+    cx, cy = WIDTH / 2, height * 0.8
+    outer = min(WIDTH * 0.32, cy - 120)
+    inner = outer * 0.55
+
+    def angle(v):
+        return 180 + (min(max(v, lo), hi) - lo) / ((hi - lo) or 1) * 180
+
+    for step in gauge.get("steps", ()):
+        a, b = step["range"]
+        out.append(_sector(cx, cy, outer, inner, angle(a), angle(b), step["color"]))
+    if value is not None and value > lo:
+        band = (outer - inner) * 0.25
+        out.append(_sector(cx, cy, outer - band, inner + band, 180, angle(value),
+                           gauge.get("bar", {}).get("color", charts.NAVY)))
+    threshold = gauge.get("threshold")
+    if threshold:
+        band = (outer - inner) * (1 - threshold.get("thickness", 0.75)) / 2
+        (ax, ay), (bx, by) = (_point(cx, cy, r, angle(threshold["value"])) for r in (inner + band, outer - band))
+        line = threshold.get("line", {})
+        out.append(f'<path d="M{_n(ax)} {_n(ay)}L{_n(bx)} {_n(by)}" stroke="{line.get("color", charts.NAVY)}" '
+                   f'stroke-width="{line.get("width", 2)}"/>')
+    ticks = [_text(x, y + 4, _label(tick)) for tick in _ticks(lo, hi, 6)
+             for x, y in [_point(cx, cy, outer + 14, angle(tick))]]
+    out += _group('font-size="12"', ticks)
+    if value is not None:
+        size = trace.get("number", {}).get("font", {}).get("size", 50)
+        out.append(_text(cx, cy - 4, f"{float(value):.3g}", size=size, extra=' font-weight="600"'))
+    return out
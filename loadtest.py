@@ -0,0 +1,292 @@
+"""
+Concurrent-session load test for one Streamlit replica.
+
+Starts the stand-in API and one app replica (serve.py) on free local ports,
+then for each level in --sessions runs that many simulated browser sessions
+at once. A session speaks the browser's own protocol (protobuf BackMsg /
+ForwardMsg over /_stcore/stream) and walks the journey
+
+    Home → Financial Input → Analyze → Insights → You vs others → Plan
+
+--journeys times, each on a fresh connection. A step is timed from sending
+the rerun to the server's script_finished message. Per level it reports
+step latency percentiles, journeys and reruns per second, and the
+replica's peak thread count and RSS (read from /proc, so Linux only), with
+RSS growth against the idle replica. Exits with status 1 when any step
+failed or showed an error.
+
+    python loadtest.py [--sessions 1,5,10,25] [--journeys 3] [--api-latency 0.05] [--json]
+
+It needs websockets and Streamlit's protobuf modules on top of the app's
+requirements; they are development-only and listed in requirements-dev.txt.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVE_PATH = os.path.join(BASE_DIR, "serve.py")
+
+STEPS = ("home", "financial_input", "analyze", "insights", "you_vs_others", "plan")
+PAGES = {
+    "home": "🏠 Home",
+    "financial_input": "📈 Financial Input",
+    "analyze": "📈 Financial Input",
+    "insights": "📊 Insights",
+    "you_vs_others": "💡 You vs others",
+    "plan": "🧠 Plan",
+}
+PERCENTILES = (50, 95, 99)
+STARTUP_TIMEOUT = 90
+STEP_TIMEOUT = 60
+SAMPLE_SECONDS = 0.25
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ----------------------------------------
+# 🖥️ REPLICA
+# ----------------------------------------
+class Replica:
+    """serve.py in a subprocess, pointed at the stand-in API"""
+
+    def __init__(self, api_url):
+        self.port = _free_port()
+        self.ready_port = _free_port()
+        env = dict(
+            os.environ,
+            EZHALNI_API_URL=api_url,
+            EZHALNI_TRANSPORT="http",
+            EZHALNI_KEEP_WARM="0",
+            EZHALNI_READY_PORT=str(self.ready_port),
+        )
+        self.process = subprocess.Popen(
+            [sys.executable, SERVE_PATH, "--server.headless", "true", "--server.port", str(self.port),
+             "--browser.gatherUsageStats", "false"],
+            cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.stream_url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def wait_ready(self, timeout=STARTUP_TIMEOUT):
+        """Blocks until warmup is done and Streamlit answers its health check"""
+        deadline = time.monotonic() + timeout
+        for url in (f"http://127.0.0.1:{self.ready_port}/ready", f"http://127.0.0.1:{self.port}/_stcore/health"):
+            while True:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"replica exited with status {self.process.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=1) as response:
+                        if response.status == 200:
+                            break
+                except OSError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"replica not ready after {timeout}s ({url})")
+                time.sleep(0.2)
+
+    def sample(self):
+        """(RSS bytes, thread count) of the replica process"""
+        values = {}
+        with open(f"/proc/{self.process.pid}/status", encoding="utf-8") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                values[key] = value.split()
+        return int(values["VmRSS"][0]) * 1024, int(values["Threads"][0])
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+# ----------------------------------------
+# 🧑‍💻 SIMULATED SESSIONS
+# ----------------------------------------
+def _rerun(ws, widgets):
+    """Sends one rerun; returns (seconds, new elements) once the script finishes"""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+    message = BackMsg()
+    message.rerun_script.query_string = ""
+    message.rerun_script.widget_states.widgets.extend(widgets)
+    started = time.perf_counter()
+    ws.send(message.SerializeToString())
+    elements = []
+    while True:
+        forward = ForwardMsg.FromString(ws.recv(timeout=STEP_TIMEOUT))
+        kind = forward.WhichOneof("type")
+        if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+            elements.append(forward.delta.new_element)
+        elif kind == "script_finished":
+            if forward.script_finished != forward.FINISHED_SUCCESSFULLY:
+                raise RuntimeError(f"script finished with status {forward.script_finished}")
+            return time.perf_counter() - started, elements
+
+
+def _page_error(elements):
+    from streamlit.proto.Alert_pb2 import Alert
+
+    for element in elements:
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            return element.exception.message
+        if kind == "alert" and element.alert.format == Alert.ERROR:
+            return element.alert.body
+    return None
+
+
+def journey(stream_url, record):
+    """One visit on a fresh connection; record(step, seconds, error) is called per step"""
+    from streamlit.proto.WidgetStates_pb2 import WidgetState
+    from websockets.sync.client import connect
+
+    with connect(stream_url, subprotocols=["streamlit"], max_size=None) as ws:
+        widgets, radio = {}, None
+        for step in STEPS:
+            states = []
+            if radio is not None:
+                states.append(WidgetState(id=radio.id, string_value=PAGES[step]))
+            if step == "analyze":
+                states.append(WidgetState(id=widgets["analyze"], trigger_value=True))
+            seconds, elements = _rerun(ws, states)
+            record(step, seconds, _page_error(elements))
+            for element in elements:
+                kind = element.WhichOneof("type")
+                if kind == "radio" and element.radio.label == "Go to":
+                    radio = element.radio
+                elif kind == "button" and "Analyze" in element.button.label:
+                    widgets["analyze"] = element.button.id
+
+
+def run_level(replica, sessions, journeys):
+    """Runs `sessions` concurrent sessions of `journeys` journeys each"""
+    latencies = {step: [] for step in STEPS}
+    errors = []
+    lock = threading.Lock()
+    idle_rss, _ = replica.sample()
+    peak = {"rss": idle_rss, "threads": 0}
+    done = threading.Event()
+
+    def record(step, seconds, error):
+        with lock:
+            latencies[step].append(seconds)
+            if error:
+                errors.append(f"{step}: {error}")
+
+    def sampler():
+        while not done.wait(SAMPLE_SECONDS):
+            rss, threads = replica.sample()
+            peak["rss"], peak["threads"] = max(peak["rss"], rss), max(peak["threads"], threads)
+
+    def session():
+        for _ in range(journeys):
+            try:
+                journey(replica.stream_url, record)
+            except Exception as e:
+                with lock:
+                    errors.append(f"journey: {e!r}")
+
+    watcher = threading.Thread(target=sampler, daemon=True)
+    watcher.start()
+    started = time.perf_counter()
+    workers = [threading.Thread(target=session) for _ in range(sessions)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    watcher.join()
+    rss, threads = replica.sample()
+
+    completed = len(latencies["plan"])
+    reruns = sum(len(values) for values in latencies.values())
+    return {
+        "sessions": sessions,
+        "journeys": completed,
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "seconds": round(elapsed, 2),
+        "journeys_per_second": round(completed / elapsed, 2),
+        "reruns_per_second": round(reruns / elapsed, 2),
+        "steps_ms": {
+            step: {f"p{p}": round(float(np.percentile(values, p)) * 1000, 1) for p in PERCENTILES}
+            for step, values in latencies.items() if values
+        },
+        "threads_peak": max(peak["threads"], threads),
+        "rss_mb": {
+            "before": round(idle_rss / 2**20, 1),
+            "peak": round(max(peak["rss"], rss) / 2**20, 1),
+            "after": round(rss / 2**20, 1),
+        },
+    }
+
+
+# ----------------------------------------
+# 📋 REPORT
+# ----------------------------------------
+def print_level(result, baseline_rss):
+    rss = result["rss_mb"]
+    print(f"== {result['sessions']} sessions: {result['journeys']} journeys in {result['seconds']}s "
+          f"({result['journeys_per_second']} journeys/s, {result['reruns_per_second']} reruns/s), "
+          f"{result['errors']} errors")
+    print(f"   replica: {result['threads_peak']} threads peak, RSS {rss['after']} MB "
+          f"({rss['after'] - baseline_rss:+.1f} MB since idle, peak {rss['peak']} MB)")
+    print(f"   {'step':<17}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES))
+    for step, values in result["steps_ms"].items():
+        print(f"   {step:<17}" + "".join(f"{values[f'p{p}']:>10,.1f}" for p in PERCENTILES))
+    for error in result["error_samples"]:
+        print(f"   ! {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", default="1,5,10,25", help="comma-separated concurrency levels")
+    parser.add_argument("--journeys", type=int, default=3, help="journeys per session at each level")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="stand-in API delay per request (s)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    levels = [int(n) for n in args.sessions.split(",") if n.strip()]
+
+    sys.path.insert(0, BASE_DIR)
+    import stand_in_api
+
+    api, api_url = stand_in_api.start_stand_in(latency=args.api_latency)
+    replica = Replica(api_url)
+    results = []
+    try:
+        replica.wait_ready()
+        # One untimed journey so imports and first-run caches are not billed to level 1
+        journey(replica.stream_url, lambda step, seconds, error: None)
+        baseline_rss = replica.sample()[0] / 2**20
+        for sessions in levels:
+            results.append(run_level(replica, sessions, max(1, args.journeys)))
+            if not args.json:
+                print_level(results[-1], baseline_rss)
+    finally:
+        replica.stop()
+        api.shutdown()
+
+    if args.json:
+        print(json.dumps({"baseline_rss_mb": round(baseline_rss, 1), "levels": results}, indent=2, ensure_ascii=False))
+    if any(result["errors"] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""
+Approximate memory accounting per session and per cache, for leak hunting.
+
+Every script run ends with track(), which estimates the deep size of each
+session_state value (dicts, response records, DataFrames, numpy arrays,
+plotly figures) and keeps the session's first, latest and peak total. A
+session that grows by more than GROWTH_WARN_MB since its first run is
+logged once and listed under "warnings". Sessions not seen for
+SESSION_IDLE seconds are dropped from the table.
+
+report() adds the process caches (entries, and sizes where the container
+is reachable; lru_cache only exposes its entry count) and a breakdown of
+bytes by value class across sessions and caches. Allocation tracing slows
+every allocation, so it only runs on demand: the first snapshot() starts
+tracemalloc (or set EZHALNI_TRACEMALLOC=1 at startup), and every later one
+lists the source lines that grew since the previous snapshot.
+
+warmup.py's admin listener (opt-in via EZHALNI_ADMIN_PORT, local only by
+default) exposes it; only the report is a GET:
+
+    GET  /memory               -> largest sessions and caches, classes, warnings
+    POST /memory/snapshot      -> tracemalloc growth since the last snapshot
+    POST /memory/stop-tracing  -> stops tracemalloc and drops its snapshot
+"""
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import types
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+GROWTH_WARN_MB = float(os.environ.get("EZHALNI_SESSION_GROWTH_WARN_MB", "25"))
+SESSION_IDLE = 3600
+PRUNE_EVERY = 100
+TOP = 10
+TRACE_FRAMES = 10
+
+_log = logging.getLogger("ezhalni.memory")
+
+# Not owned by a session, so never counted towards one
+_SKIPPED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+            types.MethodType, types.CodeType, threading.Thread)
+
+
+# ----------------------------------------
+# 📏 SIZE ESTIMATION
+# ----------------------------------------
+def deep_size(value, seen=None):
+    """Approximate bytes reachable from value; objects in `seen` are not counted again"""
+    seen = set() if seen is None else seen
+    stack, total = [value], 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, (pd.DataFrame, pd.Series, pd.Index)):
+            total += int(np.sum(obj.memory_usage(deep=True)))
+            continue
+        # Owned array data is included; views and memory maps count their header only
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, np.ndarray)):
+            continue
+        if hasattr(obj, "to_plotly_json"):
+            stack.append(obj.to_plotly_json())
+            continue
+        try:
+            if isinstance(obj, dict):
+                stack.extend(list(obj.keys()) + list(obj.values()))
+            elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+                stack.extend(list(obj))
+            else:
+                stack.extend(getattr(obj, name) for name in getattr(type(obj), "__slots__", ()) if hasattr(obj, name))
+                if hasattr(obj, "__dict__"):
+                    stack.append(vars(obj))
+        except RuntimeError:
+            pass  # mutated by another thread mid-walk; the next run counts it
+    return total
+
+
+# ----------------------------------------
+# 👤 SESSIONS
+# ----------------------------------------
+_sessions = {}  # session id -> accounting dict
+_warnings = deque(maxlen=50)
+_lock = threading.Lock()
+_calls = {"count": 0}
+
+
+def track(session_state, session_id):
+    """Records the session's current size; called once at the end of every run"""
+    seen, keys = set(), {}
+    for key in list(session_state.keys()):
+        value = session_state[key]
+        keys[key] = (deep_size(value, seen), type(value).__name__)
+    size = sum(bytes_ for bytes_, _ in keys.values())
+    now = time.time()
+    with _lock:
+        entry = _sessions.get(session_id)
+        if entry is None:
+            entry = _sessions[session_id] = {"first": size, "peak": size, "runs": 0, "warned": False}
+        entry.update(last=size, peak=max(entry["peak"], size), keys=keys, seen_at=now)
+        entry["runs"] += 1
+        growth = size - entry["first"]
+        if growth > GROWTH_WARN_MB * 2**20 and not entry["warned"]:
+            entry["warned"] = True
+            largest = sorted(keys, key=lambda k: -keys[k][0])[:3]
+            warning = {"at": now, "session": session_id[:8], "growth_mb": round(growth / 2**20, 1),
+                       "runs": entry["runs"], "largest_keys": largest}
+            _warnings.append(warning)
+            _log.warning("session %s grew by %.1f MB over %d runs (largest: %s)",
+                         warning["session"], warning["growth_mb"], entry["runs"], ", ".join(largest))
+        _calls["count"] += 1
+        if _calls["count"] % PRUNE_EVERY == 0:
+            for stale in [s for s, e in _sessions.items() if now - e["seen_at"] > SESSION_IDLE]:
+                del _sessions[stale]
+    return size
+
+
+# ----------------------------------------
+# 🗃️ CACHES
+# ----------------------------------------
+def _caches():
+    """name -> (container or lru_cache function, lock or None)"""
+    import backend
+    import backtest
+    import categories
+    import clusters
+    import goals
+    import lite
+    import session_store
+    import warmup
+
+    store = session_store.get_store()
+    caches = {
+        "backend.etag_cache": (backend._etag_cache, backend._etag_lock),
+        "lite.chart_svg": (lite._cache, lite._cache_lock),
+        "clusters.models": (clusters._models, clusters._lock),
+        "backtest.unit_backtest": (backtest._unit_backtest, None),
+        "goals.optimize": (goals._optimize, None),
+        "categories.categorize": (categories.categorize, None),
+        "warmup.load_image": (warmup.load_image, None),
+    }
+    if isinstance(store, session_store.MemoryStore):
+        caches["session_store.memory"] = (store._data, store._lock)
+    return caches
+
+
+def cache_sizes():
+    """[{'name', 'entries', 'bytes', 'classes'}], largest first; bytes is None for lru caches"""
+    results = []
+    for name, (cache, lock) in _caches().items():
+        if hasattr(cache, "cache_info"):
+            results.append({"name": name, "entries": cache.cache_info().currsize, "bytes": None, "classes": {}})
+            continue
+        if lock is not None:
+            with lock:
+                entries = list(cache.values())
+        else:
+            entries = list(cache.values())
+        seen, classes = set(), {}
+        for value in entries:
+            cls = type(value).__name__
+            classes[cls] = classes.get(cls, 0) + deep_size(value, seen)
+        results.append({"name": name, "entries": len(entries), "bytes": sum(classes.values()), "classes": classes})
+    return sorted(results, key=lambda c: -(c["bytes"] or 0))
+
+
+# ----------------------------------------
+# 🔬 ALLOCATION TRACING
+# ----------------------------------------
+_snapshot = {"last": None}
+
+
+def start_tracing(frames=TRACE_FRAMES):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_tracing():
+    _snapshot["last"] = None
+    tracemalloc.stop()
+
+
+def snapshot(top=TOP):
+    """Source lines that allocated the most since the previous snapshot (starts tracing first)"""
+    if not tracemalloc.is_tracing():
+        start_tracing()
+        _snapshot["last"] = tracemalloc.take_snapshot()
+        return {"tracing": True, "started": True, "growth": []}
+    current = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+    previous, _snapshot["last"] = _snapshot["last"], current
+    stats = current.compare_to(previous, "lineno") if previous else current.statistics("lineno")
+    return {
+        "tracing": True,
+        "started": False,
+        "traced_mb": round(tracemalloc.get_traced_memory()[0] / 2**20, 1),
+        "growth": [
+            {
+                "line": str(stat.traceback[0]),
+                "size_kb": round(stat.size / 1024, 1),
+                "growth_kb": round(getattr(stat, "size_diff", stat.size) / 1024, 1),
+                "count_growth": getattr(stat, "count_diff", stat.count),
+            }
+            for stat in stats[:top]
+        ],
+    }
+
+
+# ----------------------------------------
+# 📋 ADMIN REPORT
+# ----------------------------------------
+def _rss_bytes():
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def report(top=TOP):
+    """Largest sessions and caches, bytes by value class, and growth warnings"""
+    now = time.time()
+    with _lock:
+        sessions = {sid: dict(entry) for sid, entry in _sessions.items()}
+        warnings = list(_warnings)
+    caches = cache_sizes()
+
+    classes = {}
+    for entry in sessions.values():
+        for size, cls in entry["keys"].values():
+            classes[cls] = classes.get(cls, 0) + size
+    for cache in caches:
+        for cls, size in cache["classes"].items():
+            classes[cls] = classes.get(cls, 0) + size
+
+    def mb(value):
+        return None if value is None else round(value / 2**20, 3)
+
+    largest = sorted(sessions.items(), key=lambda item: -item[1]["last"])[:top]
+    rss = _rss_bytes()
+    return {
+        "rss_mb": mb(rss),
+        "sessions": len(sessions),
+        "sessions_mb": mb(sum(entry["last"] for entry in sessions.values())),
+        "largest_sessions": [
+            {
+                "session": sid[:8],
+                "mb": mb(entry["last"]),
+                "growth_mb": mb(entry["last"] - entry["first"]),
+                "peak_mb": mb(entry["peak"]),
+                "runs": entry["runs"],
+                "idle_seconds": round(now - entry["seen_at"]),
+                "largest_keys_kb": {
+                    key: round(size / 1024, 1)
+                    for key, (size, _) in sorted(entry["keys"].items(), key=lambda kv: -kv[1][0])[:5]
+                },
+            }
+            for sid, entry in largest
+        ],
+        "caches": [{"name": c["name"], "entries": c["entries"], "mb": mb(c["bytes"])} for c in caches[:top]],
+        "classes_mb": {cls: mb(size) for cls, size in sorted(classes.items(), key=lambda kv: -kv[1])[:top]},
+        "warnings": warnings,
+        "tracing": tracemalloc.is_tracing(),
+    }
+
+
+if os.environ.get("EZHALNI_TRACEMALLOC", "0") == "1":
+    start_tracing()
@@ -0,0 +1,266 @@
+"""
+Typed response records for /predict, /cluster and /plan.
+
+Each response is decoded once, on the thread that made the call, into
+read-only slotted records: missing fields get their defaults, numbers and
+strings are checked, lists become tuples and unknown fields are dropped.
+Pages then read plain attributes (plan.recommendations.debt.extra_payment)
+instead of walking nested dicts with .get(..., {}) on every rerun, and the
+records held in session state carry no per-instance __dict__.
+
+A record class lists its fields in FIELDS as name -> default. The default
+also picks the converter: a Record subclass decodes a nested object,
+Many(cls) a list of them, Maybe(cls) an optional object, and a number,
+bool, str or dict (of numbers) is checked as that type.
+"""
+
+
+class ResponseFormatError(ValueError):
+    """Raised when a response field has the wrong type"""
+
+
+class Many:
+    def __init__(self, item):
+        self.item = item
+
+
+class Maybe:
+    def __init__(self, record):
+        self.record = record
+
+
+def _number(name, default):
+    def convert(value):
+        if value is None:
+            return default
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ResponseFormatError(f"{name} should be a number, got {value!r}") from None
+    return convert
+
+
+def _converter(name, default):
+    if isinstance(default, type) and issubclass(default, Record):
+        empty = default.decode({})
+        return lambda value: empty if value is None else default.decode(value)
+    if isinstance(default, Maybe):
+        record = default.record
+        return lambda value: None if value is None else record.decode(value)
+    if isinstance(default, Many):
+        item = default.item
+        if isinstance(item, type) and issubclass(item, Record):
+            return lambda value: tuple(item.decode(v) for v in value or ())
+        return lambda value: tuple(item(v) for v in value or ())
+    if isinstance(default, bool):
+        return lambda value: default if value is None else bool(value)
+    if isinstance(default, (int, float)):
+        return _number(name, default)
+    if isinstance(default, str):
+        return lambda value: default if value is None else str(value)
+    if isinstance(default, dict):
+        number = _number(name, 0.0)
+        return lambda value: {str(k): number(v) for k, v in (value or {}).items()}
+    raise TypeError(f"Unsupported default for {name}: {default!r}")
+
+
+class _RecordType(type):
+    # __slots__ has to exist when the class is created, so it is derived here
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault("__slots__", tuple(namespace.get("FIELDS", {})))
+        namespace.setdefault("_converters", ())
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class Record(metaclass=_RecordType):
+    """Read-only slotted record decoded from one JSON object"""
+
+    __slots__ = ()
+    FIELDS = {}
+
+    @classmethod
+    def decode(cls, raw):
+        """Record from a response dict; an already decoded record is returned as is"""
+        if isinstance(raw, cls):
+            return raw
+        if not isinstance(raw, dict):
+            raise ResponseFormatError(f"{cls.__name__} expects an object, got {type(raw).__name__}")
+        if not cls._converters:
+            cls._converters = tuple((name, _converter(name, d)) for name, d in cls.FIELDS.items())
+        record = object.__new__(cls)
+        for name, convert in cls._converters:
+            object.__setattr__(record, name, convert(raw.get(name)))
+        return record
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.FIELDS)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Rebuilt through decode(), since __setattr__ is blocked
+        return type(self).decode, (self.to_dict(),)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{n}={getattr(self, n)!r}' for n in self.FIELDS)})"
+
+    def to_dict(self):
+        """Plain JSON-ready dict, e.g. for the session store"""
+        return {name: _plain(getattr(self, name)) for name in self.FIELDS}
+
+
+def _plain(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_plain(v) for v in value]
+    return value
+
+
+# ----------------------------------------
+# 🩺 /predict
+# ----------------------------------------
+class Metrics(Record):
+    FIELDS = {"expense_ratio": 0.0, "emergency_months": 0.0, "loan_to_income": 0.0}
+
+
+class Prediction(Record):
+    FIELDS = {
+        "prediction": "Unknown",
+        "confidence": 0.0,
+        "health_score": 0,
+        "metrics": Metrics,
+        "source": "N/A",
+    }
+
+
+# ----------------------------------------
+# 👥 /cluster
+# ----------------------------------------
+class ComparisonRow(Record):
+    FIELDS = {"yours": 0.0, "group_average": 0.0, "assessment": ""}
+
+
+class Comparison(Record):
+    FIELDS = {
+        "group_name": "N/A",
+        "income": ComparisonRow,
+        "savings": ComparisonRow,
+        "debt": ComparisonRow,
+    }
+
+
+class Characteristics(Record):
+    FIELDS = {"cash_flow": "N/A", "emergency_fund": "N/A", "expense_ratio": "N/A", "debt_level": "N/A"}
+
+
+class ClusterInfo(Record):
+    FIELDS = {
+        "cluster_id": 0,
+        "cluster_name": "N/A",
+        "description": "No description available",
+        "health_status": "N/A",
+        "comparison": Comparison,
+        "characteristics": Characteristics,
+        "model_version": "",
+    }
+
+
+# ----------------------------------------
+# 🧠 /plan
+# ----------------------------------------
+class Summary(Record):
+    FIELDS = {"health_status": "N/A", "health_score": 0, "action_items": 0, "top_priority": "N/A"}
+
+
+class Finding(Record):
+    FIELDS = {"type": "", "title": "N/A", "description": ""}
+
+
+class Structured(Record):
+    FIELDS = {"severity": "N/A", "issues": Many(Finding), "strengths": Many(Finding)}
+
+
+class EmergencyFund(Record):
+    FIELDS = {
+        "current_amount": 0.0,
+        "current_months": 0.0,
+        "target_amount": 0.0,
+        "monthly_contribution": 0.0,
+        "months_to_goal": 0.0,
+    }
+
+
+class DebtPlan(Record):
+    FIELDS = {
+        "should_focus": False,
+        "current_payment": 0.0,
+        "extra_payment": 0.0,
+        "total_payment": 0.0,
+        "payoff_months": 0.0,
+    }
+
+
+class Investment(Record):
+    FIELDS = {"can_invest": False, "recommended_monthly": 0.0}
+
+
+class InvestmentType(Record):
+    FIELDS = {"type": "N/A", "risk_score": 0, "reasoning": "", "allocation": {}}
+
+
+class ExpenseReduction(Record):
+    FIELDS = {"current": 0.0, "recommended": 0.0, "savings_monthly": 0.0, "categories": Many(str)}
+
+
+class SavingsPlan(Record):
+    FIELDS = {"current_rate": 0.0, "target_rate": 0.0, "current_monthly": 0.0, "recommended_monthly": 0.0}
+
+
+class Recommendations(Record):
+    FIELDS = {
+        "emergency_fund": EmergencyFund,
+        "debt": DebtPlan,
+        "investment": Investment,
+        "investment_type": InvestmentType,
+        "expense_reduction": Maybe(ExpenseReduction),
+        "savings": SavingsPlan,
+    }
+
+
+class Plan(Record):
+    FIELDS = {
+        "summary": Summary,
+        "structured": Structured,
+        "recommendations": Recommendations,
+        "narrative": "",
+        "generated_at": "N/A",
+    }
+
+
+def json_default(value):
+    """json.dumps default= for decoded records and numpy values"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    # numpy scalars/arrays, e.g. from locally computed cluster info
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _cached(record):
+    return lambda value: {**value, "data": record.decode(value["data"])}
+
+
+# Session keys holding responses, re-decoded when a session is restored
+SESSION_DECODERS = {
+    "last_result": Prediction.decode,
+    "cached_cluster": _cached(ClusterInfo),
+    "cached_plan": _cached(Plan),
+    "scenario_results": lambda value: {name: _cached(Prediction)(entry) for name, entry in value.items()},
+}
@@ -0,0 +1,182 @@
+"""
+Per-page payload byte budgets for what a rerun sends to the browser.
+
+Every page is rendered with Streamlit's AppTest against the stand-in API
+(in-process transport), a seeded synthetic peer dataset and the bundled
+returns history, with fixed inputs, and the serialized size of each
+element is summed by kind:
+
+    markdown   st.markdown/title/caption, including inline CSS and HTML
+    plotly     figure JSON from st.plotly_chart
+    dataframe  st.dataframe/st.table Arrow payloads
+    images     st.image element plus the media bytes it references, and
+               the static SVG charts of lite mode
+    other      widgets, metrics, layout blocks
+
+Exits with status 1 when a page goes over its budget, so it can run in CI
+next to the build. Budgets sit ~15% above the sizes measured when they
+were last set; update them deliberately when a page is meant to grow.
+
+--lite renders the pages in lite mode, against the same budgets.
+
+    python payload_budget.py [--page "🧠 Plan"] [--lite] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+
+# Bytes per rerun, all kinds together
+PAGE_BYTE_BUDGETS = {
+    "🏠 Home": 118_000,
+    "📈 Financial Input": 5_000,
+    "📊 Insights": 10_000,
+    "💡 You vs others": 12_500,
+    "🧠 Plan": 11_500,
+}
+PEER_SAMPLE_ROWS = 20_000
+
+FIXED_INPUT = {
+    "age": 28,
+    "monthly_income_usd": 6000,
+    "monthly_expenses_usd": 2500,
+    "savings_usd": 50000,
+    "monthly_emi_usd": 200,
+    "loan_interest_rate_pct": 5.0,
+    "loan_term_months": 24,
+}
+
+KINDS = ("markdown", "plotly", "dataframe", "images", "other")
+_PROTO_KINDS = {
+    "Markdown": "markdown",
+    "Heading": "markdown",
+    "PlotlyChart": "plotly",
+    "Arrow": "dataframe",
+    "Dataframe": "dataframe",
+    "Table": "dataframe",
+    "ImageList": "images",
+    "Html": "images",
+}
+
+
+def _record_media_sizes(sizes):
+    """Remembers the byte size of every media file AppTest stores"""
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    original = MemoryMediaFileStorage.load_and_get_id
+
+    def load_and_get_id(self, path_or_data, mimetype, kind, filename=None):
+        file_id = original(self, path_or_data, mimetype, kind, filename)
+        if isinstance(path_or_data, (bytes, bytearray)):
+            sizes[file_id] = len(path_or_data)
+        else:
+            sizes[file_id] = os.path.getsize(path_or_data)
+        return file_id
+
+    MemoryMediaFileStorage.load_and_get_id = load_and_get_id
+
+
+def _build_peer_sample(out_dir):
+    """Seeded stand-in for data/peers so the You vs others charts always render"""
+    import numpy as np
+    import pandas as pd
+    import peers
+
+    rng = np.random.default_rng(7)
+    source = os.path.join(out_dir, "peers.csv")
+    pd.DataFrame({
+        "monthly_income_usd": rng.lognormal(8.5, 0.5, PEER_SAMPLE_ROWS).round(),
+        "savings_usd": rng.lognormal(10, 1.0, PEER_SAMPLE_ROWS).round(),
+        "monthly_emi_usd": rng.choice([0, 200, 500, 900], PEER_SAMPLE_ROWS),
+    }).to_csv(source, index=False)
+    peers.build_dataset(source, out_dir)
+
+
+def _leaves(node):
+    children = getattr(node, "children", None)
+    if children:
+        for child in children.values():
+            yield from _leaves(child)
+    else:
+        yield node
+
+
+def measure(tree, media_sizes):
+    """Bytes by kind for one rendered element tree"""
+    sizes = dict.fromkeys(KINDS, 0)
+    for node in _leaves(tree):
+        proto = getattr(node, "proto", None)
+        if proto is None or not hasattr(proto, "ByteSize"):
+            continue
+        kind = _PROTO_KINDS.get(proto.DESCRIPTOR.name, "other")
+        sizes[kind] += proto.ByteSize()
+        if proto.DESCRIPTOR.name == "ImageList":
+            for image in proto.imgs:
+                file_id = image.url.rsplit("/", 1)[-1].split(".", 1)[0]
+                sizes["images"] += media_sizes.get(file_id, 0)
+    return sizes
+
+
+def render(page, media_sizes, lite_mode=False):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.session_state["lite_mode"] = lite_mode
+    if page != "📈 Financial Input":
+        at.session_state["last_input"] = dict(FIXED_INPUT)
+        at.session_state["last_result"] = {"prediction": "Healthy", "confidence": 0.9}
+    at.run()
+    at.sidebar.radio[0].set_value(page).run()
+    if page == "📈 Financial Input":
+        # The heavy part of this page is the result card after Analyze
+        next(b for b in at.button if "Analyze" in b.label).click().run()
+    if at.exception:
+        raise RuntimeError(f"{page} raised: {at.exception[0].value}")
+    return measure(at._tree, media_sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--page", action="append", help="only check this page (repeatable)")
+    parser.add_argument("--lite", action="store_true", help="render the pages in lite mode")
+    parser.add_argument("--json", action="store_true", help="print sizes as JSON")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EZHALNI_TRANSPORT", "inprocess")
+    os.environ.setdefault("EZHALNI_ENGINE", "stand_in_api:ENGINE")
+    os.environ["EZHALNI_KEEP_WARM"] = "0"
+    sys.path.insert(0, BASE_DIR)
+    media_sizes = {}
+    _record_media_sizes(media_sizes)
+
+    results, over = {}, []
+    with tempfile.TemporaryDirectory(prefix="ezhalni-data-") as data_dir:
+        os.environ["EZHALNI_PEER_DATA"] = data_dir
+        _build_peer_sample(data_dir)
+        for page in args.page or PAGE_BYTE_BUDGETS:
+            sizes = render(page, media_sizes, args.lite)
+            total = sum(sizes.values())
+            budget = PAGE_BYTE_BUDGETS[page]
+            results[page] = {**sizes, "total": total, "budget": budget}
+            if total > budget:
+                over.append(page)
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'page':<22}" + "".join(f"{kind:>11}" for kind in KINDS) + f"{'total':>11}{'budget':>11}")
+        for page, sizes in results.items():
+            flag = "  OVER" if page in over else ""
+            print(f"{page:<22}" + "".join(f"{sizes[kind]:>11,}" for kind in KINDS)
+                  + f"{sizes['total']:>11,}{sizes['budget']:>11,}{flag}")
+    if over:
+        print(f"Over budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
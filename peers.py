@@ -0,0 +1,121 @@
+"""
+Percentile ranks against the anonymized peer dataset.
+
+The dataset is a directory with one presorted float64 .npy file per column
+plus a meta.json. Columns are opened with np.load(mmap_mode="r"), so loading
+is zero-copy and every session in the process shares the same pages. Ranks
+are two binary searches per lookup, histograms one binary search per bin
+edge, so neither touches the full column.
+
+    python peers.py build peers.csv data/peers
+"""
+import argparse
+import json
+import os
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PEER_DATA_DIR = os.environ.get("EZHALNI_PEER_DATA", os.path.join(BASE_DIR, "data", "peers"))
+
+# Comparison row -> payload field / peer dataset column
+PEER_COLUMNS = {
+    "income": "monthly_income_usd",
+    "savings": "savings_usd",
+    "debt": "monthly_emi_usd",
+}
+
+
+class PeerDataset:
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.columns = {
+            column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+            for column in self.meta["columns"]
+        }
+        self.size = self.meta["rows"]
+
+    def percentile(self, column, value):
+        """Share of peers below value, counting ties as half; None without any peers"""
+        values = self.columns[column]
+        if len(values) == 0:
+            return None
+        below = np.searchsorted(values, value, side="left")
+        at_or_below = np.searchsorted(values, value, side="right")
+        return float((below + at_or_below) / 2 / len(values) * 100)
+
+    def histogram(self, column, bins=40, upper_quantile=0.99):
+        """Bin edges and counts, clipped at upper_quantile to keep long tails readable"""
+        values = self.columns[column]
+        if len(values) == 0:
+            return np.linspace(0.0, 1.0, bins + 1), np.zeros(bins, dtype=np.intp)
+        low = float(values[0])
+        high = float(values[min(len(values) - 1, int(len(values) * upper_quantile))])
+        if high <= low:
+            high = low + 1
+        edges = np.linspace(low, high, bins + 1)
+        positions = np.searchsorted(values, edges, side="left")
+        positions[-1] = np.searchsorted(values, high, side="right")
+        return edges, np.diff(positions)
+
+
+@cache
+def get_dataset():
+    """Process-wide dataset, or None when no peer data is installed"""
+    if os.path.exists(os.path.join(PEER_DATA_DIR, "meta.json")):
+        return PeerDataset(PEER_DATA_DIR)
+    return None
+
+
+def percentile_ranks(payload):
+    """{'income': 63.2, ...} for the compared fields, or {} without a dataset"""
+    dataset = get_dataset()
+    if dataset is None:
+        return {}
+    return {
+        key: dataset.percentile(column, payload.get(column, 0))
+        for key, column in PEER_COLUMNS.items()
+        if len(dataset.columns.get(column, ())) > 0
+    }
+
+
+def ordinal(percentile):
+    """73.4 -> '73rd'"""
+    n = int(round(percentile))
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+# ----------------------------------------
+# 🏗️ DATASET BUILD
+# ----------------------------------------
+def build_dataset(source_csv, out_dir, chunksize=1_000_000):
+    """Converts a peer CSV into presorted memory-mappable columns"""
+    columns = list(PEER_COLUMNS.values())
+    parts = {column: [] for column in columns}
+    for chunk in pd.read_csv(source_csv, usecols=columns, chunksize=chunksize):
+        for column in columns:
+            parts[column].append(chunk[column].dropna().to_numpy(dtype=np.float64))
+
+    os.makedirs(out_dir, exist_ok=True)
+    rows = 0
+    for column in columns:
+        values = np.sort(np.concatenate(parts[column]) if parts[column] else np.empty(0))
+        np.save(os.path.join(out_dir, f"{column}.npy"), values)
+        rows = max(rows, len(values))
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"columns": columns, "rows": rows, "source": os.path.basename(source_csv)}, f)
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the peer percentile dataset")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Build the dataset from a CSV with the payload column names")
+    build.add_argument("source_csv")
+    build.add_argument("out_dir", nargs="?", default=PEER_DATA_DIR)
+    args = parser.parse_args()
+    print(f"Wrote {build_dataset(args.source_csv, args.out_dir):,} peers to {args.out_dir}")
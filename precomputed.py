@@ -0,0 +1,264 @@
+"""
+Precomputed /predict and /cluster responses for the most common inputs.
+
+The Financial Input widgets are quantized (income and expenses step by
+100, savings by 500, the loan payment by 50, the rate by 0.1 and the term
+by 6), so every payload they produce sits on a finite grid. The build job
+counts the grid cells of a file of observed profiles (cli.py's input
+format), calls the API once per endpoint for the TOP_CELLS most common
+cells and writes a table directory:
+
+    meta.json       fields, steps, endpoints, cell count, expiry and model version
+    cells.npy       (cells, 7) int32 grid coordinates
+    offsets.npy     byte offsets of each (cell, endpoint) response
+    responses.bin   responses as compact JSON, deflated one by one
+    zdict.bin       preset deflate dictionary sampled from the responses
+
+Deflating each response against a shared dictionary keeps single lookups
+independent while still compressing the repeated keys well. Loading builds
+a dict from cell to row, so a lookup is one hash probe plus one small
+inflate. Payloads off the grid, cells not in the table and expired tables
+return None, and backend falls through to the live API.
+
+The table records the model_version the API reported while it was built.
+backend passes on every version it sees (from /health and from responses)
+to observe_model_version(); once the live model differs from the table's,
+the whole table is bypassed until it is rebuilt.
+
+    python precomputed.py build profiles.jsonl [more.jsonl] --top 50000
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+
+import numpy as np
+
+import models
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PRECOMPUTED_DIR = os.environ.get("EZHALNI_PRECOMPUTED", os.path.join(BASE_DIR, "data", "precomputed"))
+ENDPOINTS = ("predict", "cluster")
+TOP_CELLS = 50_000
+TTL_DAYS = 7
+ZDICT_SAMPLES = 64
+
+# Widget step per payload field, in PAYLOAD_FIELDS order
+STEPS = {
+    "age": 1,
+    "monthly_income_usd": 100,
+    "monthly_expenses_usd": 100,
+    "savings_usd": 500,
+    "monthly_emi_usd": 50,
+    "loan_interest_rate_pct": 0.1,
+    "loan_term_months": 6,
+}
+
+
+def cell(payload):
+    """Grid coordinates of a payload, or None when it is not exactly on the widget grid"""
+    if len(payload) != len(STEPS):
+        return None
+    key = []
+    for field, step in STEPS.items():
+        value = payload.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        units = round(value / step)
+        if units < 0 or abs(units * step - value) > 1e-6:
+            return None
+        key.append(units)
+    return tuple(key)
+
+
+def payload_for(key):
+    """The payload the widgets send for a grid cell"""
+    payload = {}
+    for (field, step), units in zip(STEPS.items(), key):
+        payload[field] = round(units * step, 1) if isinstance(step, float) else int(units * step)
+    return payload
+
+
+# The model version the API last reported; None until one is seen
+_live = {"model_version": None}
+
+
+def observe_model_version(version):
+    """Records the model version the API reported; backend calls this for every one it sees"""
+    if version:
+        _live["model_version"] = version
+
+
+class PrecomputedTable:
+    def __init__(self, path):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.endpoints = tuple(self.meta["endpoints"])
+        self.expires_at = self.meta["expires_at"]
+        self.model_version = self.meta.get("model_version")
+        cells = np.load(os.path.join(path, "cells.npy"))
+        self.index = {key: row for row, key in enumerate(map(tuple, cells.tolist()))}
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+        with open(os.path.join(path, "zdict.bin"), "rb") as f:
+            self.zdict = f.read()
+        with open(os.path.join(path, "responses.bin"), "rb") as f:
+            self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def current(self):
+        """False once the API reports a model other than the one the table was built from"""
+        live = _live["model_version"]
+        return live is None or live == self.model_version
+
+    def get(self, endpoint, payload):
+        """Stored response for the payload's cell, or None"""
+        if endpoint not in self.endpoints or time.time() > self.expires_at or not self.current():
+            return None
+        key = cell(payload)
+        row = self.index.get(key) if key is not None else None
+        if row is None:
+            return None
+        entry = row * len(self.endpoints) + self.endpoints.index(endpoint)
+        start, end = int(self.offsets[entry]), int(self.offsets[entry + 1])
+        if start == end:
+            return None
+        inflater = zlib.decompressobj(wbits=-15, zdict=self.zdict)
+        return json.loads(inflater.decompress(self.blob[start:end]) + inflater.flush())
+
+
+@cache
+def get_table():
+    """Process-wide table, or None when none is installed"""
+    if os.path.exists(os.path.join(PRECOMPUTED_DIR, "meta.json")):
+        return PrecomputedTable(PRECOMPUTED_DIR)
+    return None
+
+
+def lookup(endpoint, payload):
+    """Precomputed response for an endpoint and payload, or None to call the API"""
+    table = get_table()
+    return table.get(endpoint, payload) if table is not None else None
+
+
+# ----------------------------------------
+# 🏗️ TABLE BUILD
+# ----------------------------------------
+def count_cells(profiles):
+    """(Counter of grid cells, profiles read); profiles off the grid are not counted"""
+    import backend
+
+    counts, total = Counter(), 0
+    for profile in profiles:
+        total += 1
+        try:
+            key = cell(backend.payload_from_profile(profile))
+        except (TypeError, ValueError):
+            continue
+        if key is not None:
+            counts[key] += 1
+    return counts, total
+
+
+def build_table(counts, out_dir, top=TOP_CELLS, concurrency=8, timeout=None, ttl_days=TTL_DAYS):
+    """Calls the API for the `top` most common cells and writes the table; returns (cells, failed calls)"""
+    import backend
+
+    transport = backend.get_transport()
+    timeout = timeout or backend.DEFAULT_TIMEOUT
+    keys = [key for key, _ in counts.most_common(top)]
+
+    def evaluate(key):
+        payload, bodies = payload_for(key), []
+        for endpoint in ENDPOINTS:
+            try:
+                response = transport.call(endpoint, payload, timeout)
+                bodies.append(json.dumps(response, separators=(",", ":"), default=models.json_default).encode())
+            except Exception:
+                bodies.append(None)
+        return bodies
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(evaluate, keys))
+    model_version = _model_version(transport, results)
+
+    # zlib only uses the last 32 KB of a preset dictionary
+    zdict = b"".join(body for bodies in results[:ZDICT_SAMPLES] for body in bodies if body)[-32768:]
+    offsets, chunks, position, failed = [0], [], 0, 0
+    for bodies in results:
+        for body in bodies:
+            if body is None:
+                failed += 1
+            else:
+                deflater = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=zdict)
+                chunk = deflater.compress(body) + deflater.flush()
+                chunks.append(chunk)
+                position += len(chunk)
+            offsets.append(position)
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "cells.npy"), np.array(keys, dtype=np.int32).reshape(-1, len(STEPS)))
+    np.save(os.path.join(out_dir, "offsets.npy"), np.array(offsets, dtype=np.int64))
+    with open(os.path.join(out_dir, "responses.bin"), "wb") as f:
+        f.writelines(chunks)
+    with open(os.path.join(out_dir, "zdict.bin"), "wb") as f:
+        f.write(zdict)
+    now = time.time()
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "fields": list(STEPS), "steps": STEPS, "endpoints": list(ENDPOINTS), "cells": len(keys),
+            "built_at": now, "expires_at": now + ttl_days * 86400, "transport": transport.name,
+            "model_version": model_version,
+        }, f)
+    return len(keys), failed
+
+
+def _model_version(transport, results):
+    """Version from /health, else from the first stored response that names one"""
+    try:
+        _, body = transport.health(record=False)
+        if body.get("model_version"):
+            return body["model_version"]
+    except Exception:
+        pass
+    for body in (body for bodies in results for body in bodies if body):
+        version = json.loads(body).get("model_version")
+        if version:
+            return version
+    return None
+
+
+if __name__ == "__main__":
+    import backend
+    import cli
+
+    parser = argparse.ArgumentParser(description="Manage the precomputed response table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Precompute the most common cells of observed profiles")
+    build.add_argument("paths", nargs="*", help="Profile files (JSON, JSON array or JSONL); '-' or none reads stdin")
+    build.add_argument("--out", default=PRECOMPUTED_DIR, help=f"Table directory (default {PRECOMPUTED_DIR})")
+    build.add_argument("--top", type=int, default=TOP_CELLS, help="Number of most common cells to keep")
+    build.add_argument("--concurrency", type=int, default=8, help="Maximum in-flight API requests")
+    build.add_argument("--timeout", type=float, default=backend.DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    build.add_argument("--ttl-days", type=float, default=TTL_DAYS, help="Days before the table stops being used")
+    build.add_argument("--transport", choices=("http", "async", "inprocess"), default=None,
+                       help=f"Backend transport (default {backend.TRANSPORT})")
+    build.add_argument("--engine", default=None,
+                       help="Model engine for --transport inprocess, as package.module:attribute")
+    args = parser.parse_args()
+
+    if args.transport or args.engine:
+        try:
+            backend.set_transport(backend.make_transport(args.transport or backend.TRANSPORT, args.engine or backend.ENGINE))
+        except (ImportError, AttributeError, ValueError) as e:
+            parser.error(str(e))
+    counts, total = count_cells(cli.iter_profiles(args.paths))
+    cells, failed = build_table(counts, args.out, args.top, max(1, args.concurrency), args.timeout, args.ttl_days)
+    covered = sum(n for _, n in counts.most_common(args.top))
+    print(f"Precomputed {cells:,} cells covering {covered:,} of {total:,} profiles "
+          f"({covered / max(total, 1):.1%}) in {args.out}; {failed} calls failed", file=sys.stderr)
+    sys.exit(1 if failed else 0)
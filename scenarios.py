@@ -0,0 +1,83 @@
+"""
+Named what-if scenarios ("Current", "New job", "Pay off car") scored side by side.
+
+The Financial Input page keeps the scenarios in an editable table. rows()
+turns its rows into named payloads, clamped to the widgets' limits. analyze()
+then scores all of them with one backend.predict_many() batch, so the
+predictions run concurrently.
+
+Each scenario's result is cached in session state under its name, together
+with the inputs it was scored for. Editing one scenario re-scores only that
+one, and none of them touch last_result.
+"""
+import math
+
+import backend
+import models
+
+MAX_SCENARIOS = 4
+STATE_KEY = "scenario_results"
+# Table columns in PAYLOAD_FIELDS order: (header, min, max, step)
+COLUMNS = {
+    "age": ("Age", 18, 100, 1),
+    "monthly_income_usd": ("Income ($)", 0, None, 100),
+    "monthly_expenses_usd": ("Expenses ($)", 0, None, 100),
+    "savings_usd": ("Savings ($)", 0, None, 500),
+    "monthly_emi_usd": ("Loan payment ($)", 0, None, 50),
+    "loan_interest_rate_pct": ("Rate (%)", 0.0, 20.0, 0.1),
+    "loan_term_months": ("Term (months)", 0, 120, 6),
+}
+
+
+def default_rows(payload):
+    """Editor rows to start from: the current inputs"""
+    return [{"name": "Current", **payload}]
+
+
+def _value(field, value):
+    _, lo, hi, step = COLUMNS[field]
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        value = backend.DEFAULT_PROFILE[field]
+    value = max(lo, value if hi is None else min(hi, value))
+    return round(float(value), 1) if isinstance(step, float) else int(value)
+
+
+def rows(records):
+    """([(name, payload)], problems) from editor rows; blank rows are skipped"""
+    scenarios, problems, seen = [], [], set()
+    for record in records:
+        name = str(record.get("name") or "").strip()
+        if not name:
+            if any(record.get(field) is not None for field in COLUMNS):
+                problems.append("Every scenario needs a name.")
+            continue
+        if name in seen:
+            problems.append(f"Scenario names must be unique ('{name}' is used twice).")
+            continue
+        seen.add(name)
+        scenarios.append((name, {field: _value(field, record.get(field)) for field in backend.PAYLOAD_FIELDS}))
+    if len(scenarios) > MAX_SCENARIOS:
+        problems.append(f"Only the first {MAX_SCENARIOS} scenarios are compared.")
+        scenarios = scenarios[:MAX_SCENARIOS]
+    return scenarios, problems
+
+
+def cached(session_state, scenarios):
+    """{name: models.Prediction} for scenarios whose cached result matches their inputs"""
+    cache = session_state.get(STATE_KEY) or {}
+    return {name: cache[name]["data"] for name, payload in scenarios
+            if name in cache and cache[name]["inputs"] == payload}
+
+
+def analyze(session_state, scenarios, deadline=None):
+    """{name: models.Prediction} for every scenario; only new or edited ones are sent"""
+    cache = dict(session_state.get(STATE_KEY) or {})
+    known = cached(session_state, scenarios)
+    todo = [(name, payload) for name, payload in scenarios if name not in known]
+    if todo:
+        responses = backend.predict_many([payload for _, payload in todo], deadline=deadline)
+        for (name, payload), response in zip(todo, responses):
+            cache[name] = {"inputs": payload, "data": models.Prediction.decode(response)}
+    # Renamed or deleted scenarios are dropped
+    session_state[STATE_KEY] = {name: cache[name] for name, _ in scenarios}
+    return {name: cache[name]["data"] for name, _ in scenarios}
@@ -0,0 +1,120 @@
+"""
+Which single input change moves the /predict result the most.
+
+Each of the seven payload fields is nudged down and up: money fields by
+SHARE of their value, rounded to the Financial Input widget step (so the
+variants can hit the precomputed table), the others by a fixed NUDGES
+amount, all kept inside the widgets' BOUNDS. The up to 14 variants go to
+backend.predict_many() as one batch: a nudge that cannot move (savings
+already at 0) is dropped, duplicates are sent once, responses seen before
+come from a small LRU cache and the rest are sent concurrently, so the
+analysis takes about as long as one request.
+
+Fields are ranked by their swing, the spread of health_score between the
+down and up variants (then of the healthy probability). A variant whose
+label differs from the base result is marked as a flip.
+"""
+import json
+import threading
+from collections import OrderedDict
+
+import backend
+import models
+import precomputed
+
+SHARE = 0.1
+NUDGES = {"age": 5, "loan_interest_rate_pct": 1.0, "loan_term_months": 12}
+BOUNDS = {"age": (18, 100), "loan_interest_rate_pct": (0.0, 20.0), "loan_term_months": (0, 120)}
+LABELS = {
+    "age": "Age",
+    "monthly_income_usd": "Income",
+    "monthly_expenses_usd": "Expenses",
+    "savings_usd": "Savings",
+    "monthly_emi_usd": "Loan payment",
+    "loan_interest_rate_pct": "Interest rate",
+    "loan_term_months": "Loan term",
+}
+CACHE_SIZE = 2048
+
+_cache = OrderedDict()  # payload JSON -> models.Prediction
+_cache_lock = threading.Lock()
+
+
+def nudge(field, value):
+    """How far a field moves each way"""
+    if field in NUDGES:
+        return NUDGES[field]
+    step = precomputed.STEPS[field]
+    return max(step, round(value * SHARE / step) * step)
+
+
+def variants(payload):
+    """[(field, direction, payload)] for every nudge that changes the payload"""
+    out = []
+    for field in backend.PAYLOAD_FIELDS:
+        value = payload[field]
+        lo, hi = BOUNDS.get(field, (0, None))
+        for direction, sign in (("down", -1), ("up", 1)):
+            moved = value + sign * nudge(field, value)
+            moved = max(lo, moved if hi is None else min(hi, moved))
+            moved = round(moved, 1) if isinstance(moved, float) else int(moved)
+            if moved != value:
+                out.append((field, direction, {**payload, field: moved}))
+    return out
+
+
+def _key(payload):
+    return json.dumps(payload, sort_keys=True)
+
+
+def predict_batch(payloads, deadline=None):
+    """Decoded /predict responses, from the cache where possible and one batch for the rest"""
+    keys = [_key(p) for p in payloads]
+    with _cache_lock:
+        known = {key: _cache[key] for key in keys if key in _cache}
+        for key in known:
+            _cache.move_to_end(key)
+    todo = {key: p for key, p in zip(keys, payloads) if key not in known}
+    fresh = dict(zip(todo, map(models.Prediction.decode, backend.predict_many(list(todo.values()), deadline=deadline))))
+    with _cache_lock:
+        _cache.update(fresh)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return [known.get(key) or fresh[key] for key in keys], len(fresh)
+
+
+def healthy_probability(result):
+    at_risk = result.prediction.lower().replace("_", " ") in ("at risk", "atrisk")
+    return 1 - result.confidence if at_risk else result.confidence
+
+
+def _outcome(result, base):
+    return {
+        "prediction": result.prediction,
+        "health_score": result.health_score,
+        "p_healthy": round(healthy_probability(result), 4),
+        "flips": result.prediction != base.prediction,
+    }
+
+
+def analyze(payload, deadline=None):
+    """
+    {'base', 'rows', 'requests'}: rows are per field, largest swing first,
+    with 'down' and 'up' outcomes (None when the field cannot move that way)
+    """
+    payload = backend.payload_from_profile(payload)
+    moves = variants(payload)
+    results, sent = predict_batch([payload] + [p for _, _, p in moves], deadline)
+    base = results[0]
+    rows = {field: {"field": field, "label": LABELS[field], "value": payload[field], "down": None, "up": None}
+            for field in backend.PAYLOAD_FIELDS}
+    for (field, direction, moved), result in zip(moves, results[1:]):
+        rows[field][direction] = {"value": moved[field], **_outcome(result, base)}
+
+    base_outcome = _outcome(base, base)
+    for row in rows.values():
+        down, up = row["down"] or base_outcome, row["up"] or base_outcome
+        row["swing"] = abs(up["health_score"] - down["health_score"])
+        row["p_swing"] = round(abs(up["p_healthy"] - down["p_healthy"]), 4)
+    ranked = sorted(rows.values(), key=lambda row: (-row["swing"], -row["p_swing"]))
+    return {"base": base_outcome, "rows": ranked, "requests": sent}
@@ -0,0 +1,22 @@
+"""
+Production entry point: warm the process up, then start Streamlit in it.
+
+    python serve.py [streamlit run options...]
+
+Warmup has to happen in the server process itself for its imports,
+connections and caches to be reused, which `streamlit run` alone cannot do.
+The load balancer should probe GET /ready on EZHALNI_READY_PORT.
+Set EZHALNI_ADMIN_PORT to also serve the memory endpoints on 127.0.0.1.
+"""
+import os
+import sys
+
+from streamlit.web import cli as stcli
+
+import warmup
+
+if __name__ == "__main__":
+    warmup.start()
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    sys.argv = ["streamlit", "run", app_path, *sys.argv[1:]]
+    sys.exit(stcli.main())
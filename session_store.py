@@ -0,0 +1,229 @@
+"""
+Optional shared store for the session keys pages depend on.
+
+With EZHALNI_SESSION_STORE set, the analyzed inputs/results, the imported
+statement profile and the cached plan/cluster responses are written to a
+store every replica can read, keyed by a random session id kept in a
+SameSite=Strict cookie. A restarted or different replica restores them on
+the first run of a session, so sticky sessions are no longer needed. The
+id never appears in the URL, so shared links and browser history do not
+carry anyone's figures; tabs of one browser share the session like any
+cookie-based login.
+
+    EZHALNI_SESSION_STORE=memory                 # one process, for testing
+    EZHALNI_SESSION_STORE=sqlite:////abs/path.db # shared file, WAL mode
+    EZHALNI_SESSION_TTL=86400                    # seconds since last read or write
+
+Values are stored as zlib-compressed compact JSON, and a session is only
+rewritten when its serialized form changed.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+
+import models
+
+STORE_SPEC = os.environ.get("EZHALNI_SESSION_STORE", "")
+SESSION_TTL = float(os.environ.get("EZHALNI_SESSION_TTL", "86400"))
+PERSISTED_KEYS = (
+    "last_input", "last_result", "imported_profile", "cached_plan", "cached_cluster", "lite_mode",
+    "scenario_results",
+)
+COOKIE_NAME = "ezhalni_sid"
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+# Expired rows are purged on every Nth write instead of on a timer
+PURGE_EVERY = 200
+
+
+def encode(state):
+    data = json.dumps(state, separators=(",", ":"), sort_keys=True, default=models.json_default)
+    return zlib.compress(data.encode(), 6)
+
+
+def decode(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+# ----------------------------------------
+# 🗄️ STORES
+# ----------------------------------------
+class MemoryStore:
+    """Process-local store with the same interface as SqliteStore"""
+
+    def __init__(self, ttl=SESSION_TTL, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """The session's blob, or None; reading it restarts its TTL"""
+        now = self.clock()
+        with self._lock:
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._data[session_id]
+                return None
+            self._data[session_id] = (now + self.ttl, entry[1])
+            return entry[1]
+
+    def set(self, session_id, blob):
+        with self._lock:
+            self._data[session_id] = (self.clock() + self.ttl, blob)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+    def purge(self):
+        now = self.clock()
+        with self._lock:
+            expired = [key for key, (expires_at, _) in self._data.items() if expires_at <= now]
+            for key in expired:
+                del self._data[key]
+        return len(expired)
+
+
+class SqliteStore:
+    """One row per session; safe to share between processes on one host or volume"""
+
+    def __init__(self, path, ttl=SESSION_TTL, clock=time.time):
+        self.path = path
+        self.ttl = ttl
+        self.clock = clock
+        self._local = threading.local()
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, expires_at REAL NOT NULL, data BLOB NOT NULL)"
+            )
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, session_id):
+        """The session's blob, or None; reading it restarts its TTL"""
+        now = self.clock()
+        row = self._connection().execute(
+            "UPDATE sessions SET expires_at = ? WHERE id = ? AND expires_at > ? RETURNING data",
+            (now + self.ttl, session_id, now),
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, session_id, blob):
+        self._connection().execute(
+            "INSERT INTO sessions (id, expires_at, data) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET expires_at = excluded.expires_at, data = excluded.data",
+            (session_id, self.clock() + self.ttl, blob),
+        )
+        with self._lock:
+            self._writes += 1
+            purge = self._writes % PURGE_EVERY == 0
+        if purge:
+            self.purge()
+
+    def delete(self, session_id):
+        self._connection().execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def purge(self):
+        return self._connection().execute("DELETE FROM sessions WHERE expires_at <= ?", (self.clock(),)).rowcount
+
+
+def make_store(spec):
+    """'memory' or 'sqlite:///path'; '' means no store"""
+    if not spec:
+        return None
+    if spec == "memory":
+        return MemoryStore()
+    if spec.startswith("sqlite:///"):
+        return SqliteStore(spec[len("sqlite:///"):])
+    raise ValueError(f"Unknown session store {spec!r}; expected 'memory' or 'sqlite:///path'")
+
+
+_store = make_store(STORE_SPEC)
+
+
+def get_store():
+    return _store
+
+
+def set_store(store):
+    global _store
+    _store = store
+
+
+# ----------------------------------------
+# 🔄 STREAMLIT SESSION SYNC
+# ----------------------------------------
+def restore(session_state, cookies, decoders=None):
+    """
+    Loads this session's keys from the store once per Streamlit session;
+    decoders maps a key to a function that rebuilds its value from JSON.
+    Returns the session id when the browser cookie has to be (re)set,
+    which is on the first run of every Streamlit session, else None
+    """
+    decoders = decoders or {}
+    if _store is None or session_state.get("_session_id"):
+        return None
+    session_id = cookies.get(COOKIE_NAME)
+    if not isinstance(session_id, str) or not _SESSION_ID.fullmatch(session_id):
+        session_id = uuid.uuid4().hex
+    session_state["_session_id"] = session_id
+    blob = _store.get(session_id)
+    try:
+        stored = decode(blob) if blob is not None else {}
+    except (zlib.error, ValueError):
+        stored = {}  # unreadable; the next save() replaces it
+    for key, value in stored.items():
+        if key in session_state:
+            continue
+        try:
+            session_state[key] = decoders[key](value) if key in decoders else value
+        except (KeyError, ValueError, TypeError):
+            # Stored under an older response format: dropped here and from the store on the
+            # next save(), and recomputed on demand
+            pass
+    session_state["_session_blob"] = blob
+    return session_id
+
+
+def cookie_script(session_id, ttl=SESSION_TTL):
+    """<script> that stores the session id in the browser; re-sending it restarts the cookie's lifetime"""
+    cookie = f"{COOKIE_NAME}={session_id}; Max-Age={int(ttl)}; Path=/; SameSite=Strict"
+    return f"<script>document.cookie = {json.dumps(cookie)} + (location.protocol === 'https:' ? '; Secure' : '');</script>"
+
+
+def save(session_state):
+    """Writes the persisted keys back if they changed during this run"""
+    session_id = session_state.get("_session_id")
+    if _store is None or not session_id:
+        return
+    blob = encode({key: session_state[key] for key in PERSISTED_KEYS if session_state.get(key) is not None})
+    if blob != session_state.get("_session_blob"):
+        _store.set(session_id, blob)
+        session_state["_session_blob"] = blob
+
+
+def remember(session_state, key, inputs, compute):
+    """compute() once per distinct inputs; the result is kept under key"""
+    cached = session_state.get(key)
+    if cached and cached.get("inputs") == inputs:
+        return cached["data"]
+    data = compute()
+    session_state[key] = {"inputs": inputs, "data": data}
+    return data
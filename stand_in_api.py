@@ -0,0 +1,444 @@
+"""
+Local stand-in for the financial health API.
+
+Serves /health, /predict, /cluster and /plan with deterministic answers so the
+dashboard, the CLI and the backend client can be exercised without Cloud Run.
+It speaks the same transfer features as the real service: gzip request and
+response bodies, and ETag / If-None-Match revalidation.
+
+    python stand_in_api.py --port 8000
+    EZHALNI_API_URL=http://127.0.0.1:8000 streamlit run app.py
+
+The same fake model is importable as an in-process engine (ENGINE).
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+MODEL_VERSION = "stand-in-1"
+GENERATED_AT = datetime(2025, 1, 1).isoformat()
+GZIP_MIN_BYTES = 512
+
+# ----------------------------------------
+# 🧠 FAKE MODEL
+# ----------------------------------------
+CLUSTER_FEATURES = ("age", "monthly_income_usd", "monthly_expenses_usd", "savings_usd", "monthly_emi_usd")
+CLUSTER_SCALING = {
+    "mean": [38.0, 5200.0, 3100.0, 30000.0, 450.0],
+    "scale": [11.0, 2600.0, 1500.0, 28000.0, 400.0],
+}
+CLUSTERS = [
+    {
+        "cluster_id": 0,
+        "cluster_name": "Steady Savers",
+        "description": "Moderate income with disciplined spending and a solid savings cushion.",
+        "health_status": "Healthy",
+        "centroid": [34.0, 5500.0, 2400.0, 45000.0, 150.0],
+    },
+    {
+        "cluster_id": 1,
+        "cluster_name": "Stretched Earners",
+        "description": "Spending takes most of the paycheck and savings are thin.",
+        "health_status": "At Risk",
+        "centroid": [31.0, 3600.0, 3200.0, 6000.0, 500.0],
+    },
+    {
+        "cluster_id": 2,
+        "cluster_name": "Leveraged Professionals",
+        "description": "High income, but a large share goes to loan repayments.",
+        "health_status": "At Risk",
+        "centroid": [41.0, 8200.0, 4100.0, 20000.0, 1300.0],
+    },
+    {
+        "cluster_id": 3,
+        "cluster_name": "Established Builders",
+        "description": "High income, low debt and long emergency coverage.",
+        "health_status": "Healthy",
+        "centroid": [49.0, 9000.0, 3800.0, 90000.0, 200.0],
+    },
+]
+
+
+def _ratios(payload):
+    income = payload.get("monthly_income_usd", 0)
+    expenses = payload.get("monthly_expenses_usd", 0)
+    savings = payload.get("savings_usd", 0)
+    debt = payload.get("monthly_emi_usd", 0)
+    return {
+        "expense_ratio": round(expenses / income, 4) if income > 0 else 0,
+        "emergency_months": round(savings / expenses, 2) if expenses > 0 else 0,
+        "loan_to_income": round(debt / income, 4) if income > 0 else 0,
+    }
+
+
+def _health_score(metrics):
+    score = 100
+    score -= max(0.0, metrics["expense_ratio"] - 0.5) * 100
+    score -= max(0.0, 6 - min(metrics["emergency_months"], 6)) * 5
+    score -= max(0.0, metrics["loan_to_income"] - 0.1) * 80
+    return int(max(0, min(100, round(score))))
+
+
+def fake_predict(payload):
+    metrics = _ratios(payload)
+    health_score = _health_score(metrics)
+    prediction = "Healthy" if health_score >= 60 else "At Risk"
+    return {
+        "prediction": prediction,
+        "confidence": round(min(0.99, 0.55 + abs(health_score - 60) / 90), 3),
+        "health_score": health_score,
+        "metrics": metrics,
+        "source": MODEL_VERSION,
+    }
+
+
+def _nearest_cluster(payload):
+    point = [
+        (payload.get(f, 0) - m) / s
+        for f, m, s in zip(CLUSTER_FEATURES, CLUSTER_SCALING["mean"], CLUSTER_SCALING["scale"])
+    ]
+    def distance(c):
+        centroid = [(v - m) / s for v, m, s in zip(c["centroid"], CLUSTER_SCALING["mean"], CLUSTER_SCALING["scale"])]
+        return sum((a - b) ** 2 for a, b in zip(point, centroid))
+    return min(CLUSTERS, key=distance)
+
+
+def _group_stats(c):
+    centroid = dict(zip(CLUSTER_FEATURES, c["centroid"]))
+    return {
+        "income": centroid["monthly_income_usd"],
+        "savings": centroid["savings_usd"],
+        "debt": centroid["monthly_emi_usd"],
+    }
+
+
+ASSESSMENT_TOLERANCE = 0.1
+
+
+def _assess(yours, average, lower_is_better=False):
+    if average and abs(yours - average) / average < ASSESSMENT_TOLERANCE:
+        return "Similar"
+    better = yours < average if lower_is_better else yours > average
+    return "Better" if better else "Worse"
+
+
+def fake_cluster(payload):
+    c = _nearest_cluster(payload)
+    stats = _group_stats(c)
+    yours = {
+        "income": payload.get("monthly_income_usd", 0),
+        "savings": payload.get("savings_usd", 0),
+        "debt": payload.get("monthly_emi_usd", 0),
+    }
+    expenses = payload.get("monthly_expenses_usd", 0)
+    cash_flow = yours["income"] - expenses
+    emergency_months = yours["savings"] / expenses if expenses > 0 else 0
+    expense_ratio = expenses / yours["income"] if yours["income"] > 0 else 0
+    loan_to_income = yours["debt"] / yours["income"] if yours["income"] > 0 else 0
+    return {
+        "cluster_id": c["cluster_id"],
+        "cluster_name": c["cluster_name"],
+        "description": c["description"],
+        "health_status": c["health_status"],
+        "comparison": {
+            "group_name": c["cluster_name"],
+            **{
+                key: {
+                    "yours": yours[key],
+                    "group_average": stats[key],
+                    "assessment": _assess(yours[key], stats[key], lower_is_better=key == "debt"),
+                }
+                for key in ("income", "savings", "debt")
+            },
+        },
+        "characteristics": {
+            "cash_flow": f"${cash_flow:,.0f}",
+            "emergency_fund": f"{emergency_months:.1f} months",
+            "expense_ratio": f"{expense_ratio * 100:.1f}%",
+            "debt_level": "Low" if loan_to_income < 0.15 else "High",
+        },
+        "model_version": MODEL_VERSION,
+    }
+
+
+def fake_plan(payload):
+    income = payload.get("monthly_income_usd", 0)
+    expenses = payload.get("monthly_expenses_usd", 0)
+    savings = payload.get("savings_usd", 0)
+    debt = payload.get("monthly_emi_usd", 0)
+    metrics = _ratios(payload)
+    health_score = _health_score(metrics)
+    health_status = "Healthy" if health_score >= 60 else "At Risk"
+    surplus = max(0, income - expenses - debt)
+
+    issues, strengths = [], []
+    if metrics["emergency_months"] < 3:
+        issues.append({"type": "critical", "title": "Thin emergency fund",
+                       "description": "Less than three months of expenses are covered by savings."})
+    else:
+        strengths.append({"title": "Emergency cushion",
+                          "description": f"Savings cover {metrics['emergency_months']:.1f} months of expenses."})
+    if metrics["expense_ratio"] > 0.7:
+        issues.append({"type": "high", "title": "High spending",
+                       "description": "More than 70% of income goes to expenses."})
+    else:
+        strengths.append({"title": "Controlled spending",
+                          "description": f"Expenses use {metrics['expense_ratio'] * 100:.0f}% of income."})
+    if metrics["loan_to_income"] > 0.2:
+        issues.append({"type": "high", "title": "Heavy loan payments",
+                       "description": "Loan payments take more than 20% of income."})
+    severity = "critical" if any(i["type"] == "critical" for i in issues) else "high" if issues else "low"
+
+    target = expenses * 6
+    ef_contribution = round(min(surplus * 0.5, max(0, target - savings)), 2)
+    should_focus = metrics["loan_to_income"] > 0.2
+    extra_payment = round(surplus * 0.3, 2) if should_focus else 0
+    term = payload.get("loan_term_months", 0) or 0
+    can_invest = metrics["emergency_months"] >= 3 and not should_focus
+    risk_score = int(max(10, min(90, 100 - payload.get("age", 30))))
+    stocks = round(risk_score / 100, 2)
+    recommendations = {
+        "emergency_fund": {
+            "current_amount": savings,
+            "current_months": metrics["emergency_months"],
+            "target_amount": target,
+            "monthly_contribution": ef_contribution,
+            "months_to_goal": round(max(0, target - savings) / ef_contribution, 1) if ef_contribution > 0 else 0,
+        },
+        "debt": {
+            "should_focus": should_focus,
+            "current_payment": debt,
+            "extra_payment": extra_payment,
+            "total_payment": debt + extra_payment,
+            "payoff_months": round(term * debt / (debt + extra_payment), 1) if debt + extra_payment > 0 else 0,
+        },
+        "investment": {
+            "can_invest": can_invest,
+            "recommended_monthly": round(surplus * 0.3, 2) if can_invest else 0,
+        },
+        "investment_type": {
+            "type": "Growth" if risk_score >= 60 else "Balanced" if risk_score >= 40 else "Conservative",
+            "risk_score": risk_score,
+            "reasoning": "Allocation follows the years left until retirement.",
+            "allocation": {
+                "Stocks": stocks,
+                "Bonds": round((1 - stocks) * 0.7, 2),
+                "Cash": round(1 - stocks - round((1 - stocks) * 0.7, 2), 2),
+            },
+        },
+        "savings": {
+            "current_rate": round(surplus / income, 4) if income > 0 else 0,
+            "target_rate": 0.2,
+            "current_monthly": surplus,
+            "recommended_monthly": round(income * 0.2, 2),
+        },
+    }
+    if metrics["expense_ratio"] > 0.6:
+        recommendations["expense_reduction"] = {
+            "current": expenses,
+            "recommended": round(income * 0.6, 2),
+            "savings_monthly": round(expenses - income * 0.6, 2),
+            "categories": ["Dining out", "Subscriptions", "Shopping"],
+        }
+
+    top_priority = issues[0]["title"] if issues else "Grow your investments"
+    narrative = "\n".join(
+        [f"Financial plan ({health_status}, score {health_score}/100)", ""] +
+        [f"- Fix: {i['title']}. {i['description']}" for i in issues] +
+        [f"- Keep: {s['title']}. {s['description']}" for s in strengths] +
+        ["", f"Put ${ef_contribution:,.0f}/month towards a ${target:,.0f} emergency fund."]
+    )
+    return {
+        "summary": {
+            "health_status": health_status,
+            "health_score": health_score,
+            "action_items": len(issues),
+            "top_priority": top_priority,
+        },
+        "structured": {"severity": severity, "issues": issues, "strengths": strengths},
+        "recommendations": recommendations,
+        "narrative": narrative,
+        "generated_at": GENERATED_AT,
+    }
+
+
+def cluster_definitions():
+    """Everything a client needs to assign clusters without calling /cluster"""
+    return {
+        "model_version": MODEL_VERSION,
+        "features": list(CLUSTER_FEATURES),
+        "scaling": CLUSTER_SCALING,
+        "assessment_tolerance": ASSESSMENT_TOLERANCE,
+        "clusters": [
+            {
+                "cluster_id": c["cluster_id"],
+                "cluster_name": c["cluster_name"],
+                "description": c["description"],
+                "health_status": c["health_status"],
+                "centroid": c["centroid"],
+                "group_stats": _group_stats(c),
+            }
+            for c in CLUSTERS
+        ],
+    }
+
+
+# In-process engine: EZHALNI_TRANSPORT=inprocess EZHALNI_ENGINE=stand_in_api:ENGINE
+ENGINE = SimpleNamespace(
+    predict=fake_predict,
+    cluster=fake_cluster,
+    plan=fake_plan,
+    cluster_definitions=cluster_definitions,
+)
+
+
+ROUTES = {
+    "/predict": fake_predict,
+    "/cluster": fake_cluster,
+    "/plan": fake_plan,
+}
+
+
+# ----------------------------------------
+# 🌐 HTTP SERVER
+# ----------------------------------------
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, key):
+        with self.server.stats_lock:
+            self.server.stats[key] = self.server.stats.get(key, 0) + 1
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, sort_keys=True).encode()
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self._count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        if len(body) >= GZIP_MIN_BYTES and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+            self._count("gzip_responses")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout or a losing hedged attempt)
+            pass
+
+    def _simulate_latency(self):
+        if self.server.scale_to_zero:
+            idle_seconds, cold_start_delay = self.server.scale_to_zero
+            with self.server.stats_lock:
+                last = self.server.last_request_at
+                # Idle means no request in flight and none finished within idle_seconds
+                cold = self.server.in_flight == 0 and (last is None or time.monotonic() - last > idle_seconds)
+                self.server.in_flight += 1
+            if cold:
+                self._count("cold_starts")
+                time.sleep(cold_start_delay)
+        latency = self.server.latency
+        delay = latency(self.path) if callable(latency) else latency
+        if delay:
+            time.sleep(delay)
+
+    def _finish(self):
+        if self.server.scale_to_zero:
+            with self.server.stats_lock:
+                self.server.in_flight -= 1
+                self.server.last_request_at = time.monotonic()
+
+    def do_GET(self):
+        self._count("requests")
+        self._simulate_latency()
+        try:
+            if self.path == "/health":
+                self._send_json({"status": "healthy", "model_version": MODEL_VERSION})
+            elif self.path == "/cluster/definitions":
+                self._send_json(cluster_definitions())
+            else:
+                self._send_json({"detail": "Not Found"}, status=404)
+        finally:
+            self._finish()
+
+    def do_POST(self):
+        self._count("requests")
+        self._simulate_latency()
+        try:
+            self._handle_post()
+        finally:
+            self._finish()
+
+    def _handle_post(self):
+        route = ROUTES.get(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if route is None:
+            self._send_json({"detail": "Not Found"}, status=404)
+            return
+        encoding = self.headers.get("Content-Encoding", "identity")
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+            self._count("gzip_requests")
+        elif encoding != "identity":
+            self._send_json({"detail": f"Unsupported encoding {encoding}"}, status=415)
+            return
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._send_json({"detail": "Invalid JSON"}, status=422)
+            return
+        self._send_json(route(payload))
+
+
+def _make_server(host, port, latency=0, scale_to_zero=None):
+    server = ThreadingHTTPServer((host, port), StandInHandler)
+    server.daemon_threads = True
+    server.stats = {}
+    server.stats_lock = threading.Lock()
+    # Seconds to sleep per request, or a callable(path) -> seconds
+    server.latency = latency
+    # (idle_seconds, cold_start_delay): mimic Cloud Run scaling to zero when idle
+    server.scale_to_zero = scale_to_zero
+    server.last_request_at = None  # when the last request finished
+    server.in_flight = 0
+    return server
+
+
+def start_stand_in(host="127.0.0.1", port=0, latency=0, scale_to_zero=None):
+    """Starts the server on a background thread; returns (server, base_url)"""
+    server = _make_server(host, port, latency, scale_to_zero)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the local stand-in API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="Seconds added to every request")
+    parser.add_argument("--scale-to-zero", type=float, default=None, metavar="IDLE",
+                        help="Simulate a cold start after IDLE seconds without requests")
+    parser.add_argument("--cold-start-delay", type=float, default=5.0)
+    args = parser.parse_args()
+    scale_to_zero = (args.scale_to_zero, args.cold_start_delay) if args.scale_to_zero is not None else None
+    server = _make_server(args.host, args.port, args.latency, scale_to_zero)
+    print(f"Stand-in API listening on http://{args.host}:{args.port}")
+    server.serve_forever()
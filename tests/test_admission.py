@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+import admission
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_at_its_rate_up_to_the_burst():
+    clock = Clock()
+    bucket = admission.TokenBucket(rate=2, burst=3, clock=clock)
+    assert [bucket.take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.take() == pytest.approx(0.5)
+    clock.now = 0.5
+    assert bucket.take() == 0
+    clock.now = 100
+    assert bucket.wait() == 0 and bucket.tokens == 3
+
+
+def test_wait_takes_nothing():
+    bucket = admission.TokenBucket(rate=1, burst=1, clock=Clock())
+    assert bucket.wait() == 0
+    assert bucket.wait() == 0
+    assert bucket.take() == 0
+    assert bucket.wait() == pytest.approx(1)
+
+
+def test_rate_and_session_sheds():
+    clock = Clock()
+    controller = admission.AdmissionController(rate=10, burst=2, session_rate=1, session_burst=1, clock=clock)
+    with controller.admit("a"):
+        pass
+    with pytest.raises(admission.Overloaded) as shed:
+        with controller.admit("a"):
+            pass
+    assert shed.value.reason == "session" and shed.value.retry_after == pytest.approx(1)
+    with controller.admit("b"):
+        pass
+    with pytest.raises(admission.Overloaded) as shed:
+        with controller.admit("c"):
+            pass
+    assert shed.value.reason == "rate"
+    assert controller.snapshot()["admitted"] == 2
+
+
+def test_shed_calls_do_not_spend_tokens():
+    clock = Clock()
+    controller = admission.AdmissionController(rate=1, burst=2, session_rate=1, session_burst=2,
+                                               max_inflight=1, max_queue=0, clock=clock)
+    with controller.admit("a"):
+        # The only slot is taken and there is no queue: shed without spending
+        for _ in range(5):
+            with pytest.raises(admission.Overloaded) as shed:
+                with controller.admit("b"):
+                    pass
+            assert shed.value.reason == "queue"
+    # Global and "b" session buckets still have their tokens
+    with controller.admit("b"):
+        pass
+    assert controller._sessions["b"].tokens == pytest.approx(1)
+    assert controller._bucket.tokens == pytest.approx(0)
+
+
+def test_rate_shed_does_not_spend_the_session_token():
+    controller = admission.AdmissionController(rate=0, burst=0, session_rate=0, session_burst=1, clock=Clock())
+    with pytest.raises(admission.Overloaded):
+        with controller.admit("a"):
+            pass
+    assert controller._sessions["a"].tokens == 1
+
+
+def test_queued_call_times_out_and_frees_its_place():
+    controller = admission.AdmissionController(rate=100, burst=100, max_inflight=1, max_queue=1, queue_wait=0.05)
+    with controller.admit():
+        with pytest.raises(admission.Overloaded) as shed:
+            with controller.admit():
+                pass
+        assert shed.value.reason == "queue"
+    stats = controller.snapshot()
+    assert stats["queued"] == 1 and stats["shed_queue"] == 1
+    assert stats["waiting"] == 0 and stats["inflight"] == 0
+    assert controller._bucket.tokens == pytest.approx(99, abs=0.5)
+
+
+def test_queued_call_runs_when_a_slot_frees():
+    controller = admission.AdmissionController(rate=100, burst=100, max_inflight=1, max_queue=1, queue_wait=5)
+    release, admitted = threading.Event(), threading.Event()
+
+    def holder():
+        with controller.admit():
+            release.wait(5)
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    while controller.snapshot()["inflight"] == 0:
+        pass
+
+    def waiter():
+        with controller.admit():
+            admitted.set()
+
+    queued = threading.Thread(target=waiter)
+    queued.start()
+    while controller.snapshot()["waiting"] == 0:
+        pass
+    assert not admitted.is_set()
+    release.set()
+    assert admitted.wait(5)
+    thread.join()
+    queued.join()
+    assert controller.snapshot()["admitted"] == 2
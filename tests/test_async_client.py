@@ -0,0 +1,199 @@
+import socket
+import ssl
+import threading
+
+import certifi
+import pytest
+
+import async_client
+
+
+class RawServer:
+    """Socket server running handler(conn, requests) per connection; requests collects request heads"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.sock = socket.create_server(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self.sock.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            self.handler(conn, self)
+
+    def read_request(self, conn):
+        """Request head plus body, or None once the client hangs up"""
+        data = b""
+        while b"\r\n\r\n" not in data:
+            chunk = conn.recv(65536)
+            if not chunk:
+                return None
+            data += chunk
+        head, _, body = data.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:])}
+        while len(body) < int(headers.get("content-length", 0)):
+            body += conn.recv(65536)
+        request = {"line": lines[0], "headers": headers, "body": body}
+        self.requests.append(request)
+        return request
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(handler):
+        server = RawServer(handler)
+        servers.append(server)
+        return server
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(autouse=True)
+def no_proxy_env(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "all_proxy", "no_proxy", "REQUESTS_CA_BUNDLE", "CURL_CA_BUNDLE"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+    monkeypatch.setattr(async_client, "_clients", {})
+
+
+def request(client, method="GET", path="/", body=b"", headers=None):
+    return async_client.run(client.request(method, path, body, headers, timeout=5), timeout=10)
+
+
+def ok(body=b"ok", extra=""):
+    return (f"HTTP/1.1 200 OK\r\nContent-Length: {len(body)}\r\n{extra}\r\n").encode() + body
+
+
+def test_chunked_responses_are_decoded(serve):
+    def handler(conn, server):
+        while server.read_request(conn):
+            conn.sendall(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                         b"5;ext=1\r\nhello\r\n7\r\n, world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+
+    server = serve(handler)
+    client = async_client.AsyncClient(server.url)
+    assert request(client).content == b"hello, world"
+    # The trailer was consumed, so the connection is reused cleanly
+    assert request(client).content == b"hello, world"
+    assert client.stats["connections_opened"] == 1
+
+
+def test_stale_keep_alive_connection_is_retried_on_a_fresh_one(serve):
+    def handler(conn, server):
+        # Answers once, then closes the kept-alive connection before the next request
+        if server.read_request(conn):
+            conn.sendall(ok())
+
+    server = serve(handler)
+    client = async_client.AsyncClient(server.url)
+    assert request(client).content == b"ok"
+    assert request(client).content == b"ok"
+    assert client.stats["connections_opened"] == 2
+
+
+def test_truncated_response_is_not_resent(serve):
+    def handler(conn, server):
+        server.read_request(conn)
+        conn.sendall(ok())
+        if server.read_request(conn):
+            conn.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 100\r\n\r\npartial")
+
+    server = serve(handler)
+    client = async_client.AsyncClient(server.url)
+    request(client)
+    with pytest.raises(async_client._Truncated):
+        request(client, "POST", "/plan", b"{}")
+    assert [r["line"] for r in server.requests] == ["GET / HTTP/1.1", "POST /plan HTTP/1.1"]
+
+
+def test_redirects_are_followed_like_requests(serve):
+    def handler(conn, server):
+        while (req := server.read_request(conn)) is not None:
+            path = req["line"].split()[1]
+            if path == "/api/old":
+                conn.sendall(b"HTTP/1.1 307 Temporary Redirect\r\nLocation: /api/new\r\nContent-Length: 0\r\n\r\n")
+            elif path == "/api/moved":
+                conn.sendall(b"HTTP/1.1 303 See Other\r\nLocation: /api/new?from=303\r\nContent-Length: 0\r\n\r\n")
+            elif path == "/api/loop":
+                conn.sendall(b"HTTP/1.1 302 Found\r\nLocation: /api/loop\r\nContent-Length: 0\r\n\r\n")
+            else:
+                conn.sendall(ok(req["line"].encode() + b" " + req["body"]))
+
+    server = serve(handler)
+    client = async_client.AsyncClient(server.url + "/api")
+    # 307 keeps the method and body
+    assert request(client, "POST", "/old", b"{}").content == b"POST /api/new HTTP/1.1 {}"
+    # 303 turns the POST into a GET without a body
+    response = request(client, "POST", "/moved", b"{}", {"Content-Encoding": "gzip"})
+    assert response.content == b"GET /api/new?from=303 HTTP/1.1 "
+    assert "content-encoding" not in server.requests[-1]["headers"]
+    with pytest.raises(ConnectionError, match="redirects"):
+        request(client, "GET", "/loop")
+
+
+def test_plain_http_goes_through_the_proxy(serve, monkeypatch):
+    def handler(conn, server):
+        while server.read_request(conn):
+            conn.sendall(ok(b"via proxy"))
+
+    proxy = serve(handler)
+    monkeypatch.setenv("HTTP_PROXY", proxy.url.replace("http://", "http://user:p%40ss@"))
+    client = async_client.AsyncClient("http://api.example:8000/v1")
+    assert request(client, "POST", "/predict", b"{}").content == b"via proxy"
+    sent = proxy.requests[0]
+    assert sent["line"] == "POST http://api.example:8000/v1/predict HTTP/1.1"
+    assert sent["headers"]["host"] == "api.example:8000"
+    assert sent["headers"]["proxy-authorization"] == "Basic dXNlcjpwQHNz"  # user:p@ss
+
+
+def test_https_is_tunnelled_and_a_refused_tunnel_is_reported(serve, monkeypatch):
+    def handler(conn, server):
+        server.read_request(conn)
+        conn.sendall(b"HTTP/1.1 407 Proxy Authentication Required\r\nContent-Length: 0\r\n\r\n")
+
+    proxy = serve(handler)
+    monkeypatch.setenv("HTTPS_PROXY", proxy.url)
+    client = async_client.AsyncClient("https://api.example")
+    with pytest.raises(async_client.ProxyError, match="407"):
+        request(client)
+    assert proxy.requests[0]["line"] == "CONNECT api.example:443 HTTP/1.1"
+
+
+def test_no_proxy_connects_directly(serve, monkeypatch):
+    def handler(conn, server):
+        while server.read_request(conn):
+            conn.sendall(ok())
+
+    server = serve(handler)
+    monkeypatch.setenv("HTTP_PROXY", "http://127.0.0.1:9")
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    client = async_client.AsyncClient(server.url)
+    assert client.proxy is None
+    assert request(client).content == b"ok"
+
+
+def test_ca_bundle_replaces_the_trusted_certificates(monkeypatch, tmp_path):
+    with open(certifi.where(), encoding="ascii") as f:
+        first = f.read().split("-----END CERTIFICATE-----")[0] + "-----END CERTIFICATE-----\n"
+    bundle = tmp_path / "ca.pem"
+    bundle.write_text(first)
+    monkeypatch.setenv("REQUESTS_CA_BUNDLE", str(bundle))
+    context = async_client.AsyncClient("https://api.example").ssl
+    assert context.cert_store_stats()["x509_ca"] == 1
+    assert context.verify_mode == ssl.CERT_REQUIRED
@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+import async_client
+import background
+import backend
+import models
+from stand_in_api import start_stand_in
+
+
+class Status:
+    def caption(self, text):
+        pass
+
+    def empty(self):
+        pass
+
+
+@pytest.fixture(params=[backend.HttpTransport, backend.AsyncHttpTransport], ids=["http", "async"])
+def slow_backend(request, monkeypatch):
+    server, url = start_stand_in(latency=5)
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_transport", request.param())
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_cancelling_a_backend_call_abandons_the_request(slow_backend):
+    state = {}
+    call = background.BackendCall("predict", dict(backend.DEFAULT_PROFILE, age=41), models.Prediction.decode)
+    task = background.start(state, "📊 Insights", "inputs", call, seconds=10)
+    client = async_client.get_client(slow_backend)
+    for _ in range(50):
+        if client.stats["pending"]:
+            break
+        time.sleep(0.02)
+    assert client.stats["pending"] == 1
+
+    background.cancel_except(state, "🧠 Plan")
+    assert task.future.cancelled()
+    for _ in range(50):
+        if not client.stats["pending"]:
+            break
+        time.sleep(0.02)
+    # Gone from the loop long before the 5s answer; no pool worker was involved
+    assert client.stats["pending"] == 0
+    assert not state[background.STATE_KEY]
+
+
+def test_calls_wait_normally(monkeypatch):
+    server, url = start_stand_in()
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_transport", backend.HttpTransport())
+    try:
+        call = background.BackendCall("predict", backend.DEFAULT_PROFILE, models.Prediction.decode)
+        result = background.run({}, "📊 Insights", "inputs", call, 10, Status())
+        assert result.prediction
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+import backtest
+
+BUNDLED = os.path.join(os.path.dirname(__file__), os.pardir, "data", "returns.csv")
+
+
+def test_yearly_returns_compound_back_to_the_year(tmp_path):
+    path = tmp_path / "returns.csv"
+    path.write_text("year,Stocks,Cash\n2000,0.12,0.03\n2001,-0.2,0.01\n")
+    dataset = backtest.ReturnsDataset(path)
+    assert list(dataset.months[:2]) == ["2000-01", "2000-02"]
+    assert dataset.months[-1] == "2001-12"
+    growth = np.prod(1 + dataset.returns.reshape(2, 12, 2), axis=1) - 1
+    assert growth == pytest.approx(np.array([[0.12, 0.03], [-0.2, 0.01]]))
+
+
+def test_bundled_history_covers_every_horizon():
+    dataset = backtest.ReturnsDataset(BUNDLED)
+    assert set(dataset.assets) == {"stocks", "bonds", "cash"}
+    assert len(dataset.months) >= max(backtest.HORIZON_YEARS) * 12
+    assert not np.isnan(dataset.returns).any()
+
+
+def test_bundled_returns_load_from_any_working_directory(tmp_path):
+    import subprocess
+    import sys
+
+    env = {k: v for k, v in os.environ.items() if k != "EZHALNI_RETURNS_DATA"}
+    env["PYTHONPATH"] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, "-c", "import backtest; print(backtest.get_dataset() is not None)"],
+                         cwd=tmp_path, env=env, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "True"
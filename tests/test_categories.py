@@ -0,0 +1,21 @@
+import pytest
+
+import categories
+
+
+@pytest.mark.parametrize("description, category", [
+    ("BAR HARBOR SHELL 0042", "Transport"),
+    ("JOES BAR & GRILL", "Dining"),
+    ("BLUE WATER GRILL", "Dining"),
+    ("THE CORNER BAR", "Dining"),
+    ("TARGET MARKET PLACE", "Shopping"),
+    ("UNION SQ FARMERS MARKET", "Groceries"),
+    ("CITY MARKET #12", "Groceries"),
+    ("METRO PCS WIRELESS", "Utilities"),
+    ("CITY WATER DEPT", "Utilities"),
+    ("UBER EATS 8005928996", "Dining"),
+    ("UBER TRIP", "Transport"),
+    ("WIRE FROM ACME", categories.OTHER),
+])
+def test_categorize(description, category):
+    assert categories.categorize(description) == category
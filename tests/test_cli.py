@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import backend
+import cli
+from stand_in_api import start_stand_in
+
+GOOD = [
+    {"age": 30, "monthly_income_usd": 5000, "monthly_expenses_usd": 3000, "savings_usd": 12000},
+    {"monthly_income_usd": 4200.5, "monthly_emi_usd": 300},
+]
+BAD = [
+    {"monthly_income_usd": "5000"},
+    {"age": None},
+    {"age": True},
+    {"salary": 5000},
+    [30, 5000],
+]
+
+
+@pytest.fixture(autouse=True)
+def restore_backend(monkeypatch):
+    # main() points backend at --api-url / --transport for the rest of the process
+    monkeypatch.setattr(backend, "API_URL", backend.API_URL)
+    monkeypatch.setattr(backend, "_transport", backend._transport)
+
+
+def write_jsonl(tmp_path, rows, name="profiles.jsonl"):
+    path = tmp_path / name
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    return str(path)
+
+
+def run(capsys, *argv):
+    code = cli.main([*argv, "--workers", "2", "--batch-size", "3"])
+    out, err = capsys.readouterr()
+    return code, [json.loads(line) for line in out.splitlines()], err
+
+
+def test_good_rows_are_scored(tmp_path, capsys):
+    code, records, err = run(capsys, write_jsonl(tmp_path, GOOD), "--endpoints", "none")
+    assert code == 0
+    assert [r["index"] for r in records] == [0, 1]
+    assert records[0]["metrics"]["cash_flow"] == 2000
+    assert records[1]["input"]["age"] == backend.DEFAULT_PROFILE["age"]
+    assert not any("errors" in r for r in records)
+    assert "Scored 2 profiles (0 with errors)" in err
+
+
+def test_bad_rows_are_reported_as_row_errors(tmp_path, capsys):
+    code, records, err = run(capsys, write_jsonl(tmp_path, BAD), "--endpoints", "none")
+    assert code == 1
+    assert len(records) == len(BAD)
+    assert all(set(r) == {"index", "errors"} for r in records)
+    assert "monthly_income_usd must be a number" in records[0]["errors"]["input"]
+    assert "Unknown profile fields: salary" in records[3]["errors"]["input"]
+    assert "JSON object" in records[4]["errors"]["input"]
+
+
+def test_mixed_file_keeps_every_good_row(tmp_path, capsys):
+    server, url = start_stand_in()
+    try:
+        rows = [GOOD[0], BAD[0], GOOD[1], BAD[1], GOOD[0]]
+        code, records, err = run(capsys, write_jsonl(tmp_path, rows), "--api-url", url,
+                                 "--transport", "http", "--endpoints", "predict")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert code == 1
+    assert [r["index"] for r in records] == list(range(len(rows)))
+    for record, row in zip(records, rows):
+        if row in GOOD:
+            assert "errors" not in record and "health_score" in record["predict"]
+        else:
+            assert "input" in record["errors"] and "predict" not in record
+    assert "Scored 5 profiles (2 with errors)" in err
+
+
+def test_json_array_and_single_object_inputs(tmp_path, capsys):
+    array = tmp_path / "profiles.json"
+    array.write_text(json.dumps(GOOD, indent=2))
+    single = tmp_path / "one.json"
+    single.write_text(json.dumps(GOOD[0], indent=2))
+    code, records, _ = run(capsys, str(array), str(single), "--endpoints", "none")
+    assert code == 0
+    assert [r["input"]["monthly_income_usd"] for r in records] == [5000, 4200.5, 5000]
+
+
+def test_unknown_endpoint_is_a_usage_error(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        cli.main([write_jsonl(tmp_path, GOOD), "--endpoints", "predict,forecast"])
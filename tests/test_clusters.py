@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+import pytest
+
+import backend
+import clusters
+import stand_in_api
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(clusters, "_models", {})
+    monkeypatch.setattr(clusters, "_current", {"version": None, "checked_at": None, "refreshing": False})
+
+
+def test_definitions_are_fetched_without_holding_the_lock(monkeypatch):
+    def fetch(deadline=None):
+        assert not clusters._lock.locked()
+        return stand_in_api.cluster_definitions()
+
+    monkeypatch.setattr(backend, "cluster_definitions", fetch)
+    assert clusters.get_model().version == stand_in_api.MODEL_VERSION
+
+
+def test_stale_model_is_served_while_another_session_refreshes(monkeypatch):
+    monkeypatch.setattr(backend, "cluster_definitions", lambda deadline=None: stand_in_api.cluster_definitions())
+    model = clusters.get_model()
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fetch(deadline=None):
+        started.set()
+        release.wait(5)
+        return stand_in_api.cluster_definitions()
+
+    monkeypatch.setattr(backend, "cluster_definitions", slow_fetch)
+    clusters._current["checked_at"] -= clusters.DEFINITIONS_TTL + 1
+    refresher = threading.Thread(target=clusters.get_model)
+    refresher.start()
+    assert started.wait(5)
+    # Returns at once with the last known version instead of queueing behind the fetch
+    assert clusters.get_model() is model
+    release.set()
+    refresher.join(5)
+    assert not clusters._current["refreshing"]
+
+
+def test_deadline_error_clears_the_refresh_flag(monkeypatch):
+    def timeout(deadline=None):
+        raise backend.DeadlineExceeded("cluster/definitions")
+
+    monkeypatch.setattr(backend, "cluster_definitions", timeout)
+    with pytest.raises(backend.DeadlineExceeded):
+        clusters.get_model()
+    assert not clusters._current["refreshing"]
+
+
+def test_local_assignment_matches_the_api(monkeypatch):
+    monkeypatch.setattr(backend, "cluster_definitions", lambda deadline=None: stand_in_api.cluster_definitions())
+    rng = np.random.default_rng(7)
+    payloads = [
+        {
+            "age": int(rng.integers(18, 80)),
+            "monthly_income_usd": float(rng.integers(0, 300) * 100),
+            "monthly_expenses_usd": float(rng.integers(0, 200) * 100),
+            "savings_usd": float(rng.integers(0, 400) * 500),
+            "monthly_emi_usd": float(rng.integers(0, 60) * 50),
+            "loan_interest_rate_pct": round(float(rng.uniform(0, 25)), 1),
+            "loan_term_months": int(rng.integers(0, 60) * 6),
+        }
+        for _ in range(500)
+    ]
+    assert clusters.assign_batch(payloads) == [stand_in_api.fake_cluster(p) for p in payloads]
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import goals
+import models
+
+PAYLOAD = {
+    "age": 30, "monthly_income_usd": 6000, "monthly_expenses_usd": 3000, "savings_usd": 5000,
+    "monthly_emi_usd": 400, "loan_interest_rate_pct": 18.0, "loan_term_months": 36,
+}
+
+
+def test_loan_balance_matches_the_annuity_formula():
+    assert goals.loan_balance(0, 5, 24) == 0
+    assert goals.loan_balance(100, 0, 24) == 2400
+    # 12 payments of 100 at 12%/year discount to about 1125.51
+    assert goals.loan_balance(100, 12, 12) == pytest.approx(1125.51, abs=0.01)
+
+
+def test_split_grid_covers_every_split_once():
+    grid = goals.split_grid(step=0.25)
+    assert np.allclose(grid.sum(axis=1), 1)
+    assert len({tuple(row) for row in grid}) == len(grid) == 15
+    assert (goals.split_grid(step=0.25, emergency=False)[:, 0] == 0).all()
+    assert (goals.split_grid(step=0.25, debt=False)[:, 1] == 0).all()
+
+
+def test_no_surplus_means_no_plan():
+    assert goals.optimize_split({**PAYLOAD, "monthly_expenses_usd": 5600}) is None
+
+
+def test_expensive_debt_is_paid_before_investing():
+    split = goals.optimize_split({**PAYLOAD, "savings_usd": 50_000})
+    assert split["surplus"] == 2600
+    assert split["shares"]["emergency_fund"] == 0
+    assert sum(split["shares"].values()) == pytest.approx(1)
+    assert split["shares"]["debt"] > split["shares"]["investing"]
+    assert split["debt_free_month"] is not None
+
+    cheap = goals.optimize_split({**PAYLOAD, "loan_interest_rate_pct": 1.0, "savings_usd": 50_000})
+    assert cheap["shares"]["investing"] > cheap["shares"]["debt"]
+
+
+def test_api_recommendations_are_scored_as_the_baseline():
+    recommendations = models.Recommendations.decode({
+        "emergency_fund": {"monthly_contribution": 1000},
+        "debt": {"extra_payment": 500},
+        "investment": {"recommended_monthly": 500},
+    })
+    assert goals.baseline_shares(recommendations, 2600) == pytest.approx((1000 / 2600, 500 / 2600, 1100 / 2600))
+    split = goals.optimize_split(PAYLOAD, recommendations)
+    assert split["baseline"]["months_to_safety"] >= split["months_to_safety"]
+    assert goals.baseline_shares(None, 2600) is None
+
+
+def test_mutating_a_result_does_not_corrupt_the_cache():
+    first = goals.optimize_split(PAYLOAD)
+    expected = {**first, "shares": dict(first["shares"])}
+    first["shares"]["debt"] = -1
+    first["surplus"] = 0
+    second = goals.optimize_split(PAYLOAD)
+    assert second == expected
+    assert second is not first
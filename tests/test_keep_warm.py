@@ -0,0 +1,82 @@
+from datetime import datetime
+
+import pytest
+
+import backend
+import keep_warm
+from stand_in_api import start_stand_in
+
+MONDAY_NOON = datetime(2024, 1, 8, 12, 0)
+
+
+def at(*args):
+    return lambda: datetime(*args)
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    # Idle for 0.3s -> the next request waits 0.3s for a "cold start"
+    server, url = start_stand_in(scale_to_zero=(0.3, 0.3))
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_transport", backend.HttpTransport())
+    monkeypatch.setattr(backend, "_activity", {"last_request_at": None})
+    monkeypatch.setattr(keep_warm, "COLD_START_SECONDS", 0.2)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_scheduler_detects_cold_starts_and_skips_on_traffic(stand_in):
+    scheduler = keep_warm.KeepWarmScheduler(interval=120, now=lambda: MONDAY_NOON)
+
+    assert scheduler.tick() == "probe"
+    assert stand_in.stats["cold_starts"] == 1
+    assert scheduler.stats["cold_starts"] == 1
+    assert scheduler.interval == 60
+
+    # Probes do not count as traffic, so the next tick probes the now warm instance
+    assert scheduler.tick() == "probe"
+    assert scheduler.stats["cold_starts"] == 1
+
+    backend.predict(backend.DEFAULT_PROFILE)
+    assert scheduler.tick() == "traffic"
+    assert scheduler.stats["probes"] == 2
+    assert scheduler.stats["skipped_traffic"] == 1
+    assert stand_in.stats["cold_starts"] == 1
+
+
+def test_scheduler_sleeps_off_hours(stand_in):
+    scheduler = keep_warm.KeepWarmScheduler(now=at(2024, 1, 13, 12, 0))  # Saturday
+    assert scheduler.tick() == "off_hours"
+    assert "requests" not in stand_in.stats
+
+
+def test_stand_in_idle_timer_starts_when_a_request_finishes(monkeypatch):
+    # Each request takes longer than the idle timeout; back-to-back requests stay warm
+    server, url = start_stand_in(latency=0.4, scale_to_zero=(0.3, 0.1))
+    monkeypatch.setattr(backend, "API_URL", url)
+    try:
+        backend.HttpTransport().health(record=False)
+        backend.HttpTransport().health(record=False)
+        assert server.stats["cold_starts"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize("now, expected", [
+    (datetime(2024, 1, 8, 23, 0), True),   # Monday night
+    (datetime(2024, 1, 9, 3, 0), True),    # small hours of Monday's window
+    (datetime(2024, 1, 8, 3, 0), False),   # Sunday's window: not a business day
+    (datetime(2024, 1, 13, 3, 0), True),   # Friday's window runs into Saturday
+    (datetime(2024, 1, 13, 23, 0), False),
+    (datetime(2024, 1, 9, 12, 0), False),
+])
+def test_overnight_window(now, expected):
+    scheduler = keep_warm.KeepWarmScheduler(hours="22:00-06:00", days="mon-fri", now=lambda: now)
+    assert scheduler.in_business_hours() is expected
+
+
+def test_empty_window_is_rejected():
+    with pytest.raises(ValueError):
+        keep_warm.KeepWarmScheduler(hours="08:00-08:00")
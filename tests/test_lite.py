@@ -0,0 +1,112 @@
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+import charts
+import lite
+
+
+def parse(svg):
+    """The SVG as an element tree; fails on malformed markup"""
+    return ET.fromstring(svg)
+
+
+def texts(root):
+    return ["".join(node.itertext()) for node in root.iter("text")]
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, False),
+    ({"Save-Data": "on"}, True),
+    ({"ECT": "3g"}, True),
+    ({"ECT": "4g", "Downlink": "10"}, False),
+    ({"Downlink": "0.4"}, True),
+    ({"Downlink": "fast"}, False),
+    (None, False),
+])
+def test_detect(headers, expected, monkeypatch):
+    monkeypatch.setattr(lite, "MODE", "auto")
+    assert lite.detect(headers) is expected
+
+
+def test_mode_override(monkeypatch):
+    monkeypatch.setattr(lite, "MODE", "on")
+    assert lite.detect({}) is True
+    monkeypatch.setattr(lite, "MODE", "off")
+    assert lite.detect({"Save-Data": "on"}) is False
+
+
+def test_strip_motion_keeps_other_rules():
+    css = ("<style>@keyframes fade{from{opacity:0}to{opacity:1}}"
+           ".card{color:red;transition: all .3s ease;animation:fade 1s}</style>")
+    assert lite.strip_motion(css) == "<style>.card{color:red;}</style>"
+
+
+def test_gauge():
+    root = parse(lite.render(charts.create_emergency_fund_gauge(4.2).to_plotly_json()))
+    assert "4.2" in texts(root)
+    assert any("Emergency Fund" in t for t in texts(root))
+    assert root.get("viewBox") == f"0 0 {lite.WIDTH} 400"
+
+
+def test_vertical_and_horizontal_bars():
+    root = parse(lite.render(charts.create_composition_bar(6000, 2500, 300, 50000).to_plotly_json()))
+    assert root.find("path") is not None
+    root = parse(lite.render(charts.create_ratios_bar(0.4, 0.05, 7).to_plotly_json()))
+    assert root.find("path") is not None
+
+
+def test_histogram_draws_touching_bars_as_one_outline():
+    edges = np.linspace(0, 10_000, 11)
+    counts = np.array([1, 4, 9, 12, 8, 5, 3, 2, 1, 1])
+    fig = charts.create_peer_distribution_chart(edges, counts, 4200, "Income", 55.0)
+    root = parse(lite.render(fig.to_plotly_json()))
+    bar_paths = [p for p in root.iter("path") if p.get("fill") not in (None, "none")]
+    assert len(bar_paths) == 1 and bar_paths[0].get("d").count("M") == 1
+
+
+EMPTY_SPECS = {
+    "gauge without value": {"data": [{"type": "indicator", "value": None, "gauge": {"axis": {"range": [0, 6]}}}]},
+    "bar without data": {"data": [{"type": "bar", "x": [], "y": []}]},
+    "bar with null arrays": {"data": [{"type": "bar", "x": None, "y": None}]},
+    "bar with null values": {"data": [{"type": "bar", "x": ["a", "b"], "y": [None, 3]}]},
+    "horizontal bar with null arrays": {"data": [{"type": "bar", "orientation": "h", "x": None, "y": None}]},
+    "histogram of an empty column": charts.create_peer_distribution_chart(
+        np.linspace(0.0, 1.0, 6), np.zeros(5, dtype=int), 0, "Debt", 50.0).to_plotly_json(),
+    "pie with null arrays": {"data": [{"type": "pie", "labels": None, "values": None}]},
+    "line without points": {"data": [{"type": "scatter", "x": [], "y": []}]},
+    "no traces": {"data": []},
+}
+
+
+@pytest.mark.parametrize("name", EMPTY_SPECS)
+def test_empty_and_null_data_render(name):
+    root = parse(lite.render(EMPTY_SPECS[name]))
+    assert root.tag == "svg"
+
+
+def test_gauge_without_value_has_no_number():
+    spec = charts.create_emergency_fund_gauge(4.2).to_plotly_json()
+    number = 'font-size="50"'
+    assert number in lite.render(spec)
+    spec["data"][0]["value"] = None
+    assert number not in lite.render(spec)
+
+
+def test_chart_svg_is_cached_by_content(monkeypatch):
+    monkeypatch.setattr(lite, "_cache", type(lite._cache)())
+    calls = []
+    render = lite.render
+    monkeypatch.setattr(lite, "render", lambda spec: calls.append(1) or render(spec))
+    first = lite.chart_svg(charts.create_emergency_fund_gauge(2))
+    assert lite.chart_svg(charts.create_emergency_fund_gauge(2)) == first
+    lite.chart_svg(charts.create_emergency_fund_gauge(5))
+    assert len(calls) == 2
+
+
+def test_transparent_background_is_left_out():
+    spec = {"data": [{"type": "bar", "x": ["a"], "y": [1]}], "layout": {"paper_bgcolor": "rgba(0,0,0,0)"}}
+    assert "background" not in lite.render(spec)
+    spec["layout"]["paper_bgcolor"] = "#F0F8FF"
+    assert 'style="background:#F0F8FF"' in lite.render(spec)
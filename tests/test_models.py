@@ -0,0 +1,89 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+import models
+import stand_in_api
+
+PAYLOAD = {
+    "age": 30, "monthly_income_usd": 6000, "monthly_expenses_usd": 3000, "savings_usd": 5000,
+    "monthly_emi_usd": 400, "loan_interest_rate_pct": 18.0, "loan_term_months": 36,
+}
+
+
+def test_missing_fields_get_defaults_and_unknown_ones_are_dropped():
+    prediction = models.Prediction.decode({"health_score": 71, "extra": "ignored"})
+    assert prediction.health_score == 71
+    assert prediction.prediction == "Unknown"
+    assert prediction.metrics == models.Metrics.decode({})
+    assert not hasattr(prediction, "extra")
+
+
+def test_numbers_are_checked():
+    assert models.Metrics.decode({"expense_ratio": "0.5"}).expense_ratio == 0.5
+    assert models.Metrics.decode({"expense_ratio": None}).expense_ratio == 0.0
+    with pytest.raises(models.ResponseFormatError, match="expense_ratio"):
+        models.Metrics.decode({"expense_ratio": "half"})
+    with pytest.raises(models.ResponseFormatError, match="expects an object"):
+        models.Prediction.decode(["not", "an", "object"])
+
+
+def test_nested_lists_and_optional_records():
+    plan = models.Plan.decode({
+        "structured": {"issues": [{"title": "High debt"}], "strengths": []},
+        "recommendations": {"investment_type": {"allocation": {"Stocks": "0.6", "Bonds": 0.4}}},
+    })
+    assert plan.structured.issues == (models.Finding.decode({"title": "High debt"}),)
+    assert plan.structured.strengths == ()
+    assert plan.recommendations.expense_reduction is None
+    assert plan.recommendations.investment_type.allocation == {"Stocks": 0.6, "Bonds": 0.4}
+    reduction = models.ExpenseReduction.decode({"categories": ["Dining", "Travel"]})
+    assert reduction.categories == ("Dining", "Travel")
+
+
+def test_records_are_read_only_and_slotted():
+    prediction = models.Prediction.decode({})
+    with pytest.raises(AttributeError, match="read-only"):
+        prediction.health_score = 100
+    assert not hasattr(prediction, "__dict__")
+    with pytest.raises(TypeError):
+        hash(prediction)
+
+
+def test_decoding_a_record_returns_it_unchanged():
+    prediction = models.Prediction.decode({"health_score": 5})
+    assert models.Prediction.decode(prediction) is prediction
+
+
+@pytest.mark.parametrize("decode, response", [
+    (models.Prediction.decode, stand_in_api.fake_predict(PAYLOAD)),
+    (models.ClusterInfo.decode, stand_in_api.fake_cluster(PAYLOAD)),
+    (models.Plan.decode, stand_in_api.fake_plan(PAYLOAD)),
+])
+def test_api_responses_round_trip(decode, response):
+    record = decode(response)
+    assert decode(json.loads(json.dumps(record.to_dict()))) == record
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_json_default():
+    record = models.Prediction.decode({"health_score": 80})
+    data = json.loads(json.dumps({"r": record, "n": np.int64(3), "a": np.arange(2)}, default=models.json_default))
+    assert data == {"r": record.to_dict(), "n": 3, "a": [0, 1]}
+    with pytest.raises(TypeError, match="set is not JSON serializable"):
+        json.dumps({1, 2}, default=models.json_default)
+
+
+def test_session_decoders_rebuild_cached_responses():
+    stored = json.loads(json.dumps({
+        "last_result": models.Prediction.decode({"health_score": 60}),
+        "cached_plan": {"inputs": PAYLOAD, "data": models.Plan.decode({"narrative": "Save more"})},
+        "scenario_results": {"Current": {"inputs": PAYLOAD, "data": models.Prediction.decode({})}},
+    }, default=models.json_default))
+    decoded = {key: models.SESSION_DECODERS[key](value) for key, value in stored.items()}
+    assert decoded["last_result"].health_score == 60
+    assert decoded["cached_plan"]["inputs"] == PAYLOAD
+    assert decoded["cached_plan"]["data"].narrative == "Save more"
+    assert isinstance(decoded["scenario_results"]["Current"]["data"], models.Prediction)
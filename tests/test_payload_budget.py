@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import payload_budget
+
+ROOT = os.path.dirname(payload_budget.APP_PATH)
+
+
+def _run(*args):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("EZHALNI_")}
+    return subprocess.run([sys.executable, "payload_budget.py", "--json", *args], cwd=ROOT, env=env,
+                          capture_output=True, text=True, timeout=600)
+
+
+@pytest.fixture(scope="module", params=[False, True], ids=["interactive", "lite"])
+def report(request):
+    run = _run("--lite") if request.param else _run()
+    return request.param, run, json.loads(run.stdout)
+
+
+def test_every_page_is_within_budget(report):
+    _, run, sizes = report
+    assert set(sizes) == set(payload_budget.PAGE_BYTE_BUDGETS)
+    over = {page: s["total"] for page, s in sizes.items() if s["total"] > s["budget"]}
+    assert not over, run.stderr
+    assert run.returncode == 0
+
+
+def test_only_interactive_pages_send_plotly_json(report):
+    lite, _, sizes = report
+    assert any(s["plotly"] for s in sizes.values()) is not lite
+
+
+def test_measure_sorts_bytes_by_kind():
+    at = AppTest.from_string(
+        "import streamlit as st\n"
+        "st.markdown('<style>' + 'x' * 2000 + '</style>', unsafe_allow_html=True)\n"
+        "st.html('<svg>' + 'y' * 1000 + '</svg>')\n"
+        "st.button('Go')\n"
+    ).run()
+    sizes = payload_budget.measure(at._tree, {})
+    assert 2000 < sizes["markdown"] < 2200
+    assert 1000 < sizes["images"] < 1200
+    assert sizes["plotly"] == sizes["dataframe"] == 0
+    assert 0 < sizes["other"] < 200
+
+
+def test_over_budget_page_fails_the_run(monkeypatch, capsys):
+    monkeypatch.setattr(payload_budget, "PAGE_BYTE_BUDGETS", {"🏠 Home": 1})
+    monkeypatch.setattr(payload_budget, "render", lambda page, media_sizes, lite: {**dict.fromkeys(payload_budget.KINDS, 0), "markdown": 10})
+    monkeypatch.setattr(payload_budget, "_build_peer_sample", lambda out_dir: None)
+    monkeypatch.setattr(payload_budget, "_record_media_sizes", lambda sizes: None)
+    monkeypatch.setattr(sys, "argv", ["payload_budget.py"])
+    monkeypatch.setattr(os, "environ", dict(os.environ))
+    with pytest.raises(SystemExit) as exit:
+        payload_budget.main()
+    assert exit.value.code == 1
+    assert "Over budget: 🏠 Home" in capsys.readouterr().err
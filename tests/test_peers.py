@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import peers
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({
+        "monthly_income_usd": rng.integers(1, 101, 1000) * 100.0,
+        "savings_usd": np.r_[rng.integers(0, 50, 990) * 1000.0, [np.nan] * 10],
+        "monthly_emi_usd": np.nan,  # no one reported it
+    })
+    frame.to_csv(tmp_path / "peers.csv", index=False)
+    assert peers.build_dataset(tmp_path / "peers.csv", tmp_path / "peers", chunksize=300) == 1000
+    return peers.PeerDataset(tmp_path / "peers"), frame
+
+
+def test_columns_are_sorted_memory_maps(dataset):
+    data, frame = dataset
+    income = data.columns["monthly_income_usd"]
+    assert isinstance(income, np.memmap)
+    assert not income.flags.writeable
+    assert np.array_equal(income, np.sort(frame["monthly_income_usd"]))
+    assert len(data.columns["savings_usd"]) == 990
+
+
+def test_percentile_counts_ties_as_half(dataset):
+    data, frame = dataset
+    income = frame["monthly_income_usd"]
+    for value in (100.0, 5000.0, 5050.0, 10_000.0, 20_000.0):
+        expected = ((income < value).sum() + (income <= value).sum()) / 2 / len(income) * 100
+        assert data.percentile("monthly_income_usd", value) == pytest.approx(expected)
+    assert data.percentile("monthly_income_usd", 0) == 0
+    assert data.percentile("monthly_income_usd", 1e9) == 100
+
+
+def test_histogram_counts_up_to_the_upper_quantile(dataset):
+    data, frame = dataset
+    edges, counts = data.histogram("monthly_income_usd", bins=10, upper_quantile=1.0)
+    assert len(edges) == 11 and len(counts) == 10
+    assert counts.sum() == len(frame)
+    clipped_edges, clipped = data.histogram("monthly_income_usd", bins=10, upper_quantile=0.5)
+    assert clipped.sum() == (frame["monthly_income_usd"] <= clipped_edges[-1]).sum()
+
+
+def test_empty_column_has_an_empty_histogram_and_no_rank(dataset):
+    data, _ = dataset
+    edges, counts = data.histogram("monthly_emi_usd", bins=5)
+    assert len(edges) == 6 and counts.tolist() == [0] * 5
+    assert data.percentile("monthly_emi_usd", 100) is None
+
+
+def test_percentile_ranks_skip_empty_columns(dataset, monkeypatch):
+    data, _ = dataset
+    monkeypatch.setattr(peers, "get_dataset", lambda: data)
+    ranks = peers.percentile_ranks({"monthly_income_usd": 5000, "savings_usd": 0, "monthly_emi_usd": 300})
+    assert set(ranks) == {"income", "savings"}
+
+
+@pytest.mark.parametrize("value, text", [(1, "1st"), (2.4, "2nd"), (3, "3rd"), (11, "11th"), (12, "12th"),
+                                         (13, "13th"), (21, "21st"), (72.6, "73rd"), (100, "100th")])
+def test_ordinal(value, text):
+    assert peers.ordinal(value) == text
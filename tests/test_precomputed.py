@@ -0,0 +1,44 @@
+from collections import Counter
+
+import pytest
+
+import backend
+import precomputed
+import stand_in_api
+
+PAYLOAD = backend.payload_from_profile(backend.DEFAULT_PROFILE)
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    monkeypatch.setattr(backend, "_transport", backend.make_transport("inprocess", stand_in_api.ENGINE))
+    monkeypatch.setattr(precomputed, "_live", {"model_version": None})
+    cells, failed = precomputed.build_table(Counter([precomputed.cell(PAYLOAD)]), tmp_path)
+    assert (cells, failed) == (1, 0)
+    return precomputed.PrecomputedTable(tmp_path)
+
+
+def test_table_records_the_model_version(table):
+    assert table.model_version == stand_in_api.MODEL_VERSION
+    assert table.get("predict", PAYLOAD) == stand_in_api.fake_predict(PAYLOAD)
+
+
+def test_table_is_bypassed_once_the_live_model_changes(table):
+    precomputed.observe_model_version(stand_in_api.MODEL_VERSION)
+    assert table.get("cluster", PAYLOAD) is not None
+    precomputed.observe_model_version("retrained-2")
+    assert table.get("predict", PAYLOAD) is None
+    assert table.get("cluster", PAYLOAD) is None
+
+
+def test_health_reports_the_live_version(monkeypatch):
+    monkeypatch.setattr(precomputed, "_live", {"model_version": None})
+    server, url = stand_in_api.start_stand_in()
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_transport", backend.HttpTransport())
+    try:
+        backend.get_health()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert precomputed._live["model_version"] == stand_in_api.MODEL_VERSION
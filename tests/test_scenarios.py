@@ -0,0 +1,81 @@
+import math
+
+import pytest
+
+import backend
+import models
+import scenarios
+import stand_in_api
+
+PAYLOAD = {
+    "age": 30, "monthly_income_usd": 6000, "monthly_expenses_usd": 3000, "savings_usd": 5000,
+    "monthly_emi_usd": 400, "loan_interest_rate_pct": 18.0, "loan_term_months": 36,
+}
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    batches = []
+
+    def predict_many(payloads, deadline=None):
+        batches.append(list(payloads))
+        return [stand_in_api.fake_predict(p) for p in payloads]
+
+    monkeypatch.setattr(backend, "predict_many", predict_many)
+    return batches
+
+
+def test_rows_clamp_and_fill_values():
+    parsed, problems = scenarios.rows([
+        {"name": " New job ", **PAYLOAD, "age": 12, "monthly_income_usd": 8000.7, "loan_interest_rate_pct": 25},
+        {"name": "Blank cells", "age": None, "savings_usd": math.nan},
+    ])
+    assert problems == []
+    (name, job), (_, blank) = parsed
+    assert name == "New job"
+    assert job["age"] == 18 and job["monthly_income_usd"] == 8000 and job["loan_interest_rate_pct"] == 20.0
+    assert blank["age"] == backend.DEFAULT_PROFILE["age"]
+    assert blank["savings_usd"] == backend.DEFAULT_PROFILE["savings_usd"]
+    assert list(blank) == list(backend.PAYLOAD_FIELDS)
+
+
+def test_rows_report_problems():
+    records = [{"name": "A"}, {"name": "A"}, {"name": "", "age": 40}, {"name": None}]
+    records += [{"name": name} for name in "BCDE"]
+    parsed, problems = scenarios.rows(records)
+    assert [name for name, _ in parsed] == ["A", "B", "C", "D"]
+    assert problems == [
+        "Scenario names must be unique ('A' is used twice).",
+        "Every scenario needs a name.",
+        f"Only the first {scenarios.MAX_SCENARIOS} scenarios are compared.",
+    ]
+
+
+def test_only_new_or_edited_scenarios_are_sent(sent):
+    state = {}
+    first = [("Current", PAYLOAD), ("Pay off car", {**PAYLOAD, "monthly_emi_usd": 0})]
+    results = scenarios.analyze(state, first)
+    assert set(results) == {"Current", "Pay off car"}
+    assert all(isinstance(r, models.Prediction) for r in results.values())
+    assert len(sent[0]) == 2
+
+    edited = [("Current", PAYLOAD), ("Pay off car", {**PAYLOAD, "monthly_emi_usd": 50})]
+    scenarios.analyze(state, edited)
+    assert sent[-1] == [edited[1][1]]
+
+    scenarios.analyze(state, edited)
+    assert len(sent) == 2
+
+
+def test_renamed_and_deleted_scenarios_are_dropped(sent):
+    state = {}
+    scenarios.analyze(state, [("Current", PAYLOAD), ("Old", {**PAYLOAD, "age": 50})])
+    scenarios.analyze(state, [("Current", PAYLOAD)])
+    assert set(state[scenarios.STATE_KEY]) == {"Current"}
+    assert scenarios.cached(state, [("Current", PAYLOAD), ("Old", {**PAYLOAD, "age": 50})]).keys() == {"Current"}
+
+
+def test_results_do_not_touch_last_result(sent):
+    state = {"last_result": "untouched"}
+    scenarios.analyze(state, scenarios.rows(scenarios.default_rows(PAYLOAD))[0])
+    assert state["last_result"] == "untouched"
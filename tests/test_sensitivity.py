@@ -0,0 +1,89 @@
+from collections import OrderedDict
+
+import pytest
+
+import backend
+import sensitivity
+import stand_in_api
+
+PAYLOAD = {
+    "age": 30, "monthly_income_usd": 6000, "monthly_expenses_usd": 3000, "savings_usd": 5000,
+    "monthly_emi_usd": 400, "loan_interest_rate_pct": 18.0, "loan_term_months": 36,
+}
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Payloads that reached the backend, per predict_many call"""
+    batches = []
+
+    def predict_many(payloads, deadline=None):
+        batches.append(list(payloads))
+        return [stand_in_api.fake_predict(p) for p in payloads]
+
+    monkeypatch.setattr(backend, "predict_many", predict_many)
+    monkeypatch.setattr(sensitivity, "_cache", OrderedDict())
+    return batches
+
+
+@pytest.mark.parametrize("field, value, expected", [
+    ("monthly_income_usd", 6000, 600),
+    ("monthly_income_usd", 6040, 600),   # snapped to the widget step
+    ("monthly_income_usd", 300, 100),    # never less than one step
+    ("savings_usd", 0, 500),
+    ("monthly_emi_usd", 130, 50),
+    ("age", 30, 5),
+    ("loan_interest_rate_pct", 18.0, 1.0),
+])
+def test_nudge(field, value, expected):
+    assert sensitivity.nudge(field, value) == expected
+
+
+def test_variants_stay_inside_the_widget_bounds():
+    payload = {**PAYLOAD, "age": 98, "savings_usd": 0, "loan_interest_rate_pct": 19.5, "loan_term_months": 0}
+    moves = {(field, direction): moved[field] for field, direction, moved in sensitivity.variants(payload)}
+    assert moves[("age", "up")] == 100 and moves[("age", "down")] == 93
+    assert ("savings_usd", "down") not in moves
+    assert moves[("loan_interest_rate_pct", "up")] == 20.0
+    assert ("loan_term_months", "down") not in moves
+    assert moves[("monthly_income_usd", "down")] == 5400
+    for (field, _), value in moves.items():
+        lo, hi = sensitivity.BOUNDS.get(field, (0, None))
+        assert value >= lo and (hi is None or value <= hi)
+
+
+def test_variants_change_one_field_each():
+    for field, _, moved in sensitivity.variants(PAYLOAD):
+        assert {k for k in PAYLOAD if moved[k] != PAYLOAD[k]} == {field}
+        assert type(moved[field]) is type(PAYLOAD[field])
+
+
+def test_predict_batch_sends_each_payload_once(sent):
+    results, fresh = sensitivity.predict_batch([PAYLOAD, dict(PAYLOAD), {**PAYLOAD, "age": 40}])
+    assert fresh == 2 and len(results) == 3
+    assert results[0] is results[1]
+    assert len(sent[0]) == 2
+
+    results, fresh = sensitivity.predict_batch([{**PAYLOAD, "age": 40}, PAYLOAD])
+    assert fresh == 0
+    assert sent[-1] == []
+
+
+def test_predict_batch_evicts_least_recently_used(sent, monkeypatch):
+    monkeypatch.setattr(sensitivity, "CACHE_SIZE", 2)
+    a, b, c = ({**PAYLOAD, "age": age} for age in (20, 30, 40))
+    sensitivity.predict_batch([a, b])
+    sensitivity.predict_batch([a])          # a is now the most recently used
+    sensitivity.predict_batch([c])          # evicts b
+    assert sensitivity.predict_batch([a])[1] == 0
+    assert sensitivity.predict_batch([b])[1] == 1
+
+
+def test_analyze_ranks_fields_by_swing(sent):
+    analysis = sensitivity.analyze(PAYLOAD)
+    rows = analysis["rows"]
+    assert len(rows) == len(backend.PAYLOAD_FIELDS)
+    swings = [(row["swing"], row["p_swing"]) for row in rows]
+    assert swings == sorted(swings, reverse=True)
+    assert analysis["requests"] == 1 + len(sensitivity.variants(PAYLOAD))
+    assert sensitivity.analyze(PAYLOAD)["requests"] == 0
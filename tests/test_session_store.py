@@ -0,0 +1,80 @@
+import zlib
+from uuid import uuid4
+
+import pytest
+
+import models
+import session_store
+
+
+SID = uuid4().hex
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = session_store.MemoryStore()
+    monkeypatch.setattr(session_store, "_store", store)
+    return store
+
+
+def test_records_in_an_old_format_are_dropped(store):
+    store.set(SID, session_store.encode({
+        "last_input": {"age": 30},
+        "last_result": ["not", "a", "mapping"],       # TypeError in the decoder
+        "scenario_results": {"Current": None},         # TypeError
+    }))
+    state = {}
+    session_store.restore(state, {session_store.COOKIE_NAME: SID}, models.SESSION_DECODERS)
+    assert state["last_input"] == {"age": 30}
+    assert not {"last_result", "scenario_results"} & set(state)
+
+    session_store.save(state)
+    assert set(session_store.decode(store.get(SID))) == {"last_input"}
+
+
+def test_unreadable_blob_starts_an_empty_session(store):
+    store.set(SID, zlib.compress(b"{not json"))
+    state = {}
+    session_store.restore(state, {session_store.COOKIE_NAME: SID}, models.SESSION_DECODERS)
+    assert state["_session_id"] == SID
+    state["last_input"] = {"age": 30}
+    session_store.save(state)
+    assert session_store.decode(store.get(SID)) == {"last_input": {"age": 30}}
+
+
+def test_session_id_comes_from_the_cookie_only(store):
+    store.set(SID, session_store.encode({"last_input": {"age": 30}}))
+
+    # The old ?sid= query parameter is not a way in any more
+    state = {}
+    issued = session_store.restore(state, {"sid": SID}, models.SESSION_DECODERS)
+    assert issued != SID and "last_input" not in state
+    assert f"{session_store.COOKIE_NAME}={issued};" in session_store.cookie_script(issued)
+
+    state = {}
+    assert session_store.restore(state, {session_store.COOKIE_NAME: SID}, models.SESSION_DECODERS) == SID
+    assert state["last_input"] == {"age": 30}
+    # Once per Streamlit session
+    assert session_store.restore(state, {session_store.COOKIE_NAME: SID}, models.SESSION_DECODERS) is None
+
+
+def test_malformed_cookie_gets_a_fresh_id(store):
+    state = {}
+    issued = session_store.restore(state, {session_store.COOKIE_NAME: "x'; drop"}, models.SESSION_DECODERS)
+    assert len(issued) == 32 and state["_session_id"] == issued
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_reads_restart_the_ttl(kind, tmp_path):
+    now = [1000.0]
+    clock = lambda: now[0]
+    if kind == "memory":
+        store = session_store.MemoryStore(ttl=100, clock=clock)
+    else:
+        store = session_store.SqliteStore(str(tmp_path / "sessions.db"), ttl=100, clock=clock)
+    store.set(SID, b"blob")
+    for _ in range(3):
+        now[0] += 90
+        assert store.get(SID) == b"blob"
+    now[0] += 101
+    assert store.get(SID) is None
@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+import transactions
+
+CSV = """Date,Description,Amount
+2024-01-03,ACME PAYROLL,"5,000.00"
+2024-01-10,WHOLE FOODS SUPERMARKET,(120.50)
+2024-01-15,CAR LOAN AUTOPAY,-$300.00
+2024-02-03,ACME PAYROLL,"$5,000.00"
+2024-02-12,SHELL GAS,(79.50)
+2024-02-15,CAR LOAN AUTOPAY,(300.00)
+"""
+
+
+def test_currency_and_parenthesized_amounts():
+    profile = transactions.import_statements([("statement.csv", io.StringIO(CSV))])
+    assert profile["months"] == 2
+    assert profile["income"] == pytest.approx(5000.0)
+    assert profile["expenses"] == pytest.approx(100.0)
+    assert profile["debt"] == pytest.approx(300.0)
+
+
+def test_debit_credit_columns_with_formatted_numbers():
+    csv = 'Posted Date,Payee,Debit,Credit\n2024-03-01,SALARY,,"2,500.00"\n2024-03-02,RENT,"1,200.00",\n'
+    profile = transactions.import_statements([("export.csv", io.StringIO(csv))])
+    assert profile["income"] == pytest.approx(2500.0)
+    assert profile["expenses"] == pytest.approx(1200.0)
+
+
+def test_empty_file_is_a_format_error():
+    with pytest.raises(transactions.StatementFormatError):
+        transactions.import_statements([("empty.csv", io.StringIO(""))])
+
+
+def test_missing_columns_is_a_format_error():
+    with pytest.raises(transactions.StatementFormatError):
+        transactions.import_statements([("other.csv", io.StringIO("foo,bar\n1,2\n"))])
+
+
+def test_autopay_bills_are_expenses_not_loan_payments():
+    csv = """Date,Description,Amount
+2024-01-03,ACME PAYROLL,5000.00
+2024-01-05,CON EDISON AUTOPAY,-90.00
+2024-01-06,VERIZON WIRELESS AUTO PAY,-60.00
+2024-01-07,NETFLIX AUTOPAYMENT,-15.00
+2024-01-15,CAR LOAN AUTOPAY,-300.00
+"""
+    profile = transactions.import_statements([("statement.csv", io.StringIO(csv))])
+    assert profile["debt"] == pytest.approx(300.0)
+    assert profile["expenses"] == pytest.approx(165.0)
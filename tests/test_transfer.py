@@ -0,0 +1,57 @@
+import pytest
+
+import backend
+from stand_in_api import start_stand_in
+
+PAYLOAD = backend.build_plan_payload(backend.DEFAULT_PROFILE)
+
+
+@pytest.fixture(params=[backend.HttpTransport, backend.AsyncHttpTransport], ids=["http", "async"])
+def server(request, monkeypatch):
+    server, url = start_stand_in()
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_compress_requests", True)
+    monkeypatch.setattr(backend, "_transport", request.param())
+    backend.clear_response_cache()
+    yield server
+    backend.clear_response_cache()
+    server.shutdown()
+    server.server_close()
+
+
+def test_repeated_plan_is_revalidated_with_304(server):
+    first = backend.plan(PAYLOAD)
+    second = backend.plan(PAYLOAD)
+    assert second == first
+    assert server.stats["requests"] == 2
+    assert server.stats["not_modified"] == 1
+
+
+def test_predict_is_not_conditional(server):
+    backend.predict(PAYLOAD)
+    backend.predict(PAYLOAD)
+    assert "not_modified" not in server.stats
+
+
+def test_large_request_body_is_gzipped(server, monkeypatch):
+    monkeypatch.setattr(backend, "COMPRESS_MIN_BYTES", 1)
+    data = backend.plan(PAYLOAD)
+    assert data["narrative"] == backend.plan(PAYLOAD)["narrative"]
+    assert server.stats["gzip_requests"] == 2
+
+
+def test_small_request_body_is_sent_plain(server):
+    backend.predict(PAYLOAD)
+    assert "gzip_requests" not in server.stats
+
+
+def test_large_response_is_gzipped(server):
+    data = backend.plan(PAYLOAD)
+    assert data["narrative"].startswith("Financial plan")
+    assert server.stats["gzip_responses"] == 1
+
+
+def test_cluster_definitions_revalidated(server):
+    first = backend.get_transport().cluster_definitions()
+    assert backend.get_transport().cluster_definitions() == first
+    assert server.stats["not_modified"] == 1
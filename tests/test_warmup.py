@@ -0,0 +1,150 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import warmup
+
+
+@pytest.fixture
+def fresh_state(monkeypatch):
+    monkeypatch.setattr(warmup, "_state", {"ready": False, "started_at": None, "finished_at": None, "steps": {}})
+
+
+def flaky(failures):
+    calls = {"n": 0}
+
+    def step():
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise RuntimeError("API unreachable")
+    return step
+
+
+def test_failed_step_keeps_instance_unready(fresh_state, monkeypatch):
+    monkeypatch.setattr(warmup, "STEPS", (("images", lambda: None), ("caches", flaky(failures=1))))
+
+    warmup.run_warmup(retry_seconds=0)
+
+    assert not warmup.is_ready()
+    assert warmup.failed_steps() == {"caches": "API unreachable"}
+    assert warmup.status()["steps"]["images"]["ok"]
+
+
+def test_failed_step_is_retried_until_it_passes(fresh_state, monkeypatch):
+    monkeypatch.setattr(warmup, "STEPS", (("images", lambda: None), ("caches", flaky(failures=2))))
+
+    warmup.run_warmup(retry_seconds=0.01)
+
+    assert warmup.is_ready()
+    assert warmup.failed_steps() == {}
+    steps = warmup.status()["steps"]
+    assert steps["caches"]["attempts"] == 3
+    assert steps["images"]["attempts"] == 1
+
+
+def test_ready_endpoint_reports_failed_steps(fresh_state, monkeypatch):
+    monkeypatch.setattr(warmup, "STEPS", (("caches", flaky(failures=1)),))
+    server = warmup.start_readiness_server(port=0, host="127.0.0.1")
+    url = f"http://127.0.0.1:{server.server_address[1]}/ready"
+    try:
+        warmup.run_warmup(retry_seconds=0)
+        with pytest.raises(urllib.error.HTTPError) as failed:
+            urllib.request.urlopen(url, timeout=5)
+        assert failed.value.code == 503
+        assert json.loads(failed.value.read()) == {"ready": False, "failed": {"caches": "API unreachable"}}
+
+        warmup.run_warmup(retry_seconds=0)
+        with urllib.request.urlopen(url, timeout=5) as response:
+            assert json.loads(response.read()) == {"ready": True}
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_cache_warmup_skips_uncached_predict(monkeypatch):
+    import backend
+    import clusters
+
+    def no_predict(*args, **kwargs):
+        raise AssertionError("predict is not cached; warming it is wasted work")
+
+    monkeypatch.setattr(backend, "predict", no_predict)
+    monkeypatch.setattr(backend, "plan", lambda payload, **kwargs: {})
+    monkeypatch.setattr(clusters, "cluster_info", lambda payload: {})
+
+    warmup._warm_caches()
+
+
+@pytest.fixture
+def admin_url(monkeypatch):
+    import memory
+
+    monkeypatch.setattr(memory, "_snapshot", {"last": None})
+    server = warmup.start_admin_server(port=0)
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    memory.stop_tracing()
+    server.shutdown()
+    server.server_close()
+
+
+def test_admin_server_listens_on_loopback_by_default(admin_url):
+    assert admin_url.startswith("http://127.0.0.1:")
+
+
+def test_memory_report_does_not_start_tracing(admin_url):
+    import tracemalloc
+
+    with urllib.request.urlopen(admin_url + "/memory", timeout=5) as response:
+        assert json.loads(response.read())["tracing"] is False
+    for path in ("/memory/snapshot", "/memory/stop-tracing"):
+        with pytest.raises(urllib.error.HTTPError) as refused:
+            urllib.request.urlopen(admin_url + path, timeout=5)
+        assert refused.value.code == 405
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_starts_and_stops_on_post(admin_url):
+    import tracemalloc
+
+    def post(path):
+        with urllib.request.urlopen(urllib.request.Request(admin_url + path, data=b"", method="POST"), timeout=5) as r:
+            return json.loads(r.read())
+
+    assert post("/memory/snapshot")["started"] is True
+    assert tracemalloc.is_tracing()
+    assert post("/memory/snapshot")["started"] is False
+    assert post("/memory/stop-tracing") == {"tracing": False}
+    assert not tracemalloc.is_tracing()
+
+
+def test_readiness_server_has_no_memory_endpoints(fresh_state):
+    server = warmup.start_readiness_server(port=0, host="127.0.0.1")
+    try:
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/memory/snapshot", timeout=5)
+        assert missing.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_connection_warmup_fills_the_async_pool(monkeypatch):
+    import async_client
+    import backend
+    from stand_in_api import start_stand_in
+
+    server, url = start_stand_in()
+    monkeypatch.setattr(backend, "API_URL", url)
+    monkeypatch.setattr(backend, "_transport", backend.HttpTransport())
+    monkeypatch.setattr(async_client, "_clients", {})
+    try:
+        warmup._warm_connections()
+        client = async_client.get_client(url)
+        assert client.stats["connections_opened"] == warmup.WARM_CONNECTIONS
+        assert len(client._idle) == warmup.WARM_CONNECTIONS
+    finally:
+        server.shutdown()
+        server.server_close()
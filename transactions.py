@@ -0,0 +1,243 @@
+"""
+Streaming bank-statement import for the Financial Input page.
+
+CSV exports are read with pandas in fixed-size chunks and OFX/QFX files are
+scanned block by block, so only one chunk of transactions is in memory at a
+time. Every chunk is reduced with a vectorized month groupby into a running
+table of one row per month, which stays small even for multi-year,
+multi-account histories; expenses are also split by merchant category
+(categories.py) into a month x category table. The averages of recent
+complete months become the suggested income, expenses and loan payment,
+plus an average monthly spend per category.
+"""
+import codecs
+import re
+
+import pandas as pd
+
+import categories
+
+CHUNK_ROWS = 50_000
+OFX_BLOCK_BYTES = 1 << 16
+MONTHS_FOR_AVERAGE = 12
+
+# Header names recognized in CSV exports (compared lower-cased)
+DATE_COLUMNS = ("date", "transaction date", "posted date", "posting date", "booking date", "value date")
+AMOUNT_COLUMNS = ("amount", "transaction amount", "amount (usd)")
+DEBIT_COLUMNS = ("debit", "debit amount", "withdrawal", "withdrawals", "money out")
+CREDIT_COLUMNS = ("credit", "credit amount", "deposit", "deposits", "money in")
+DESCRIPTION_COLUMNS = ("description", "payee", "name", "memo", "details", "narrative", "merchant")
+
+# Spending that counts as a loan payment rather than an expense. "Autopay" alone is not
+# enough: utilities, phones and subscriptions are paid that way too
+DEBT_PATTERN = r"\b(?:loan|mortgage|emi|car\s*payment|student\s*aid|navient|sallie\s*mae)\b"
+# Moves between the user's own accounts would be counted twice
+TRANSFER_PATTERN = r"\b(?:transfer|xfer|to\s+savings|from\s+savings)\b"
+
+TOTAL_COLUMNS = ["income", "expenses", "debt", "transactions"]
+
+
+class StatementFormatError(ValueError):
+    """Raised when an uploaded file is not a recognizable statement"""
+
+
+# ----------------------------------------
+# 📄 CSV
+# ----------------------------------------
+def _pick(columns, names):
+    for name in names:
+        if name in columns:
+            return columns[name]
+    return None
+
+
+def _to_number(series):
+    # String columns are object dtype on pandas 2 but StringDtype on pandas 3
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    cleaned = series.astype(str).str.replace(r"[,$\s]", "", regex=True)
+    # Accounting negatives: (12.50) -> -12.50
+    cleaned = cleaned.str.replace(r"^\((.*)\)$", r"-\1", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce")
+
+
+def _iter_csv_chunks(stream, chunk_rows):
+    reader = pd.read_csv(
+        stream, chunksize=chunk_rows, dtype=str, skipinitialspace=True,
+        encoding="utf-8-sig", encoding_errors="replace"
+    )
+    mapping = None
+    for chunk in reader:
+        if mapping is None:
+            columns = {c.strip().lower(): c for c in chunk.columns}
+            mapping = {
+                "date": _pick(columns, DATE_COLUMNS),
+                "amount": _pick(columns, AMOUNT_COLUMNS),
+                "debit": _pick(columns, DEBIT_COLUMNS),
+                "credit": _pick(columns, CREDIT_COLUMNS),
+                "description": _pick(columns, DESCRIPTION_COLUMNS),
+            }
+            if mapping["date"] is None or (mapping["amount"] is None and mapping["debit"] is None):
+                raise StatementFormatError(
+                    "CSV needs a date column and either an amount column or debit/credit columns"
+                )
+
+        if mapping["amount"] is not None:
+            amount = _to_number(chunk[mapping["amount"]])
+        else:
+            amount = _to_number(chunk[mapping["debit"]]).fillna(0).abs() * -1
+            if mapping["credit"] is not None:
+                amount = amount + _to_number(chunk[mapping["credit"]]).fillna(0).abs()
+        yield pd.DataFrame({
+            "date": pd.to_datetime(chunk[mapping["date"]], errors="coerce", format="mixed"),
+            "amount": amount,
+            "description": chunk[mapping["description"]].fillna("") if mapping["description"] else "",
+            "type": "",
+        })
+
+
+# ----------------------------------------
+# 🏦 OFX / QFX
+# ----------------------------------------
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+def _iter_ofx_transactions(stream, block_bytes):
+    """Yields one dict per <STMTTRN>; works for SGML (OFX 1.x) and XML (2.x) files"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer, current = "", None
+    while True:
+        block = stream.read(block_bytes)
+        if isinstance(block, bytes):
+            block = decoder.decode(block, final=not block)
+        buffer += block
+        # Only scan up to the last complete tag; the rest waits for the next block
+        cut = len(buffer) if not block else max(buffer.rfind("<"), 0)
+        text, buffer = buffer[:cut], buffer[cut:]
+        for closing, tag, value in _OFX_TAG.findall(text):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and current is not None:
+                    yield current
+                current = None if closing else {}
+            elif current is not None and not closing:
+                current[tag] = value.strip()
+        if not block:
+            break
+
+
+def _iter_ofx_chunks(stream, chunk_rows, block_bytes):
+    rows = []
+    for trn in _iter_ofx_transactions(stream, block_bytes):
+        rows.append((
+            trn.get("DTPOSTED", "")[:8],
+            trn.get("TRNAMT"),
+            trn.get("NAME") or trn.get("MEMO") or "",
+            trn.get("TRNTYPE", ""),
+        ))
+        if len(rows) >= chunk_rows:
+            yield _ofx_frame(rows)
+            rows = []
+    if rows:
+        yield _ofx_frame(rows)
+
+
+def _ofx_frame(rows):
+    frame = pd.DataFrame(rows, columns=["date", "amount", "description", "type"])
+    frame["date"] = pd.to_datetime(frame["date"], format="%Y%m%d", errors="coerce")
+    frame["amount"] = _to_number(frame["amount"])
+    return frame
+
+
+# ----------------------------------------
+# 📆 MONTHLY AGGREGATION
+# ----------------------------------------
+def _monthly_totals(chunk):
+    """(month totals, month x category expenses) for one chunk"""
+    chunk = chunk.dropna(subset=["date", "amount"])
+    description = chunk["description"].astype(str)
+    transfer = description.str.contains(TRANSFER_PATTERN, case=False, regex=True) | (chunk["type"] == "XFER")
+    is_debt = description.str.contains(DEBT_PATTERN, case=False, regex=True)
+    amount = chunk["amount"].where(~transfer, 0.0)
+    spend = (-amount).clip(lower=0)
+    month = chunk["date"].dt.to_period("M")
+    expenses = spend.where(~is_debt, 0.0)
+    frame = pd.DataFrame({
+        "month": month,
+        "income": amount.clip(lower=0),
+        "expenses": expenses,
+        "debt": spend.where(is_debt, 0.0),
+        "transactions": 1,
+    })
+    spent = expenses > 0
+    by_category = (
+        pd.DataFrame({
+            "month": month[spent],
+            "category": categories.categorize_series(description[spent]),
+            "amount": expenses[spent],
+        })
+        .groupby(["month", "category"])["amount"].sum()
+        .unstack(fill_value=0.0)
+    )
+    return frame.groupby("month")[TOTAL_COLUMNS].sum(), by_category
+
+
+def iter_chunks(name, stream, chunk_rows=CHUNK_ROWS, block_bytes=OFX_BLOCK_BYTES):
+    """Normalized transaction chunks (date, amount, description, type) from one file"""
+    if name.lower().endswith((".ofx", ".qfx")):
+        return _iter_ofx_chunks(stream, chunk_rows, block_bytes)
+    return _iter_csv_chunks(stream, chunk_rows)
+
+
+def monthly_totals(files, chunk_rows=CHUNK_ROWS):
+    """
+    Per-month income, expenses, debt and counts over all (name, stream)
+    files, plus per-month expenses by category
+    """
+    totals = pd.DataFrame(columns=TOTAL_COLUMNS, dtype=float)
+    by_category = pd.DataFrame(dtype=float)
+    for name, stream in files:
+        for chunk in iter_chunks(name, stream, chunk_rows):
+            chunk_totals, chunk_categories = _monthly_totals(chunk)
+            totals = totals.add(chunk_totals, fill_value=0)
+            by_category = by_category.add(chunk_categories, fill_value=0)
+    return totals.sort_index(), by_category.sort_index()
+
+
+def derive_profile(totals, by_category=None, months=MONTHS_FOR_AVERAGE):
+    """
+    Average monthly income, expenses and debt (and expenses per category)
+    over recent complete months. The first and last months of a statement
+    are usually partial, so they are dropped when there are more than three
+    months to choose from.
+    """
+    if totals.empty:
+        raise StatementFormatError("No dated transactions were found")
+    complete = totals.iloc[1:-1] if len(totals) > 3 else totals
+    recent = complete.tail(months)
+    spending = {}
+    if by_category is not None and not by_category.empty:
+        per_month = by_category.reindex(recent.index, fill_value=0.0).mean()
+        spending = {name: float(value) for name, value in per_month.sort_values(ascending=False).items() if value > 0}
+    return {
+        "income": float(recent["income"].mean()),
+        "expenses": float(recent["expenses"].mean()),
+        "debt": float(recent["debt"].mean()),
+        "months": len(recent),
+        "first_month": str(recent.index[0]),
+        "last_month": str(recent.index[-1]),
+        "transactions": int(totals["transactions"].sum()),
+        "categories": spending,
+    }
+
+
+def import_statements(files):
+    """(name, stream) pairs -> derived profile dict; unreadable files raise StatementFormatError"""
+    try:
+        return derive_profile(*monthly_totals(files))
+    except StatementFormatError:
+        raise
+    except pd.errors.EmptyDataError:
+        raise StatementFormatError("The file is empty") from None
+    except (pd.errors.ParserError, UnicodeError, ValueError, TypeError) as e:
+        raise StatementFormatError(f"The file could not be parsed ({e})") from e
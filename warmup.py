@@ -0,0 +1,253 @@
+"""
+Startup warmup for a dashboard server process.
+
+Pays the one-off costs (plotly imports and first figure serialization, the
+TLS handshakes to API_URL for both the requests session and async_client's
+pool, reading images/*.png, loading the datasets and the precomputed
+table, filling the ETag-revalidated /plan and /cluster caches and the
+cluster definitions with the widget default payload) before the first user
+arrives. Progress is served on a small readiness endpoint so
+the load balancer only routes traffic to warmed instances. A failed step is
+retried every RETRY_SECONDS (EZHALNI_WARMUP_RETRY) and the instance stays
+unready, naming the failed steps, until it passes:
+
+    GET /ready   -> 200 once every step has passed, 503 with the failed steps before
+    GET /warmup  -> per-step timings and errors
+    GET /keep-warm -> keep-warm probe and cold-start metrics
+    GET /admission -> admitted and shed backend calls
+
+The leak-hunting endpoints of memory.py change process state, so they are
+not on this server but on a separate admin listener, started only when
+EZHALNI_ADMIN_PORT is set and bound to 127.0.0.1 unless EZHALNI_ADMIN_HOST
+says otherwise.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import admission
+import async_client
+import backend
+import keep_warm
+import memory
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGES = ("images/logo.png", "images/www.png")
+READY_PORT = int(os.environ.get("EZHALNI_READY_PORT", "8502"))
+ADMIN_PORT = int(os.environ.get("EZHALNI_ADMIN_PORT", "0"))
+ADMIN_HOST = os.environ.get("EZHALNI_ADMIN_HOST", "127.0.0.1")
+# Connections opened to API_URL up front so concurrent first visits reuse them
+WARM_CONNECTIONS = 4
+RETRY_SECONDS = float(os.environ.get("EZHALNI_WARMUP_RETRY", "30"))
+
+_state = {"ready": False, "started_at": None, "finished_at": None, "steps": {}}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_image(path):
+    """Image bytes, read from disk once per process"""
+    with open(os.path.join(BASE_DIR, path), "rb") as f:
+        return f.read()
+
+
+# ----------------------------------------
+# 🔥 WARMUP STEPS
+# ----------------------------------------
+def _warm_figures():
+    import charts
+    payload = backend.DEFAULT_PROFILE
+    metrics = backend.compute_local_metrics(payload)
+    income = payload["monthly_income_usd"]
+    expenses = payload["monthly_expenses_usd"]
+    debt = payload["monthly_emi_usd"]
+    figures = [
+        charts.create_composition_bar(income, expenses, debt, payload["savings_usd"]),
+        charts.create_cash_flow_waterfall(income, expenses, debt),
+        charts.create_ratios_bar(metrics["expense_ratio"], metrics["loan_to_income"], metrics["emergency_months"]),
+        charts.create_emergency_fund_gauge(metrics["emergency_months"]),
+        charts.create_allocation_pie({"Stocks": 0.6, "Bonds": 0.3, "Cash": 0.1}),
+    ]
+    # Serializing is what st.plotly_chart does; it loads the JSON encoders too
+    for fig in figures:
+        fig.to_json()
+
+
+async def _async_health_statuses():
+    client = async_client.get_client(backend.API_URL)
+    requests = [client.request("GET", "/health", timeout=backend.DEFAULT_TIMEOUT) for _ in range(WARM_CONNECTIONS)]
+    return [response.status_code for response in await asyncio.gather(*requests)]
+
+
+def _warm_connections():
+    # Blocking calls use the requests session, page calls and predict_many async_client's pool
+    with ThreadPoolExecutor(max_workers=WARM_CONNECTIONS) as pool:
+        statuses = list(pool.map(lambda _: backend.get_health()[0], range(WARM_CONNECTIONS)))
+    if 200 not in statuses:
+        raise RuntimeError(f"/health returned {statuses}")
+    if backend.can_submit():
+        statuses = async_client.run(_async_health_statuses(), backend.DEFAULT_TIMEOUT)
+        if 200 not in statuses:
+            raise RuntimeError(f"/health on the async pool returned {statuses}")
+
+
+def _warm_images():
+    for path in IMAGES:
+        load_image(path)
+
+
+def _warm_caches():
+    # /predict responses are not cached (beyond the precomputed table), so no predict call here
+    import backtest
+    import clusters
+    import peers
+    import precomputed
+    payload = backend.payload_from_profile({})
+    # Cluster definitions, or the /cluster ETag cache when the API publishes none
+    clusters.cluster_info(payload)
+    if backend.is_plan_payload_valid(backend.build_plan_payload(payload)):
+        backend.plan(payload)
+    peers.get_dataset()
+    backtest.get_dataset()
+    precomputed.get_table()
+
+
+STEPS = (
+    ("figures", _warm_figures),
+    ("connections", _warm_connections),
+    ("images", _warm_images),
+    ("caches", _warm_caches),
+)
+
+
+def _run_step(name, step):
+    started = time.perf_counter()
+    try:
+        step()
+        result = {"ok": True}
+    except Exception as e:
+        result = {"ok": False, "error": str(e)}
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    with _lock:
+        previous = _state["steps"].get(name, {})
+        result["attempts"] = previous.get("attempts", 0) + 1
+        _state["steps"][name] = result
+    return result["ok"]
+
+
+def run_warmup(retry_seconds=RETRY_SECONDS):
+    """Runs every step; failed ones are retried every retry_seconds (0: never) until they pass"""
+    with _lock:
+        _state["started_at"] = time.time()
+    pending = STEPS
+    while True:
+        pending = [(name, step) for name, step in pending if not _run_step(name, step)]
+        with _lock:
+            _state["finished_at"] = _state["finished_at"] or time.time()
+            _state["ready"] = not pending
+        if not pending or not retry_seconds:
+            return
+        time.sleep(retry_seconds)
+
+
+def status():
+    with _lock:
+        return {**_state, "steps": dict(_state["steps"])}
+
+
+def is_ready():
+    with _lock:
+        return _state["ready"]
+
+
+def failed_steps():
+    """{step: error} for the steps whose last attempt failed"""
+    with _lock:
+        return {name: result["error"] for name, result in _state["steps"].items() if not result["ok"]}
+
+
+# ----------------------------------------
+# 🚦 READINESS ENDPOINT
+# ----------------------------------------
+class _JsonHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _ReadinessHandler(_JsonHandler):
+
+    def do_GET(self):
+        if self.path == "/ready":
+            ready = is_ready()
+            code, body = (200, {"ready": True}) if ready else (503, {"ready": False, "failed": failed_steps()})
+        elif self.path == "/warmup":
+            code, body = 200, status()
+        elif self.path == "/keep-warm":
+            code, body = 200, keep_warm.stats()
+        elif self.path == "/admission":
+            code, body = 200, admission.stats()
+        else:
+            code, body = 404, {"detail": "Not Found"}
+        self.send_json(code, body)
+
+
+# ----------------------------------------
+# 🔧 ADMIN ENDPOINT
+# ----------------------------------------
+class _AdminHandler(_JsonHandler):
+    """GET only reads; anything that starts or stops tracing is a POST"""
+
+    def do_GET(self):
+        if self.path == "/memory":
+            self.send_json(200, memory.report())
+        elif self.path in ("/memory/snapshot", "/memory/stop-tracing"):
+            self.send_json(405, {"detail": "Method Not Allowed"})
+        else:
+            self.send_json(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        if self.path == "/memory/snapshot":
+            self.send_json(200, memory.snapshot())
+        elif self.path == "/memory/stop-tracing":
+            memory.stop_tracing()
+            self.send_json(200, {"tracing": False})
+        else:
+            self.send_json(404, {"detail": "Not Found"})
+
+
+def _serve(handler, host, port):
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_readiness_server(port=READY_PORT, host="0.0.0.0"):
+    return _serve(_ReadinessHandler, host, port)
+
+
+def start_admin_server(port=ADMIN_PORT, host=ADMIN_HOST):
+    return _serve(_AdminHandler, host, port)
+
+
+def start(ready_port=READY_PORT, admin_port=ADMIN_PORT):
+    """Serves readiness (and admin, when enabled) and runs warmup in the background; returns immediately"""
+    server = start_readiness_server(ready_port) if ready_port else None
+    if admin_port:
+        start_admin_server(admin_port)
+    threading.Thread(target=run_warmup, name="ezhalni-warmup", daemon=True).start()
+    keep_warm.start()
+    return server